@@ -19,12 +19,15 @@ class AgentOutput(BaseModel):
     success: bool = True
     data: dict[str, Any] = {}
     error: str | None = None
+    timed_out: bool = False  # the step ran out of time (error says which budget)
 
 
 class BaseAgent(ABC):
     """Abstract base agent."""
 
     name: str = "base"
+    output_schema: type[BaseModel] | None = None  # validates the agent's LLM reply when set
+    timeout_seconds: float | None = None  # per-run budget; None = the registry default
 
     @abstractmethod
     async def run(self, input_data: AgentInput, pipeline_ctx: Any) -> AgentOutput:
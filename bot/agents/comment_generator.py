@@ -6,7 +6,7 @@ import logging
 from pathlib import Path
 
 from bot.agents.base import AgentInput, AgentOutput, BaseAgent
-from bot.pipeline.context import PipelineContext
+from bot.pipeline.context import StepContext
 from langfuse import observe
 
 logger = logging.getLogger(__name__)
@@ -32,7 +32,7 @@ class CommentGeneratorAgent(BaseAgent):
             )
 
     @observe(name="agent:comment_generator")
-    async def run(self, input_data: AgentInput, pipeline_ctx: PipelineContext) -> AgentOutput:
+    async def run(self, input_data: AgentInput, pipeline_ctx: StepContext) -> AgentOutput:
         """Generate draft responses from a screenshot."""
         try:
             if not pipeline_ctx.image_b64:
@@ -33,15 +33,24 @@ class AgentConfig(BaseModel):
     timeout_seconds: int = 60
     temperature: float = 0.7
     fallback_behavior: str = "return_error"
+    max_parallel_tools: int = 4  # tool calls from one LLM turn run concurrently up to this cap
     context_sources: list[str] = []
     tools: list[ToolParam] = []
 
 
+class FallbackConfig(BaseModel):
+    """Hedged fallback chain for a pipeline agent (see bot.services.llm_hedging)."""
+
+    models: list[str] = []  # OpenRouter model ids, tried in order after the primary
+    latency_slo_seconds: float | None = None  # hedge no later than this
+
+
 class AgentsConfig(BaseModel):
     """Top-level config container — defaults section plus named agent entries."""
 
     defaults: dict[str, Any] = {}
     agents: dict[str, AgentConfig] = {}
+    fallbacks: dict[str, FallbackConfig] = {}
 
 
 def load_agents_config() -> AgentsConfig:
@@ -65,6 +74,10 @@ def load_agents_config() -> AgentsConfig:
         merged: dict[str, Any] = {**defaults, **(agent_cfg or {}), "name": key}
         agents[key] = AgentConfig(**merged)
 
-    config = AgentsConfig(defaults=defaults, agents=agents)
+    fallbacks = {
+        key: FallbackConfig(**(cfg or {})) for key, cfg in (raw.get("fallbacks") or {}).items()
+    }
+
+    config = AgentsConfig(defaults=defaults, agents=agents, fallbacks=fallbacks)
     logger.info("Loaded %d agents from agents.yaml: %s", len(agents), list(agents.keys()))
     return config
@@ -6,7 +6,8 @@ import logging
 from pathlib import Path
 
 from bot.agents.base import AgentInput, AgentOutput, BaseAgent
-from bot.pipeline.context import PipelineContext
+from bot.agents.schemas import ExtractionResult
+from bot.pipeline.context import StepContext
 from langfuse import observe
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,7 @@ class ExtractionAgent(BaseAgent):
     """
 
     name = "extraction"
+    output_schema = ExtractionResult
 
     def __init__(self) -> None:
         self._prompt: str = ""
@@ -38,7 +40,7 @@ class ExtractionAgent(BaseAgent):
             )
 
     @observe(name="agent:extraction")
-    async def run(self, input_data: AgentInput, pipeline_ctx: PipelineContext) -> AgentOutput:
+    async def run(self, input_data: AgentInput, pipeline_ctx: StepContext) -> AgentOutput:
         """Extract structured data from a screenshot."""
         try:
             if not pipeline_ctx.image_b64:
@@ -57,19 +59,12 @@ class ExtractionAgent(BaseAgent):
                 self._prompt,
                 user_message,
                 image_b64=pipeline_ctx.image_b64,
+                schema=self.output_schema,
             )
 
-            # Validate we got the expected fields
-            expected_fields = {"first_name", "last_name", "title", "company", "geography", "context"}
-            if isinstance(result, dict):
-                # Check if we got actual extraction data vs error
-                if "raw_response" in result and len(result) == 1:
-                    logger.warning("Extraction returned raw response: %s", result.get("raw_response", "")[:100])
-
-                # Ensure all expected fields exist (with None as default)
-                for field in expected_fields:
-                    if field not in result:
-                        result[field] = None
+            # Ensure all expected fields exist (with None as default)
+            for field in ExtractionResult.model_fields:
+                result.setdefault(field, None)
 
             return AgentOutput(success=True, data=result)
 
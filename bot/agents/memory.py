@@ -6,23 +6,33 @@ import json
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from bot.agents.base import AgentInput, AgentOutput, BaseAgent
-from bot.pipeline.context import PipelineContext
+from bot.pipeline.context import StepContext
 from langfuse import observe
 
+if TYPE_CHECKING:
+    from bot.storage.repositories import UserMemoryRepo
+
 logger = logging.getLogger(__name__)
 
 _PROMPT_PATH = Path(__file__).resolve().parent.parent.parent / "prompts" / "memory_agent.md"
 
 
 class MemoryAgent(BaseAgent):
-    """Updates user memory after interactions — runs in background."""
+    """Updates user memory after interactions — runs in background.
+
+    With a ``memory_repo`` the agent re-reads the stored memory and saves the
+    update itself, inside the background job, so it is not lost when the
+    request returns before the job runs (or when the job is drained at
+    shutdown) and does not overwrite updates saved by earlier jobs.
+    """
 
     name = "memory"
 
-    def __init__(self) -> None:
+    def __init__(self, memory_repo: UserMemoryRepo | None = None) -> None:
+        self.memory_repo = memory_repo
         self._prompt_template: str = ""
         if _PROMPT_PATH.exists():
             self._prompt_template = _PROMPT_PATH.read_text(encoding="utf-8")
@@ -30,15 +40,21 @@ class MemoryAgent(BaseAgent):
             logger.warning("Memory prompt not found: %s", _PROMPT_PATH)
 
     @observe(name="agent:memory")
-    async def run(self, input_data: AgentInput, pipeline_ctx: PipelineContext) -> AgentOutput:
+    async def run(self, input_data: AgentInput, pipeline_ctx: StepContext) -> AgentOutput:
         """Update user memory based on the interaction results."""
         try:
             # Get the result from previous agents
             strategist_output = input_data.context.get("strategist_output")
             trainer_output = input_data.context.get("trainer_output")
 
-            # Build the interaction summary for memory update
+            # Build the interaction summary for memory update. The job may run
+            # well after the request loaded its snapshot, and other jobs for the
+            # same user may have saved since, so merge onto the stored copy.
             memory_data = dict(pipeline_ctx.user_memory) if pipeline_ctx.user_memory else {}
+            if self.memory_repo is not None and pipeline_ctx.telegram_id:
+                stored = await self.memory_repo.get(pipeline_ctx.telegram_id)
+                if stored is not None and stored.memory_data:
+                    memory_data = dict(stored.memory_data)
 
             # Ensure structure
             if "recent_interactions" not in memory_data:
@@ -100,12 +116,18 @@ class MemoryAgent(BaseAgent):
             # Update session count
             memory_data["user_info"]["total_sessions"] = memory_data["user_info"].get("total_sessions", 0) + 1
 
+            persisted = False
+            if self.memory_repo is not None and pipeline_ctx.telegram_id:
+                await self.memory_repo.update_memory(pipeline_ctx.telegram_id, memory_data)
+                persisted = True
+
             return AgentOutput(
                 success=True,
                 data={
                     "action": "update_memory",
                     "user_id": pipeline_ctx.telegram_id,
                     "updated_memory": memory_data,
+                    "persisted": persisted,
                 },
             )
 
@@ -8,8 +8,9 @@ from pathlib import Path
 from typing import Any
 
 from bot.agents.base import AgentInput, AgentOutput, BaseAgent
-from bot.pipeline.context import PipelineContext
+from bot.pipeline.context import StepContext
 from bot.services.diff_utils import compute_analysis_diff, summarize_diff_for_humans
+from bot.services.llm_router import with_cache_breakpoint
 from langfuse import observe
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,7 @@ class ReanalysisStrategistAgent(BaseAgent):
     """Re-analyzes a lead's strategy based on new context and prior analysis."""
 
     name = "reanalysis_strategist"
+    timeout_seconds = 90.0  # full analysis + draft runs longer than the 60s default
 
     def __init__(self) -> None:
         self._prompt_template: str = ""
@@ -30,7 +32,7 @@ class ReanalysisStrategistAgent(BaseAgent):
             logger.warning("Reanalysis strategist prompt not found: %s", _PROMPT_PATH)
 
     @observe(name="agent:reanalysis_strategist")
-    async def run(self, input_data: AgentInput, pipeline_ctx: PipelineContext) -> AgentOutput:
+    async def run(self, input_data: AgentInput, pipeline_ctx: StepContext) -> AgentOutput:
         """
         Run re-analysis on a lead with new context.
 
@@ -53,7 +55,7 @@ class ReanalysisStrategistAgent(BaseAgent):
             system_prompt = self._prompt_template
             system_prompt = system_prompt.replace(
                 "{KNOWLEDGE_BASE_PLACEHOLDER}",
-                pipeline_ctx.knowledge_base or "No knowledge base available.",
+                with_cache_breakpoint(pipeline_ctx.knowledge_base or "No knowledge base available."),
             )
 
             memory_text = json.dumps(pipeline_ctx.user_memory, indent=2) if pipeline_ctx.user_memory else "No user memory available."
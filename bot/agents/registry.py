@@ -9,12 +9,15 @@ from bot.agents.base import BaseAgent
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_AGENT_TIMEOUT = 60.0  # seconds; matches defaults.timeout_seconds in data/agents.yaml
+
 
 class AgentRegistry:
     """Register and retrieve agents by name."""
 
-    def __init__(self) -> None:
+    def __init__(self, *, default_timeout: float = DEFAULT_AGENT_TIMEOUT) -> None:
         self._agents: dict[str, BaseAgent] = {}
+        self.default_timeout = default_timeout
 
     def register(self, agent: BaseAgent) -> None:
         self._agents[agent.name] = agent
@@ -26,5 +29,10 @@ class AgentRegistry:
             raise KeyError(f"Agent not found: {name}. Available: {list(self._agents.keys())}")
         return agent
 
+    def timeout_for(self, name: str) -> float:
+        """Seconds an agent run may take: the agent's own ``timeout_seconds`` or the default."""
+        agent = self._agents.get(name)
+        return (agent.timeout_seconds if agent is not None else None) or self.default_timeout
+
     def list_agents(self) -> list[str]:
         return list(self._agents.keys())
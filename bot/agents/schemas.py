@@ -0,0 +1,80 @@
+"""Output schemas for structured LLM calls (``LLMProvider.complete(..., schema=...)``).
+
+Schemas are deliberately lenient: they pin down the fields code reads and
+coerces, and allow everything else the prompts ask for to pass through.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class _LLMOutput(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+class ExtractionResult(_LLMOutput):
+    """Prospect fields read off a screenshot (prompts/extraction_agent.md)."""
+
+    first_name: str | None = None
+    last_name: str | None = None
+    title: str | None = None
+    company: str | None = None
+    geography: str | None = None
+    context: str | None = None
+
+
+class StrategistResult(_LLMOutput):
+    """Prospect analysis, strategy and draft (prompts/strategist_agent.md)."""
+
+    prospect_info: dict[str, Any] | None = None
+    analysis: dict[str, Any] | None = None
+    strategy: dict[str, Any] | None = None
+    engagement_tactics: dict[str, Any] | None = None
+    draft: dict[str, Any] | None = None
+
+
+class TrainerResult(_LLMOutput):
+    """Scored practice response (prompts/trainer_agent.md)."""
+
+    total_score: int = 0
+    xp_earned: int | None = None
+    breakdown: list[dict[str, Any]] = Field(default_factory=list)
+    strengths: list[Any] = Field(default_factory=list)
+    improvements: list[Any] = Field(default_factory=list)
+
+
+class EngagementStep(_LLMOutput):
+    step_id: int
+    action_type: str
+    description: str
+    suggested_text: str | None = None
+    timing: str | None = None
+    delay_days: int = 0
+    status: str = "pending"
+    completed_at: str | None = None
+
+
+class EngagementPlanResult(_LLMOutput):
+    """Engagement plan (prompts/engagement_plan.md); a bare array is accepted as ``steps``."""
+
+    steps: list[EngagementStep]
+
+
+class ScenarioDraft(_LLMOutput):
+    id: str = ""
+    category: str = "general"
+    difficulty: int = 2
+    persona: dict[str, Any] = Field(default_factory=dict)
+    situation: str = ""
+    scoring_focus: list[str] = Field(default_factory=list)
+    ideal_response: str = ""
+    scoring_rubric: dict[str, Any] = Field(default_factory=dict)
+
+
+class ScenarioBatchResult(_LLMOutput):
+    """Generated training scenarios (prompts/scenario_generator.md); a bare array is accepted."""
+
+    scenarios: list[ScenarioDraft]
@@ -8,7 +8,9 @@ from pathlib import Path
 from typing import Any
 
 from bot.agents.base import AgentInput, AgentOutput, BaseAgent
-from bot.pipeline.context import PipelineContext
+from bot.agents.schemas import StrategistResult
+from bot.pipeline.context import StepContext
+from bot.services.llm_router import stream_complete, with_cache_breakpoint
 from langfuse import observe
 
 logger = logging.getLogger(__name__)
@@ -20,6 +22,8 @@ class StrategistAgent(BaseAgent):
     """Provides deep prospect analysis, closing strategy, engagement tactics, and draft outreach."""
 
     name = "strategist"
+    output_schema = StrategistResult
+    timeout_seconds = 90.0  # full analysis + draft runs longer than the 60s default
 
     def __init__(self) -> None:
         self._prompt_template: str = ""
@@ -29,7 +33,7 @@ class StrategistAgent(BaseAgent):
             logger.warning("Strategist prompt not found: %s", _PROMPT_PATH)
 
     @observe(name="agent:strategist")
-    async def run(self, input_data: AgentInput, pipeline_ctx: PipelineContext) -> AgentOutput:
+    async def run(self, input_data: AgentInput, pipeline_ctx: StepContext) -> AgentOutput:
         """Run strategist analysis on user's prospect context."""
         try:
             # Check for extraction results from previous pipeline step
@@ -60,7 +64,7 @@ class StrategistAgent(BaseAgent):
             system_prompt = self._prompt_template
             system_prompt = system_prompt.replace(
                 "{KNOWLEDGE_BASE_PLACEHOLDER}",
-                pipeline_ctx.knowledge_base or "No knowledge base available.",
+                with_cache_breakpoint(pipeline_ctx.knowledge_base or "No knowledge base available."),
             )
 
             memory_text = json.dumps(pipeline_ctx.user_memory, indent=2) if pipeline_ctx.user_memory else "No user memory available."
@@ -76,8 +80,10 @@ class StrategistAgent(BaseAgent):
             )
 
             # Call LLM (pass image if available for vision models)
-            result = await pipeline_ctx.llm.complete(
-                system_prompt, user_message, image_b64=pipeline_ctx.image_b64,
+            result = await stream_complete(
+                pipeline_ctx.llm, system_prompt, user_message,
+                image_b64=pipeline_ctx.image_b64, on_delta=pipeline_ctx.stream_sink,
+                schema=self.output_schema,
             )
 
             return AgentOutput(success=True, data=result)
@@ -6,13 +6,15 @@ inherit from this class. It is deliberately separate from the v1.0 BaseAgent hie
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from collections.abc import Awaitable, Callable
 from pathlib import Path
 from typing import Any
 
 from bot.agents.config import AgentConfig, ToolParam
-from bot.tracing import traced_span
+from bot.services.deadline import deadline_scope
+from bot.tracing.context import traced_span
 
 logger = logging.getLogger(__name__)
 
@@ -113,6 +115,20 @@ class ToolUseAgent:
             logger.error("Agent %s: %s", self.name, error_msg)
             return error_msg
 
+    async def _execute_tools(self, tool_calls: list[Any]) -> list[Any]:
+        """Run independent tool calls concurrently, at most ``max_parallel_tools`` at a time."""
+        if len(tool_calls) == 1:
+            return [await self._execute_tool(tool_calls[0])]
+
+        limit = asyncio.Semaphore(max(1, self._config.max_parallel_tools))
+
+        async def _run(call: Any) -> Any:
+            async with limit:
+                return await self._execute_tool(call)
+
+        logger.debug("Agent %s: executing %d tool calls in parallel", self.name, len(tool_calls))
+        return await asyncio.gather(*(_run(c) for c in tool_calls))
+
     # ------------------------------------------------------------------
     # Core tool-use loop
     # ------------------------------------------------------------------
@@ -128,8 +144,20 @@ class ToolUseAgent:
         """Iterate the LLM tool-use loop until a text reply or max_iterations is hit.
 
         Returns the final text content from the LLM.
-        Raises RuntimeError if max_iterations is exceeded without a text response.
+        Raises RuntimeError if max_iterations is exceeded without a text response,
+        and TimeoutError once ``timeout_seconds`` (or the request deadline) runs out.
         """
+        with deadline_scope(self._config.timeout_seconds) as deadline:
+            try:
+                async with asyncio.timeout(deadline.remaining()):
+                    return await self._tool_loop(messages, llm_provider, system_prompt)
+            except TimeoutError:
+                logger.warning("Agent %s timed out (timeout_seconds=%s)", self.name, self._config.timeout_seconds)
+                raise
+
+    async def _tool_loop(
+        self, messages: list[dict[str, Any]], llm_provider: Any, system_prompt: str | None,
+    ) -> str:
         from bot.services.llm_router import TextResponse, ToolCallResponse
 
         effective_prompt = system_prompt if system_prompt is not None else self._system_prompt
@@ -159,15 +187,16 @@ class ToolUseAgent:
                 # Append the assistant's raw tool-call message to history
                 history.append(result.raw_message)
 
-                # Execute the tool and collect the result
-                tool_result = await self._execute_tool(result)
+                # Execute every tool call from this turn concurrently (capped per agent)
+                tool_results = await self._execute_tools(result.calls)
 
-                # Append tool result message for the next iteration
-                history.append({
-                    "role": "tool",
-                    "tool_call_id": result.tool_call_id,
-                    "content": str(tool_result),
-                })
+                # Append one tool result message per call, in the model's order
+                for call, tool_result in zip(result.calls, tool_results):
+                    history.append({
+                        "role": "tool",
+                        "tool_call_id": call.tool_call_id,
+                        "content": str(tool_result),
+                    })
 
         # Exceeded max_iterations without a text response
         logger.warning(
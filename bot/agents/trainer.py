@@ -8,7 +8,9 @@ from pathlib import Path
 from typing import Any
 
 from bot.agents.base import AgentInput, AgentOutput, BaseAgent
-from bot.pipeline.context import PipelineContext
+from bot.agents.schemas import TrainerResult
+from bot.pipeline.context import StepContext
+from bot.services.llm_router import stream_complete, with_cache_breakpoint
 from langfuse import observe
 
 logger = logging.getLogger(__name__)
@@ -20,6 +22,7 @@ class TrainerAgent(BaseAgent):
     """Scores user responses against scenario rubrics and provides feedback."""
 
     name = "trainer"
+    output_schema = TrainerResult
 
     def __init__(self) -> None:
         self._prompt_template: str = ""
@@ -29,14 +32,14 @@ class TrainerAgent(BaseAgent):
             logger.warning("Trainer prompt not found: %s", _PROMPT_PATH)
 
     @observe(name="agent:trainer")
-    async def run(self, input_data: AgentInput, pipeline_ctx: PipelineContext) -> AgentOutput:
+    async def run(self, input_data: AgentInput, pipeline_ctx: StepContext) -> AgentOutput:
         """Score user's response against the scenario rubric."""
         try:
             # Build system prompt
             system_prompt = self._prompt_template
             system_prompt = system_prompt.replace(
                 "{KNOWLEDGE_BASE_PLACEHOLDER}",
-                pipeline_ctx.knowledge_base or "No knowledge base available.",
+                with_cache_breakpoint(pipeline_ctx.knowledge_base or "No knowledge base available."),
             )
 
             memory_text = json.dumps(pipeline_ctx.user_memory, indent=2) if pipeline_ctx.user_memory else "No user memory available."
@@ -56,7 +59,10 @@ class TrainerAgent(BaseAgent):
             user_msg = f"Score this response to the scenario:\n\n{input_data.user_message}"
 
             # Call LLM
-            result = await pipeline_ctx.llm.complete(system_prompt, user_msg)
+            result = await stream_complete(
+                pipeline_ctx.llm, system_prompt, user_msg,
+                on_delta=pipeline_ctx.stream_sink, schema=self.output_schema,
+            )
 
             # Ensure required fields with type validation
             try:
@@ -14,6 +14,41 @@ class Settings(BaseSettings):
     # InsForge
     insforge_base_url: str = "https://wz7ymxxu.eu-central.insforge.app"
     insforge_anon_key: str = ""
+    insforge_max_connections: int = 50
+    insforge_max_keepalive: int = 20
+    insforge_keepalive_expiry: float = 30.0  # seconds
+    insforge_http2: bool = False  # requires the optional 'h2' package
+    insforge_coalesce_reads: bool = False  # share one request between concurrent identical queries
+    insforge_breaker_threshold: int = 5  # consecutive 5xx/transport failures before failing fast
+    insforge_breaker_cooldown: float = 30.0  # seconds open before a half-open probe
+    insforge_retry_budget: float = 20.0  # client-wide retry tokens (refill 2/s)
+    user_cache_ttl: float = 30.0  # seconds; 0 disables the UserRepo read-through cache
+
+    # Shared LLM provider pool (one HTTP pool per upstream host)
+    llm_max_connections: int = 20  # per host (openrouter.ai, api.anthropic.com)
+    llm_pool_idle_ttl: float = 300.0  # seconds before an unused provider is evicted
+
+    # LLM admission control (per upstream host; interactive calls go first)
+    llm_max_concurrency: int = 8  # upper bound; halves on 429, recovers on success
+    llm_tokens_per_minute: int = 0  # estimated input tokens/min per host; 0 = unlimited
+
+    # Request deadline (per-step limits come from agents.yaml timeout_seconds)
+    pipeline_deadline: float = 180.0  # seconds one pipeline run may take end to end; 0 = unbounded
+
+    # Background pipeline steps (memory updates) — bounded worker pool
+    background_workers: int = 4
+    background_queue_size: int = 100
+    background_overflow: str = "block"  # block | drop | coalesce (newest job per agent+user wins, older is discarded)
+    background_drain_timeout: float = 20.0  # seconds to finish queued work on shutdown
+
+    # LLM response cache (opt-in per pipeline step via cache_ttl)
+    llm_cache_path: str = "data/llm_cache.sqlite3"  # empty = memory tier only
+    llm_cache_memory_entries: int = 256
+    llm_cache_disk_entries: int = 5000
+
+    # Knowledge base retrieval
+    kb_retrieval_budget: int = 2500  # tokens of KB sections per prompt; 0 = inject the full KB
+    kb_core_budget: int = 1200  # fixed opening sections, kept in the cacheable prompt prefix
 
     # Optional LLM defaults (for testing)
     anthropic_api_key: str = ""
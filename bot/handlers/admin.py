@@ -5,7 +5,9 @@ from __future__ import annotations
 import json
 import logging
 from pathlib import Path
+from typing import Any
 
+import httpx
 from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
@@ -17,6 +19,10 @@ from aiogram.types import (
 )
 
 from bot.services.analytics import TeamAnalyticsService
+from bot.services.llm_cache import get_response_cache
+from bot.services.llm_hedging import latency_tracker
+from bot.services.llm_scheduler import get_llm_scheduler
+from bot.services.llm_usage import get_usage_aggregator
 from bot.storage.insforge_client import InsForgeClient
 from bot.storage.repositories import (
     AttemptRepo,
@@ -29,6 +35,7 @@ from bot.storage.repositories import (
     UserMemoryRepo,
     UserRepo,
 )
+from bot.task_utils import get_background_executor
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +46,8 @@ _DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
 ADMIN_MENU = InlineKeyboardMarkup(
     inline_keyboard=[
         [InlineKeyboardButton(text="⏱ Pipeline Performance", callback_data="admin:perf")],
+        [InlineKeyboardButton(text="🩺 Storage Health", callback_data="admin:storage")],
+        [InlineKeyboardButton(text="💸 LLM Usage", callback_data="admin:usage")],
         [InlineKeyboardButton(text="📊 Team Statistics", callback_data="admin:stats")],
         [InlineKeyboardButton(text="🏆 Leaderboard", callback_data="admin:leaderboard")],
         [InlineKeyboardButton(text="📈 Trends", callback_data="admin:trends")],
@@ -89,32 +98,32 @@ async def on_admin_stats(
         await callback.answer("🔒 Admin only", show_alert=True)
         return
 
-    # Query all users
-    users = await user_repo.client.query("users", select="*")
-    users = users if isinstance(users, list) else []
-
-    total_users = len(users)
-    total_xp = sum(u.get("total_xp", 0) for u in users)
-    active_providers = {}
-    for u in users:
+    # Stream users (pages, not the whole table in memory)
+    total_users = 0
+    total_xp = 0
+    active_providers: dict[str, int] = {}
+    async for u in user_repo.client.query_iter("users", select="id,total_xp,provider"):
+        total_users += 1
+        total_xp += u.get("total_xp", 0) or 0
         p = u.get("provider", "unknown")
         active_providers[p] = active_providers.get(p, 0) + 1
 
-    # Query all attempts
-    attempts = await attempt_repo.client.query("attempts", select="id,score,mode")
-    attempts = attempts if isinstance(attempts, list) else []
-    total_attempts = len(attempts)
-    learn_attempts = sum(1 for a in attempts if a.get("mode") == "learn")
-    train_attempts = sum(1 for a in attempts if a.get("mode") == "train")
-    avg_score = (
-        sum(a.get("score", 0) for a in attempts) / total_attempts
-        if total_attempts > 0
-        else 0
-    )
-
-    # Query support sessions
-    sessions = await attempt_repo.client.query("support_sessions", select="id")
-    sessions = sessions if isinstance(sessions, list) else []
+    # Stream all attempts
+    total_attempts = 0
+    learn_attempts = 0
+    train_attempts = 0
+    score_sum = 0
+    async for a in attempt_repo.client.query_iter("attempts", select="id,score,mode"):
+        total_attempts += 1
+        score_sum += a.get("score", 0) or 0
+        if a.get("mode") == "learn":
+            learn_attempts += 1
+        elif a.get("mode") == "train":
+            train_attempts += 1
+    avg_score = score_sum / total_attempts if total_attempts > 0 else 0
+
+    # Count support sessions (server-side count, no rows transferred)
+    session_count = await attempt_repo.client.count("support_sessions")
 
     providers_text = "\n".join(f"  • {k}: {v}" for k, v in active_providers.items())
 
@@ -128,7 +137,7 @@ async def on_admin_stats(
         f"  📝 Total Attempts: {total_attempts}\n"
         f"  🎓 Learn: {learn_attempts}\n"
         f"  🎲 Train: {train_attempts}\n"
-        f"  💼 Support Sessions: {len(sessions)}\n"
+        f"  💼 Support Sessions: {session_count}\n"
         f"  📊 Avg Score: {avg_score:.0f}/100\n"
     )
 
@@ -360,12 +369,9 @@ async def on_admin_scenarios(
         await callback.answer("🔒 Admin only", show_alert=True)
         return
 
-    # Get all attempts grouped by scenario
-    all_attempts = await attempt_repo.client.query("attempts", select="scenario_id,score,mode")
-    all_attempts = all_attempts if isinstance(all_attempts, list) else []
-
+    # Stream all attempts, grouped by scenario
     scenario_stats: dict[str, dict] = {}
-    for a in all_attempts:
+    async for a in attempt_repo.client.query_iter("attempts", select="scenario_id,score,mode"):
         sid = a.get("scenario_id", "?")
         if sid not in scenario_stats:
             scenario_stats[sid] = {"count": 0, "total_score": 0, "mode": a.get("mode", "?")}
@@ -716,6 +722,136 @@ async def on_admin_perf(
     await callback.answer()
 
 
+@router.callback_query(F.data == "admin:storage")
+async def on_admin_storage(
+    callback: CallbackQuery,
+    insforge: InsForgeClient,
+    user_repo: UserRepo,
+    admin_usernames: list[str],
+) -> None:
+    """Show InsForge client health — circuit breaker, retry budget, pool, caches."""
+    username = (callback.from_user.username or "").lower()
+    if username not in admin_usernames:
+        await callback.answer("🔒 Admin only", show_alert=True)
+        return
+
+    stats = insforge.pool_stats()
+    breaker = stats["breaker"]
+    budget = stats["retry_budget"]
+    cache = user_repo.cache_stats()
+    state_icon = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}.get(breaker["state"], "❓")
+
+    text = (
+        "🩺 *Storage Health*\n"
+        "━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        f"*Circuit breaker:* {state_icon} {breaker['state']}\n"
+        f"  Consecutive failures: {breaker['consecutive_failures']}\n"
+        f"  Times opened: {breaker['times_opened']} · Rejected calls: {breaker['rejected']}\n\n"
+        f"*Retry budget:* {budget['tokens']}/{budget['capacity']} tokens\n"
+        f"  Retries spent: {budget['spent']} · Denied: {budget['exhausted']}\n\n"
+        f"*Connection pool:*\n"
+        f"  In flight: {stats['in_flight']} (peak {stats['peak_in_flight']}/{stats['max_connections']})\n"
+        f"  Requests: {stats['requests_total']} · Pool waits: {stats['waits']}\n"
+        f"  Coalesced reads: {stats['coalesced_reads']}\n\n"
+        f"*User cache:* {cache['size']}/{cache['max_size']} entries, "
+        f"hit rate {cache['hit_rate']:.0%}\n"
+    )
+    llm_cache = get_response_cache()
+    if llm_cache:
+        lc = llm_cache.stats()
+        text += (
+            f"\n*LLM response cache:* hit rate {lc['hit_rate']:.0%}\n"
+            f"  Memory hits: {lc['memory_hits']} · Disk hits: {lc['disk_hits']} · Misses: {lc['misses']}\n"
+        )
+    scheduler = get_llm_scheduler()
+    for up in scheduler.stats() if scheduler else []:
+        fg, bg = up["lanes"]["interactive"], up["lanes"]["background"]
+        text += (
+            f"\n*LLM {httpx.URL(up['host']).host}:* {up['in_flight']} in flight, "
+            f"limit {up['limit']}/{up['max_concurrency']} · 429s: {up['throttled']}\n"
+            f"  Interactive: {fg['queued']} queued, p95 wait {fg['p95_wait']:.1f}s\n"
+            f"  Background: {bg['queued']} queued, p95 wait {bg['p95_wait']:.1f}s\n"
+        )
+    executor = get_background_executor()
+    if executor:
+        bx = executor.stats()
+        text += (
+            f"\n*Background steps:* {bx['running']}/{bx['workers']} running, "
+            f"{bx['queued']}/{bx['max_queue']} queued ({bx['overflow']})\n"
+            f"  Done: {bx['completed']} · Failed: {bx['failed']} · "
+            f"Dropped: {bx['dropped']} · Coalesced: {bx['coalesced']}\n"
+            f"  Queue wait: {bx['avg_wait']:.1f}s avg, {bx['max_wait']:.1f}s max\n"
+        )
+    latencies = latency_tracker.stats()
+    if latencies:
+        text += "\n*LLM latency (p50 / p95):*\n"
+        for key, h in latencies.items():
+            text += f"  `{key}`: {h['p50']}s / {h['p95']}s ({h['count']} calls)\n"
+
+    await callback.message.edit_text(  # type: ignore[union-attr]
+        text,
+        parse_mode="Markdown",
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔙 Back", callback_data="admin:back")],
+        ]),
+    )
+    await callback.answer()
+
+
+def _usage_line(label: Any, u: dict[str, Any]) -> str:
+    tokens = u["prompt_tokens"] + u["completion_tokens"]
+    cached = f", {u['cache_read_tokens']:,} cached" if u["cache_read_tokens"] else ""
+    return (
+        f"  `{label}`: ${u['cost']:.2f} · {tokens:,} tok{cached} · "
+        f"{u['calls']} calls, {u['avg_latency_ms'] / 1000:.1f}s avg\n"
+    )
+
+
+@router.callback_query(F.data == "admin:usage")
+async def on_admin_usage(
+    callback: CallbackQuery,
+    admin_usernames: list[str],
+) -> None:
+    """Show LLM token and cost totals per agent, pipeline, model and user since startup."""
+    username = (callback.from_user.username or "").lower()
+    if username not in admin_usernames:
+        await callback.answer("🔒 Admin only", show_alert=True)
+        return
+
+    aggregator = get_usage_aggregator()
+    text = "💸 *LLM Usage*\n━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+    if aggregator is None or not aggregator.total.calls:
+        text += "No LLM calls recorded since the bot started."
+    else:
+        stats = aggregator.stats()
+        total = stats["total"]
+        text += (
+            f"*Since {stats['since'][:16].replace('T', ' ')} UTC:* ${total['cost']:.2f}, "
+            f"{total['prompt_tokens']:,} in / {total['completion_tokens']:,} out "
+            f"({total['cache_read_tokens']:,} cached) over {total['calls']} calls\n"
+            f"  Persisted: {stats['persisted']} · Buffered: {stats['buffered']}\n"
+        )
+        sections = (
+            ("By agent", "agent"),
+            ("By pipeline", "pipeline"),
+            ("By model", "model"),
+            ("Top users (telegram id)", "telegram_id"),
+        )
+        for title, dimension in sections:
+            text += f"\n*{title}:*\n"
+            for key, u in aggregator.top(dimension):
+                text += _usage_line(key if key is not None else "—", u)
+
+    await callback.message.edit_text(  # type: ignore[union-attr]
+        text,
+        parse_mode="Markdown",
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔙 Back", callback_data="admin:back")],
+        ]),
+    )
+    await callback.answer()
+
+
 @router.callback_query(F.data.startswith("admin:trace:"))
 async def on_admin_trace_detail(
     callback: CallbackQuery,
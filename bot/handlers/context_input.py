@@ -645,7 +645,10 @@ async def on_reanalyze_start(
 
     model = user.openrouter_model if user.provider == "openrouter" else None
     llm = create_provider(user.provider, api_key, model)
-    knowledge_base = knowledge.combined
+    knowledge_base = knowledge.retrieve(" ".join(
+        [str(v) for v in lead_info.values() if v]
+        + [str(item["content"]) for item in new_context_items if item.get("content")]
+    ))
 
     # Load user memory
     memory_repo = UserMemoryRepo(insforge)
@@ -0,0 +1,29 @@
+"""Global error handlers — fast replies when a backend is known to be down."""
+
+from __future__ import annotations
+
+import logging
+
+from aiogram import Router
+from aiogram.filters import ExceptionTypeFilter
+from aiogram.types import ErrorEvent
+
+from bot.storage.insforge_client import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+router = Router(name="errors")
+
+
+@router.errors(ExceptionTypeFilter(CircuitOpenError))
+async def on_storage_unavailable(event: ErrorEvent) -> None:
+    """Tell the user to retry shortly instead of leaving them waiting on a dead backend."""
+    exc = event.exception
+    retry_in = int(getattr(exc, "retry_in", 0)) or 30
+    logger.warning("Update %s rejected: %s", event.update.update_id, exc)
+    text = f"⚠️ Our database is temporarily unavailable. Please try again in ~{retry_in}s."
+
+    if event.update.callback_query:
+        await event.update.callback_query.answer(text, show_alert=True)
+    elif event.update.message:
+        await event.update.message.answer(text)
@@ -66,7 +66,7 @@ def _leads_list_keyboard(leads: list, page: int = 0, page_size: int = 5) -> Inli
         status_icon = STATUS_LABELS.get(lead.status, "❓").split(" ")[0]
         photo_icon = "📸" if lead.photo_url else "📝"
         # Show plan indicator
-        plan_icon = "📋" if lead.engagement_plan else ""
+        plan_icon = "📋" if lead.has_engagement_plan else ""
         # Check if follow-up is overdue
         attention = ""
         if lead.next_followup:
@@ -335,7 +335,7 @@ async def cmd_leads(message: Message, user_repo: UserRepo, lead_repo: LeadRegist
         await message.answer("Please run /start first.")
         return
 
-    leads = await lead_repo.get_for_user(tg_id, limit=50)
+    leads = await lead_repo.get_summaries_for_user(tg_id, limit=50)
 
     if not leads:
         keyboard = add_open_in_app_row(None, tma_url, "leads")
@@ -357,7 +357,7 @@ async def cmd_leads(message: Message, user_repo: UserRepo, lead_repo: LeadRegist
         status_counts[lead.status] = status_counts.get(lead.status, 0) + 1
         if lead.photo_url:
             photo_count += 1
-        if lead.engagement_plan:
+        if lead.has_engagement_plan:
             enriched_count += 1
 
     summary_lines = []
@@ -388,7 +388,7 @@ async def on_leads_page(
     page = int(callback.data.split(":")[2])  # type: ignore[union-attr]
     tg_id = callback.from_user.id
 
-    leads = await lead_repo.get_for_user(tg_id, limit=50)
+    leads = await lead_repo.get_summaries_for_user(tg_id, limit=50)
 
     await callback.message.edit_reply_markup(  # type: ignore[union-attr]
         reply_markup=_leads_list_keyboard(leads, page=page)
@@ -1172,7 +1172,7 @@ async def on_lead_back(
 ) -> None:
     """Go back to lead list."""
     tg_id = callback.from_user.id
-    leads = await lead_repo.get_for_user(tg_id, limit=50)
+    leads = await lead_repo.get_summaries_for_user(tg_id, limit=50)
 
     if not leads:
         await callback.message.edit_text("📋 No leads yet.")  # type: ignore[union-attr]
@@ -1186,7 +1186,7 @@ async def on_lead_back(
         status_counts[lead.status] = status_counts.get(lead.status, 0) + 1
         if lead.photo_url:
             photo_count += 1
-        if lead.engagement_plan:
+        if lead.has_engagement_plan:
             enriched_count += 1
 
     summary_lines = []
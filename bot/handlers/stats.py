@@ -272,7 +272,7 @@ async def on_stats_leads(
     from bot.utils import _sanitize
 
     tg_id = callback.from_user.id
-    leads = await lead_repo.get_for_user(tg_id, limit=50)
+    leads = await lead_repo.get_summaries_for_user(tg_id, limit=50)
 
     if not leads:
         await callback.message.edit_text(  # type: ignore[union-attr]
@@ -24,9 +24,11 @@ from aiogram.types import (
 from bot.agents.registry import AgentRegistry
 from bot.pipeline.config_loader import load_pipeline
 from bot.pipeline.context import PipelineContext
+from bot.pipeline.prefetch import ContextPrefetcher
 from bot.pipeline.runner import PipelineRunner
 from bot.services.casebook import CasebookService
 from bot.services.crypto import CryptoService
+from bot.services.deadline import request_deadline
 from bot.services.engagement import EngagementService
 from bot.services.knowledge import KnowledgeService
 from bot.services.llm_router import create_provider, web_research_call
@@ -88,7 +90,8 @@ async def _traced_support_run(runner, pipeline_config, ctx, tg_id, user_id, pipe
         )
     except Exception:
         pass  # Never break pipeline for observability
-    return await runner.run(pipeline_config, ctx)
+    with request_deadline():
+        return await runner.run(pipeline_config, ctx)
 
 
 @observe(name="pipeline:support_regen")
@@ -103,7 +106,8 @@ async def _traced_support_regen_run(runner, pipeline_config, ctx, tg_id, user_id
         )
     except Exception:
         pass  # Never break pipeline for observability
-    return await runner.run(pipeline_config, ctx)
+    with request_deadline():
+        return await runner.run(pipeline_config, ctx)
 
 def _support_actions_keyboard(lead_id: int | None = None) -> InlineKeyboardMarkup:
     """Build support actions keyboard, optionally including a lead link."""
@@ -193,37 +197,37 @@ async def _run_support_pipeline(
         model = user.openrouter_model if user.provider == "openrouter" else None
         llm = create_provider(user.provider, api_key, model)
 
-        # Get user memory
-        memory_record = await memory_repo.get(tg_id)
-        memory_data = (memory_record.memory_data or {}) if memory_record else {}
-
-        # Get casebook context
-        casebook_text = await casebook_service.find_similar("unknown", "general")
-
-        # Build pipeline context
+        # Build pipeline context; memory, casebook and KB sections are prefetched concurrently.
+        # Pipelines without a knowledge source (support_photo: the caption says nothing
+        # about the prospect until extraction runs) keep the full knowledge base.
         ctx = PipelineContext(
             llm=llm,
             knowledge_base=knowledge.combined,
-            user_memory=memory_data,
-            casebook_text=casebook_text,
             user_message=user_input,
             telegram_id=tg_id,
             user_id=user.id or 0,
             image_b64=image_b64,
             model_config=model_config_service,
         )
+        pipeline_config = load_pipeline(pipeline_name)
+        await ContextPrefetcher(
+            memory_repo=memory_repo, casebook_service=casebook_service, knowledge=knowledge,
+        ).run(pipeline_config, ctx)
 
         # Run support pipeline (or support_photo for images)
-        pipeline_config = load_pipeline(pipeline_name)
         runner = PipelineRunner(agent_registry)
-        async with ProgressUpdater(status_msg, Phase.ANALYSIS):
+        async with ProgressUpdater(status_msg, Phase.ANALYSIS) as progress:
+            ctx.stream_sink = progress.feed
             await _traced_support_run(runner, pipeline_config, ctx, tg_id, user.id or 0, pipeline_name)
 
         # Get strategist output
         strategist_result = ctx.get_result("strategist")
         if not strategist_result or not strategist_result.success:
             error = strategist_result.error if strategist_result else "Unknown error"
-            await status_msg.edit_text(f"❌ Analysis failed: {error}")
+            if strategist_result and strategist_result.timed_out:
+                await status_msg.edit_text("⏱ Analysis took too long — the AI provider is slow right now. Please try again.")
+            else:
+                await status_msg.edit_text(f"❌ Analysis failed: {error}")
             await llm.close()
             return
 
@@ -244,12 +248,7 @@ async def _run_support_pipeline(
             if extracted.get("context"):
                 output_data["prospect_info"]["extracted_context"] = extracted["context"]
 
-        # Handle memory update from background agent
-        memory_result = ctx.get_result("memory")
-        if memory_result and memory_result.success:
-            updated_memory = memory_result.data.get("updated_memory")
-            if updated_memory:
-                await memory_repo.update_memory(tg_id, updated_memory)
+        # Memory is updated and saved by the background memory step (MemoryAgent)
 
         # Save support session
         try:
@@ -1035,24 +1034,21 @@ async def on_support_action(
         model = user.openrouter_model if user.provider == "openrouter" else None
         llm = create_provider(user.provider, api_key, model)
 
-        memory_record = await memory_repo.get(tg_id)
-        memory_data = (memory_record.memory_data or {}) if memory_record else {}
-        casebook_text = await casebook_service.find_similar("unknown", "general")
-
         ctx = PipelineContext(
             llm=llm,
-            knowledge_base=knowledge.combined,
-            user_memory=memory_data,
-            casebook_text=casebook_text,
             user_message=original_input + modifier,
             telegram_id=tg_id,
             user_id=user.id or 0,
             model_config=model_config_service,
         )
-
         pipeline_config = load_pipeline("support")
+        await ContextPrefetcher(
+            memory_repo=memory_repo, casebook_service=casebook_service, knowledge=knowledge,
+        ).run(pipeline_config, ctx)
+
         runner = PipelineRunner(agent_registry)
-        async with ProgressUpdater(callback.message, Phase.ANALYSIS):  # type: ignore[arg-type]
+        async with ProgressUpdater(callback.message, Phase.ANALYSIS) as progress:  # type: ignore[arg-type]
+            ctx.stream_sink = progress.feed
             await _traced_support_regen_run(runner, pipeline_config, ctx, tg_id, user.id or 0)
 
         strategist_result = ctx.get_result("strategist")
@@ -21,8 +21,10 @@ from aiogram.types import (
 from bot.agents.registry import AgentRegistry
 from bot.pipeline.config_loader import load_pipeline
 from bot.pipeline.context import PipelineContext
+from bot.pipeline.prefetch import ContextPrefetcher
 from bot.pipeline.runner import PipelineRunner
 from bot.services.crypto import CryptoService
+from bot.services.deadline import request_deadline
 from bot.services.knowledge import KnowledgeService
 from bot.services.llm_router import create_provider
 from bot.services.scoring import calculate_xp
@@ -59,7 +61,8 @@ async def _traced_train_run(runner, pipeline_config, ctx, tg_id, user_id):
         )
     except Exception:
         pass  # Never break pipeline for observability
-    return await runner.run(pipeline_config, ctx)
+    with request_deadline():
+        return await runner.run(pipeline_config, ctx)
 
 
 _SCENARIOS_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "scenarios.json"
@@ -301,29 +304,29 @@ async def _run_train_answer(
         model = user.openrouter_model if user.provider == "openrouter" else None
         llm = create_provider(user.provider, api_key, model)
 
-        memory_record = await memory_repo.get(tg_id)
-        memory_data = (memory_record.memory_data or {}) if memory_record else {}
-
+        # Build pipeline context with scenario; memory and KB sections are prefetched concurrently
         ctx = PipelineContext(
             llm=llm,
-            knowledge_base=knowledge.combined,
-            user_memory=memory_data,
             scenario=scenario_data,
             user_message=user_response,
             telegram_id=tg_id,
             user_id=user.id or 0,
             model_config=model_config_service,
         )
-
         pipeline_config = load_pipeline("train")
+        await ContextPrefetcher(memory_repo=memory_repo, knowledge=knowledge).run(pipeline_config, ctx)
         runner = PipelineRunner(agent_registry)
-        async with ProgressUpdater(status_msg, Phase.EVALUATION):
+        async with ProgressUpdater(status_msg, Phase.EVALUATION) as progress:
+            ctx.stream_sink = progress.feed
             await _traced_train_run(runner, pipeline_config, ctx, tg_id, user.id or 0)
 
         trainer_result = ctx.get_result("trainer")
         if not trainer_result or not trainer_result.success:
             error = trainer_result.error if trainer_result else "Unknown error"
-            await status_msg.edit_text(f"❌ Evaluation failed: {error}")
+            if trainer_result and trainer_result.timed_out:
+                await status_msg.edit_text("⏱ Evaluation took too long — the AI provider is slow right now. Please try again.")
+            else:
+                await status_msg.edit_text(f"❌ Evaluation failed: {error}")
             await llm.close()
             return
 
@@ -373,12 +376,7 @@ async def _run_train_answer(
         if save_error is None:
             await user_repo.update_xp(tg_id, xp_earned)
 
-        # Update memory
-        memory_result = ctx.get_result("memory")
-        if memory_result and memory_result.success:
-            updated_memory = memory_result.data.get("updated_memory")
-            if updated_memory:
-                await memory_repo.update_memory(tg_id, updated_memory)
+        # Memory is updated and saved by the background memory step (MemoryAgent)
 
         # Format feedback (always delivered even if save failed)
         feedback_text = format_training_feedback(output_data)
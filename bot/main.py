@@ -16,17 +16,18 @@ from bot.agents.comment_generator import CommentGeneratorAgent
 from bot.agents.extraction import ExtractionAgent
 from bot.agents.memory import MemoryAgent
 from bot.agents.reanalysis_strategist import ReanalysisStrategistAgent
-from bot.agents.registry import AgentRegistry
+from bot.agents.registry import DEFAULT_AGENT_TIMEOUT, AgentRegistry
 from bot.agents.strategist import StrategistAgent
 from bot.agents.trainer import TrainerAgent
 from bot.config import load_settings
 from bot.services.conversation_history import ConversationHistoryService
-from bot.handlers import admin, comment, context_input, leads, learn, progress, reminders, settings, start, stats, support, train
+from bot.handlers import admin, comment, context_input, errors, leads, learn, progress, reminders, settings, start, stats, support, train
 from bot.middleware import AuthorizationMiddleware
 from bot.pipeline.config_loader import load_all_pipelines
 from bot.services.analytics import TeamAnalyticsService
 from bot.services.casebook import CasebookService
 from bot.services.crypto import CryptoService
+from bot.services.deadline import install_request_budget
 from bot.services.draft_poller import start_draft_request_poller
 from bot.services.plan_poller import start_plan_request_poller
 from bot.services.tma_event_poller import start_tma_event_poller
@@ -35,10 +36,14 @@ from bot.services.followup_scheduler import start_followup_scheduler
 from bot.services.model_config import ModelConfigService
 from bot.services.plan_scheduler import start_plan_scheduler
 from bot.services.knowledge import KnowledgeService
+from bot.services.llm_cache import LLMResponseCache, install_response_cache
+from bot.services.llm_pool import LLMProviderPool, install_provider_pool
+from bot.services.llm_scheduler import LLMScheduler, install_llm_scheduler
+from bot.services.llm_usage import UsageAggregator, install_usage_aggregator
 from bot.services.scenario_generator import ScenarioGeneratorService
 from bot.services.transcription import TranscriptionService
 from bot.storage.insforge_client import InsForgeClient
-from bot.task_utils import create_background_task
+from bot.task_utils import BackgroundExecutor, create_background_task, install_background_executor
 from bot.storage.repositories import (
     AgentModelConfigRepo,
     AttemptRepo,
@@ -50,6 +55,7 @@ from bot.storage.repositories import (
     TmaEventRepo,
     LeadActivityRepo,
     LeadRegistryRepo,
+    LLMUsageRepo,
     ScheduledReminderRepo,
     ScenariosSeenRepo,
     SupportSessionRepo,
@@ -86,10 +92,55 @@ async def main() -> None:
         logger.info("Langfuse observability enabled")
 
     # Initialize InsForge client
-    insforge = InsForgeClient(cfg.insforge_base_url, cfg.insforge_anon_key)
+    insforge = InsForgeClient(
+        cfg.insforge_base_url,
+        cfg.insforge_anon_key,
+        max_connections=cfg.insforge_max_connections,
+        max_keepalive_connections=cfg.insforge_max_keepalive,
+        keepalive_expiry=cfg.insforge_keepalive_expiry,
+        http2=cfg.insforge_http2,
+        coalesce_reads=cfg.insforge_coalesce_reads,
+        breaker_threshold=cfg.insforge_breaker_threshold,
+        breaker_cooldown=cfg.insforge_breaker_cooldown,
+        retry_budget=cfg.insforge_retry_budget,
+    )
+    await insforge.warm_up()
+
+    # Shared LLM provider pool — create_provider() hands out leases from it
+    llm_pool = LLMProviderPool(
+        idle_ttl=cfg.llm_pool_idle_ttl,
+        max_connections=cfg.llm_max_connections,
+    )
+    install_provider_pool(llm_pool)
+
+    # Admission control for every upstream LLM call (interactive before background)
+    install_llm_scheduler(LLMScheduler(
+        max_concurrency=cfg.llm_max_concurrency,
+        tokens_per_minute=cfg.llm_tokens_per_minute,
+    ))
+
+    # Worst-case time a user waits on a pipeline; LLM calls inside see what is left of it
+    install_request_budget(cfg.pipeline_deadline)
+
+    # Bounded worker pool for background pipeline steps, drained on shutdown
+    background_executor = BackgroundExecutor(
+        workers=cfg.background_workers,
+        max_queue=cfg.background_queue_size,
+        overflow=cfg.background_overflow,
+    )
+    await background_executor.start()
+    install_background_executor(background_executor)
+
+    # Content-addressed response cache for pipeline steps with cache_ttl
+    llm_cache = LLMResponseCache(
+        cfg.llm_cache_path or None,
+        memory_entries=cfg.llm_cache_memory_entries,
+        disk_entries=cfg.llm_cache_disk_entries,
+    )
+    install_response_cache(llm_cache)
 
     # Initialize repositories
-    user_repo = UserRepo(insforge)
+    user_repo = UserRepo(insforge, cache_ttl=cfg.user_cache_ttl)
     memory_repo = UserMemoryRepo(insforge)
     seen_repo = ScenariosSeenRepo(insforge)
     attempt_repo = AttemptRepo(insforge)
@@ -106,10 +157,13 @@ async def main() -> None:
     draft_request_repo = DraftRequestRepo(insforge)
     plan_request_repo = PlanRequestRepo(insforge)
     tma_event_repo = TmaEventRepo(insforge)
+    llm_usage_repo = LLMUsageRepo(insforge)
 
     # Initialize services
     crypto = CryptoService(cfg.encryption_key)
-    knowledge = KnowledgeService()
+    knowledge = KnowledgeService(
+        retrieval_budget=cfg.kb_retrieval_budget, core_budget=cfg.kb_core_budget,
+    )
     knowledge.load()
     casebook_service = CasebookService(casebook_repo)
     transcription = TranscriptionService(cfg.assemblyai_api_key)
@@ -128,19 +182,27 @@ async def main() -> None:
     else:
         logger.warning("No OPENROUTER_API_KEY set — engagement features disabled")
 
-    # Initialize model config service (per-agent model overrides)
-    model_config_service = ModelConfigService(model_config_repo, cfg.openrouter_api_key or "")
+    # Load agent configs from YAML
+    agents_config = load_agents_config()
+    logger.info("Loaded %d agent configs: %s", len(agents_config.agents), list(agents_config.agents.keys()))
+
+    # Initialize model config service (per-agent model overrides + hedged fallback chains)
+    model_config_service = ModelConfigService(
+        model_config_repo, cfg.openrouter_api_key or "", fallbacks=agents_config.fallbacks,
+    )
     if cfg.openrouter_api_key:
         logger.info("Model config service initialized (per-agent overrides enabled)")
     else:
         logger.info("Model config service initialized (no shared key, overrides will be no-op)")
 
     # Initialize agent registry
-    agent_registry = AgentRegistry()
+    agent_registry = AgentRegistry(
+        default_timeout=agents_config.defaults.get("timeout_seconds", DEFAULT_AGENT_TIMEOUT),
+    )
     agent_registry.register(ExtractionAgent())
     agent_registry.register(StrategistAgent())
     agent_registry.register(TrainerAgent())
-    agent_registry.register(MemoryAgent())
+    agent_registry.register(MemoryAgent(memory_repo))
     agent_registry.register(ReanalysisStrategistAgent())
     agent_registry.register(CommentGeneratorAgent())
 
@@ -148,10 +210,6 @@ async def main() -> None:
     pipelines = load_all_pipelines()
     logger.info("Loaded %d pipelines: %s", len(pipelines), list(pipelines.keys()))
 
-    # Load agent configs from YAML
-    agents_config = load_agents_config()
-    logger.info("Loaded %d agent configs: %s", len(agents_config.agents), list(agents_config.agents.keys()))
-
     # Initialize conversation history service
     history_service = ConversationHistoryService(conversation_history_repo)
 
@@ -160,6 +218,11 @@ async def main() -> None:
     await trace_collector.start()
     logger.info("Trace collector started")
 
+    # LLM token/cost accounting (rolled up in-process, batch-persisted to llm_usage)
+    usage_aggregator = UsageAggregator(llm_usage_repo)
+    await usage_aggregator.start()
+    install_usage_aggregator(usage_aggregator)
+
     await history_service.start()
     logger.info("Conversation history service started")
 
@@ -216,6 +279,7 @@ async def main() -> None:
     )
 
     # Register routers
+    dp.include_router(errors.router)
     dp.include_router(progress.router)
     dp.include_router(start.router)
     dp.include_router(support.router)
@@ -298,6 +362,10 @@ async def main() -> None:
     try:
         await dp.start_polling(bot)
     finally:
+        # Polling has stopped, so no new pipelines start; let queued memory updates finish first
+        await background_executor.shutdown(cfg.background_drain_timeout)
+        install_background_executor(None)
+        logger.info("Background executor drained")
         await history_service.stop()
         logger.info("Conversation history service stopped")
         shutdown_langfuse()
@@ -306,7 +374,13 @@ async def main() -> None:
         if collector:
             await collector.stop()
             logger.info("Trace collector stopped")
+        install_usage_aggregator(None)
+        await usage_aggregator.stop()
         await model_config_service.close()
+        install_provider_pool(None)
+        await llm_pool.close()
+        install_response_cache(None)
+        llm_cache.close()
         await insforge.close()
         logger.info("Bot stopped.")
 
@@ -4,29 +4,119 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import yaml
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 logger = logging.getLogger(__name__)
 
 _PIPELINES_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "pipelines"
 
 
+_RESULT_PREFIXES = ("result.", "@")  # input_mapping sources that read another step's output
+
+
+def result_source(source: str) -> str | None:
+    """Agent name referenced by an input_mapping source (``result.<agent>`` or ``@<agent>``)."""
+    for prefix in _RESULT_PREFIXES:
+        if source.startswith(prefix):
+            return source[len(prefix):]
+    return None
+
+
 class StepConfig(BaseModel):
-    """Single step in a pipeline."""
+    """Single step in a pipeline.
+
+    A step starts as soon as every step it depends on has finished: the
+    agents named by ``result.<agent>`` sources in ``input_mapping`` plus any
+    listed in ``depends_on`` (for results read through ``ctx.get_result``).
+    ``mode: background`` steps are fire-and-forget — the pipeline returns
+    without waiting for them; ``sequential`` and ``parallel`` steps are
+    both awaited and differ only in name. Each run is cut off after
+    ``timeout_seconds`` (default: the agent's timeout) or when the request
+    deadline passes, whichever is sooner; background steps only get the
+    former.
+    """
     agent: str
     mode: str = "sequential"  # sequential | parallel | background
     input_mapping: dict[str, str] = {}
+    depends_on: list[str] = []  # extra upstream agents not visible in input_mapping
+    cache_ttl: float = 0  # seconds; > 0 serves identical LLM calls from the response cache
+    cache_disk: bool = True  # false keeps cached results in memory only (personal data)
+    timeout_seconds: float | None = None  # overrides the agent's timeout for this step
+
+    @property
+    def dependencies(self) -> list[str]:
+        """Upstream agents, inferred from input_mapping and ``depends_on`` (in order, no repeats)."""
+        deps = [a for a in (result_source(s) for s in self.input_mapping.values()) if a]
+        return list(dict.fromkeys([*deps, *self.depends_on]))
+
+
+class PrefetchConfig(BaseModel):
+    """Context source loaded before the first step (see bot.pipeline.prefetch).
+
+    All sources of a pipeline load concurrently. A source that fails or
+    exceeds ``timeout_seconds`` leaves ``fallback`` (default: the source's
+    empty value) in the context instead of failing the pipeline — unless
+    it is ``required``, in which case the request fails. Sources whose value
+    is written back later (user memory) must be required: a fallback would
+    overwrite the stored data.
+    """
+    source: Literal["user_memory", "casebook", "knowledge", "lead"]
+    timeout_seconds: float = 3.0
+    required: bool = False  # failure raises PrefetchError instead of using the fallback
+    params: dict[str, Any] = {}  # source-specific, e.g. casebook persona_type / scenario_type
+    fallback: Any = None
 
 
 class PipelineConfig(BaseModel):
-    """Full pipeline definition."""
+    """Full pipeline definition; the step graph is validated on load."""
     name: str
     description: str = ""
+    prefetch: list[PrefetchConfig] = []
     steps: list[StepConfig]
 
+    @model_validator(mode="after")
+    def _validate_graph(self) -> PipelineConfig:
+        self.execution_order()
+        return self
+
+    def execution_order(self) -> list[StepConfig]:
+        """Steps in dependency order (YAML order among independent steps).
+
+        Raises ``ValueError`` for duplicate agents, unknown or background
+        dependencies of awaited steps, and cycles.
+        """
+        by_agent: dict[str, StepConfig] = {}
+        for step in self.steps:
+            if step.agent in by_agent:
+                raise ValueError(f"pipeline {self.name}: agent {step.agent!r} appears twice")
+            by_agent[step.agent] = step
+
+        pending: dict[str, set[str]] = {}
+        for step in self.steps:
+            for dep in step.dependencies:
+                if dep not in by_agent:
+                    raise ValueError(f"pipeline {self.name}: {step.agent} depends on unknown step {dep!r}")
+                if by_agent[dep].mode == "background" and step.mode != "background":
+                    raise ValueError(
+                        f"pipeline {self.name}: {step.agent} would wait on background step {dep!r}"
+                    )
+            pending[step.agent] = set(step.dependencies)
+
+        order: list[StepConfig] = []
+        while pending:
+            ready = [s for s in self.steps if s.agent in pending and not pending[s.agent]]
+            if not ready:
+                raise ValueError(f"pipeline {self.name}: dependency cycle among {sorted(pending)}")
+            for step in ready:
+                del pending[step.agent]
+                order.append(step)
+            for deps in pending.values():
+                deps.difference_update(s.agent for s in ready)
+        return order
+
 
 def load_pipeline(name: str) -> PipelineConfig:
     """Load a pipeline YAML by name."""
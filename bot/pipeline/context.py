@@ -1,13 +1,19 @@
-"""Pipeline context — shared state between agents in a pipeline run."""
+"""Pipeline context — shared state for a pipeline run, and the read-only view each step gets."""
 
 from __future__ import annotations
 
+import copy
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Any
 
+from bot.services.llm_hedging import HedgedProvider
 from bot.services.llm_router import LLMProvider
 
 if TYPE_CHECKING:
     from bot.services.model_config import ModelConfigService
+    from bot.storage.models import LeadRegistryModel
 
 
 class PipelineContext:
@@ -18,8 +24,10 @@ class PipelineContext:
     Per-agent model resolution:
         When ``model_config`` is provided, ``get_llm_for_agent()`` checks for
         admin-configured model overrides.  The PipelineRunner calls this before
-        each agent step and temporarily swaps ``default_llm`` so that agents
-        transparently use the override via ``ctx.llm``.
+        each agent step and hands the agent a ``StepContext`` built by
+        ``step_view()``, whose ``llm`` is the resolved provider — the shared
+        context itself is never modified while steps run, and results are
+        written back only by the runner.
     """
 
     def __init__(
@@ -34,6 +42,7 @@ class PipelineContext:
         telegram_id: int = 0,
         user_id: int = 0,
         image_b64: str | None = None,
+        lead: LeadRegistryModel | None = None,
         model_config: ModelConfigService | None = None,
     ) -> None:
         self.default_llm = llm
@@ -45,18 +54,22 @@ class PipelineContext:
         self.telegram_id = telegram_id
         self.user_id = user_id
         self.image_b64 = image_b64
+        self.lead = lead
         self._model_config = model_config
 
         # Inter-agent results storage
         self.results: dict[str, Any] = {}
 
+        # Receives streamed LLM text deltas (e.g. ProgressUpdater.feed); None = no streaming
+        self.stream_sink: Callable[[str], Any] | None = None
+
     # ------------------------------------------------------------------
     # Backward-compatible property: agents access ctx.llm.complete(...)
     # ------------------------------------------------------------------
 
     @property
     def llm(self) -> LLMProvider:
-        """Return the current LLM provider (may be swapped by PipelineRunner)."""
+        """Return the user's default LLM provider."""
         return self.default_llm
 
     @llm.setter
@@ -74,15 +87,79 @@ class PipelineContext:
         If a ``ModelConfigService`` is available and the agent has an active
         override, returns the override provider (always OpenRouter with the
         shared API key).  Otherwise returns the user's default provider.
+        When the agent has a fallback chain, that provider is wrapped in a
+        ``HedgedProvider`` racing the fallbacks after the latency SLO.
         """
-        if self._model_config:
-            override_provider = await self._model_config.get_provider_for_agent(agent_name)
-            if override_provider:
-                return override_provider
-        return self.default_llm
+        if not self._model_config:
+            return self.default_llm
+
+        primary = await self._model_config.get_provider_for_agent(agent_name) or self.default_llm
+        fallbacks, slo = await self._model_config.get_fallback_chain(agent_name)
+        primary_model = getattr(primary, "model", None)
+        fallbacks = [f for f in fallbacks if getattr(f, "model", None) != primary_model]
+        if fallbacks:
+            return HedgedProvider(primary, fallbacks, slo=slo)
+        return primary
 
     def set_result(self, agent_name: str, result: Any) -> None:
         self.results[agent_name] = result
 
     def get_result(self, agent_name: str) -> Any:
         return self.results.get(agent_name)
+
+    def step_view(
+        self, agent_name: str, llm: LLMProvider, results: Mapping[str, Any] | None = None,
+    ) -> StepContext:
+        """Read-only view for one agent step, with its own LLM and snapshots of the inputs.
+
+        ``user_memory`` and ``scenario`` are deep-copied so a step cannot
+        change what its siblings see; ``results`` should hold only the
+        step's finished upstream results.
+        """
+        return StepContext(
+            agent=agent_name,
+            llm=llm,
+            knowledge_base=self.knowledge_base,
+            user_memory=copy.deepcopy(self.user_memory),
+            casebook_text=self.casebook_text,
+            scenario=copy.deepcopy(self.scenario),
+            user_message=self.user_message,
+            telegram_id=self.telegram_id,
+            user_id=self.user_id,
+            image_b64=self.image_b64,
+            lead=self.lead,
+            stream_sink=self.stream_sink,
+            results=MappingProxyType(dict(results or {})),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class StepContext:
+    """Immutable per-step view of a ``PipelineContext`` (see ``PipelineContext.step_view``).
+
+    Exposes the attributes agents read from the pipeline context, so agents
+    run unchanged, but has no setters: concurrent steps cannot observe each
+    other's LLM or mutate shared state. Agents report through their
+    ``AgentOutput``; the runner merges it into the pipeline's results.
+    """
+
+    agent: str
+    llm: LLMProvider
+    knowledge_base: str
+    user_memory: dict[str, Any]
+    casebook_text: str
+    scenario: dict[str, Any]
+    user_message: str
+    telegram_id: int
+    user_id: int
+    image_b64: str | None
+    lead: LeadRegistryModel | None
+    stream_sink: Callable[[str], Any] | None
+    results: Mapping[str, Any]
+
+    @property
+    def default_llm(self) -> LLMProvider:
+        return self.llm
+
+    def get_result(self, agent_name: str) -> Any:
+        return self.results.get(agent_name)
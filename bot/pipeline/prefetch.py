@@ -0,0 +1,120 @@
+"""Prefetch stage — loads the context sources a pipeline declares, concurrently, before its first step."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import logging
+import time
+from typing import Any
+
+from bot.pipeline.config_loader import PipelineConfig, PrefetchConfig
+from bot.pipeline.context import PipelineContext
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchError(RuntimeError):
+    """A ``required`` prefetch source failed, timed out or is not configured."""
+
+# source -> (PipelineContext attribute, empty value used when the source fails)
+_TARGETS: dict[str, tuple[str, Any]] = {
+    "user_memory": ("user_memory", {}),
+    "casebook": ("casebook_text", ""),
+    "knowledge": ("knowledge_base", ""),
+    "lead": ("lead", None),
+}
+
+
+class ContextPrefetcher:
+    """Fill a ``PipelineContext`` from the pipeline's ``prefetch:`` sources.
+
+    Sources:
+        user_memory  ``UserMemoryRepo.get(ctx.telegram_id)``
+        casebook     ``CasebookService.find_similar`` (params: persona_type, scenario_type)
+        knowledge    ``KnowledgeService.retrieve`` for the user message (and scenario, if any)
+        lead         ``LeadRegistryRepo.get_by_id(lead_id)``
+
+    Sources run concurrently, so setup costs the slowest source rather
+    than the sum. Each is bounded by its own timeout; a failed, slow or
+    unconfigured source leaves its fallback in the context and is logged,
+    unless it is ``required``, which raises ``PrefetchError`` once all
+    sources have finished.
+    """
+
+    def __init__(
+        self,
+        *,
+        memory_repo: Any = None,
+        casebook_service: Any = None,
+        knowledge: Any = None,
+        lead_repo: Any = None,
+    ) -> None:
+        self.memory_repo = memory_repo
+        self.casebook_service = casebook_service
+        self.knowledge = knowledge
+        self.lead_repo = lead_repo
+
+    async def run(
+        self, config: PipelineConfig, ctx: PipelineContext, *, lead_id: int | None = None,
+    ) -> dict[str, str]:
+        """Load every source into ``ctx``; returns each source's outcome (ok, timeout, error, skipped)."""
+        if not config.prefetch:
+            return {}
+        started = time.monotonic()
+        outcomes = await asyncio.gather(*(self._fetch(spec, ctx, lead_id) for spec in config.prefetch))
+        status = {spec.source: outcome for spec, outcome in zip(config.prefetch, outcomes)}
+        logger.info(
+            "Prefetch for %s done in %.0fms: %s",
+            config.name, (time.monotonic() - started) * 1000, status,
+        )
+        missing = [spec.source for spec in config.prefetch if spec.required and status[spec.source] != "ok"]
+        if missing:
+            raise PrefetchError(
+                "could not load " + ", ".join(f"{source} ({status[source]})" for source in missing)
+            )
+        return status
+
+    async def _fetch(self, spec: PrefetchConfig, ctx: PipelineContext, lead_id: int | None) -> str:
+        attr, empty = _TARGETS[spec.source]
+        outcome = "ok"
+        try:
+            async with asyncio.timeout(spec.timeout_seconds):
+                value = await self._load(spec, ctx, lead_id)
+        except TimeoutError:
+            logger.warning("Prefetch %s timed out after %.1fs", spec.source, spec.timeout_seconds)
+            value, outcome = None, "timeout"
+        except Exception as e:
+            logger.warning("Prefetch %s failed: %s", spec.source, e)
+            value, outcome = None, "error"
+        if value is None:
+            value = copy.deepcopy(spec.fallback if spec.fallback is not None else empty)  # never share the default
+            if outcome == "ok":
+                outcome = "skipped"
+        setattr(ctx, attr, value)
+        return outcome
+
+    async def _load(self, spec: PrefetchConfig, ctx: PipelineContext, lead_id: int | None) -> Any:
+        """Raw value for one source, or None when it has nothing (or is not configured)."""
+        if spec.source == "user_memory":
+            if self.memory_repo is None:
+                return None
+            record = await self.memory_repo.get(ctx.telegram_id)
+            return (record.memory_data or {}) if record else {}
+        if spec.source == "casebook":
+            if self.casebook_service is None:
+                return None
+            return await self.casebook_service.find_similar(
+                spec.params.get("persona_type", "unknown"), spec.params.get("scenario_type", "general"),
+            )
+        if spec.source == "knowledge":
+            if self.knowledge is None:
+                return None
+            query = f"{json.dumps(ctx.scenario)}\n{ctx.user_message}" if ctx.scenario else ctx.user_message
+            return self.knowledge.retrieve(query)
+        if spec.source == "lead":
+            if self.lead_repo is None or lead_id is None:
+                return None
+            return await self.lead_repo.get_by_id(lead_id)
+        raise ValueError(f"Unknown prefetch source: {spec.source}")
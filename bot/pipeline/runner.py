@@ -1,17 +1,27 @@
-"""Pipeline runner — executes agent pipelines with sequential, parallel, and background modes."""
+"""Pipeline runner — executes agent pipelines as a dependency graph, with background steps and step deadlines."""
 
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
+import time
+from collections.abc import Callable
 from typing import Any
 
-from bot.agents.base import AgentInput, AgentOutput, BaseAgent
+from bot.agents.base import AgentInput, AgentOutput
 from bot.agents.registry import AgentRegistry
-from bot.pipeline.config_loader import PipelineConfig, StepConfig
-from bot.pipeline.context import PipelineContext
-from bot.services.llm_router import LLMProvider
-from bot.task_utils import create_background_task
+from bot.pipeline.config_loader import PipelineConfig, StepConfig, result_source
+from bot.pipeline.context import PipelineContext, StepContext
+from bot.services.deadline import deadline_scope
+from bot.services.llm_cache import with_response_cache
+from bot.services.llm_usage import usage_scope
+from bot.task_utils import (
+    BackgroundExecutor,
+    BackgroundQueueFull,
+    create_background_task,
+    get_background_executor,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,128 +36,148 @@ class PipelineRunner:
         """Run a pipeline and return all agent results."""
         logger.info("Running pipeline: %s (%d steps)", config.name, len(config.steps))
 
-        # Group steps by execution mode
-        i = 0
-        while i < len(config.steps):
-            step = config.steps[i]
-
-            if step.mode == "sequential":
-                await self._run_step(step, ctx)
-                i += 1
-
-            elif step.mode == "parallel":
-                # Collect consecutive parallel steps
-                parallel_steps = [step]
-                j = i + 1
-                while j < len(config.steps) and config.steps[j].mode == "parallel":
-                    parallel_steps.append(config.steps[j])
-                    j += 1
-                await self._run_parallel(parallel_steps, ctx)
-                i = j
-
-            elif step.mode == "background":
-                self._run_background(step, ctx)
-                i += 1
-
+        # LLM usage from every step (background ones included) is billed to this pipeline and user
+        with usage_scope(pipeline=config.name, telegram_id=ctx.telegram_id or None):
+            return await self._run_steps(config, ctx)
+
+    async def _run_steps(self, config: PipelineConfig, ctx: PipelineContext) -> dict[str, Any]:
+        """Start every step once its dependencies finish; wait for all non-background steps.
+
+        Steps never write to ``ctx``: each returns its ``AgentOutput`` and
+        ``_merge_result`` (a task done-callback, so always on the event loop
+        thread) is the only writer of ``ctx.results``.
+        """
+        tasks: dict[str, asyncio.Task[AgentOutput]] = {}
+        awaited: list[asyncio.Task[AgentOutput]] = []
+        for step in config.execution_order():
+            upstream = {dep: tasks[dep] for dep in step.dependencies}
+            if step.mode == "background":
+                logger.info("Scheduling background agent: %s", step.agent)
+                task = self._schedule_background(step, ctx, upstream)
             else:
-                logger.warning("Unknown step mode: %s, running sequentially", step.mode)
-                await self._run_step(step, ctx)
-                i += 1
+                if step.mode not in ("sequential", "parallel"):
+                    logger.warning("Unknown step mode: %s, running as a regular step", step.mode)
+                task = asyncio.create_task(
+                    self._run_when_ready(step, ctx, upstream), name=f"agent_{step.agent}",
+                )
+                awaited.append(task)
+            task.add_done_callback(functools.partial(self._merge_result, ctx, step.agent))
+            tasks[step.agent] = task
 
+        try:
+            await asyncio.gather(*awaited)
+        except BaseException:
+            for task in awaited:
+                task.cancel()
+            raise
         return ctx.results
 
-    async def _run_step(self, step: StepConfig, ctx: PipelineContext) -> AgentOutput:
-        """Execute a single agent step with per-agent model resolution."""
-        agent = self.registry.get(step.agent)
-        agent_input = self._build_input(step, ctx)
-
-        logger.info("Running agent: %s (sequential)", step.agent)
-
-        # Resolve per-agent model override
-        original_llm = ctx.default_llm
+    @staticmethod
+    def _merge_result(ctx: PipelineContext, agent_name: str, task: asyncio.Task[AgentOutput]) -> None:
+        if not task.cancelled() and task.exception() is None:
+            ctx.set_result(agent_name, task.result())
+
+    @staticmethod
+    async def _upstream_results(upstream: dict[str, asyncio.Task[AgentOutput]]) -> dict[str, AgentOutput]:
+        """Wait for upstream steps; failed dependencies still leave their result for this step."""
+        if upstream:
+            await asyncio.wait(upstream.values())
+        return {name: t.result() for name, t in upstream.items() if not t.cancelled() and t.exception() is None}
+
+    async def _run_when_ready(
+        self, step: StepConfig, ctx: PipelineContext, upstream: dict[str, asyncio.Task[AgentOutput]],
+    ) -> AgentOutput:
+        return await self._run_step(step, ctx, await self._upstream_results(upstream))
+
+    def _schedule_background(
+        self, step: StepConfig, ctx: PipelineContext, upstream: dict[str, asyncio.Task[AgentOutput]],
+    ) -> asyncio.Task[AgentOutput]:
+        """Run a background step on the background executor once its upstream steps finish.
+
+        Waiting happens in a lightweight task so only the step itself
+        occupies an executor worker. Without an installed executor the step
+        runs as an untracked background task.
+        """
+        name = f"bg_agent_{step.agent}"
+        executor = get_background_executor()
+        if executor is None:
+            return create_background_task(self._run_when_ready(step, ctx, upstream), name=name)
+        release = executor.reserve()  # shutdown keeps intake open until this step is queued
+        task = create_background_task(self._submit_when_ready(step, ctx, upstream, executor, release), name=name)
+        task.add_done_callback(lambda _: release())
+        return task
+
+    async def _submit_when_ready(
+        self,
+        step: StepConfig,
+        ctx: PipelineContext,
+        upstream: dict[str, asyncio.Task[AgentOutput]],
+        executor: BackgroundExecutor,
+        release: Callable[[], None],
+    ) -> AgentOutput:
+        # One queued job per agent and user: the executor may coalesce or reject per its overflow policy
+        key = f"{step.agent}:{ctx.telegram_id}" if ctx.telegram_id else None
         try:
-            override_llm = await ctx.get_llm_for_agent(step.agent)
-            ctx.default_llm = override_llm  # Temporarily swap so agent sees override via ctx.llm
-
-            output = await agent.run(agent_input, ctx)
-            ctx.set_result(step.agent, output)
-            logger.info("Agent %s completed: success=%s", step.agent, output.success)
-            return output
-        except Exception as e:
-            logger.error("Agent %s failed: %s", step.agent, e)
-            error_output = AgentOutput(success=False, error=str(e))
-            ctx.set_result(step.agent, error_output)
-            return error_output
-        finally:
-            ctx.default_llm = original_llm  # Restore default
-
-    async def _run_parallel(self, steps: list[StepConfig], ctx: PipelineContext) -> None:
-        """Execute multiple agents concurrently with per-agent model resolution."""
-        logger.info("Running %d agents in parallel", len(steps))
-
-        # Pre-resolve per-agent overrides before launching tasks
-        agent_llms: dict[str, LLMProvider] = {}
-        for step in steps:
-            agent_llms[step.agent] = await ctx.get_llm_for_agent(step.agent)
-
-        async def _run_one(step: StepConfig) -> tuple[str, AgentOutput]:
-            agent = self.registry.get(step.agent)
-            agent_input = self._build_input(step, ctx)
-
-            # Each parallel task uses its own resolved LLM
-            original_llm = ctx.default_llm
             try:
-                ctx.default_llm = agent_llms[step.agent]
-                output = await agent.run(agent_input, ctx)
-                return step.agent, output
-            except Exception as e:
-                logger.error("Parallel agent %s failed: %s", step.agent, e)
-                return step.agent, AgentOutput(success=False, error=str(e))
+                results = await self._upstream_results(upstream)
+                job = await executor.submit(
+                    self._run_step(step, ctx, results), key=key, name=f"bg_agent_{step.agent}",
+                )
             finally:
-                ctx.default_llm = original_llm
-
-        results = await asyncio.gather(*[_run_one(s) for s in steps])
-        for agent_name, output in results:
-            ctx.set_result(agent_name, output)
-
-    def _run_background(self, step: StepConfig, ctx: PipelineContext) -> None:
-        """Fire-and-forget an agent as a background task with per-agent model resolution."""
-        logger.info("Starting background agent: %s", step.agent)
-
-        async def _bg_task() -> None:
-            # Resolve per-agent model override
-            original_llm = ctx.default_llm
+                release()
+            return await job
+        except BackgroundQueueFull as e:  # rejected, or superseded while queued (coalesce)
+            logger.warning("Background agent %s not run: %s", step.agent, e)
+            return AgentOutput(success=False, error=str(e))
+
+    async def _run_step(
+        self, step: StepConfig, ctx: PipelineContext, results: dict[str, AgentOutput],
+    ) -> AgentOutput:
+        """Execute a single agent step on its own ``StepContext``, bounded by its timeout."""
+        logger.info("Running agent: %s (%s)", step.agent, step.mode)
+
+        budget = step.timeout_seconds or self.registry.timeout_for(step.agent)
+        started = time.monotonic()
+        # Background steps outlive the request, so they are not bound by its deadline
+        with deadline_scope(budget, detach=step.mode == "background") as deadline:
             try:
-                override_llm = await ctx.get_llm_for_agent(step.agent)
-                ctx.default_llm = override_llm
-
                 agent = self.registry.get(step.agent)
-                agent_input = self._build_input(step, ctx)
-                output = await agent.run(agent_input, ctx)
-                ctx.set_result(step.agent, output)
-                logger.info("Background agent %s completed", step.agent)
+                async with asyncio.timeout(deadline.remaining()):
+                    # Per-agent model override, resolved into this step's view only
+                    llm = with_response_cache(
+                        await ctx.get_llm_for_agent(step.agent), step.cache_ttl, persist=step.cache_disk,
+                    )
+                    step_ctx = ctx.step_view(step.agent, llm, results)
+                    agent_input = self._build_input(step, step_ctx)
+
+                    with usage_scope(step.agent):
+                        output = await agent.run(agent_input, step_ctx)
+                if not output.success and deadline.exceeded:
+                    output.timed_out = True  # the agent caught DeadlineExceeded from its LLM call
+                logger.info("Agent %s completed: success=%s", step.agent, output.success)
+                return output
+            except TimeoutError:
+                waited = time.monotonic() - started
+                logger.warning("Agent %s timed out after %.1fs (step timeout %.0fs)", step.agent, waited, budget)
+                return AgentOutput(success=False, error=f"{step.agent} timed out after {waited:.0f}s", timed_out=True)
             except Exception as e:
-                logger.error("Background agent %s failed: %s", step.agent, e)
-            finally:
-                ctx.default_llm = original_llm
-
-        create_background_task(_bg_task(), name=f"bg_agent_{step.agent}")
+                logger.error("Agent %s failed: %s", step.agent, e)
+                return AgentOutput(success=False, error=str(e))
 
-    def _build_input(self, step: StepConfig, ctx: PipelineContext) -> AgentInput:
-        """Build agent input from step config and pipeline context."""
+    def _build_input(self, step: StepConfig, step_ctx: StepContext) -> AgentInput:
+        """Build agent input from step config and the step's view of the pipeline context."""
         context_data: dict[str, Any] = {}
 
         for target_key, source in step.input_mapping.items():
             if source.startswith("ctx."):
                 attr = source[4:]
-                context_data[target_key] = getattr(ctx, attr, None)
-            elif source.startswith("result."):
-                agent_name = source[7:]
-                context_data[target_key] = ctx.get_result(agent_name)
+                context_data[target_key] = getattr(step_ctx, attr, None)
+            elif (agent_name := result_source(source)) is not None:
+                context_data[target_key] = step_ctx.get_result(agent_name)
             else:
                 context_data[target_key] = source
 
         return AgentInput(
-            user_message=ctx.user_message,
+            user_message=step_ctx.user_message,
             context=context_data,
         )
@@ -47,13 +47,10 @@ class TeamAnalyticsService:
 
     async def scenario_difficulty_analysis(self) -> list[dict[str, Any]]:
         """Find hardest/easiest scenarios based on average scores across team."""
-        all_attempts = await self.attempt_repo.client.query(
-            "attempts", select="scenario_id,score,mode"
-        )
-        all_attempts = all_attempts if isinstance(all_attempts, list) else []
-
         scenario_data: dict[str, dict] = {}
-        for a in all_attempts:
+        async for a in self.attempt_repo.client.query_iter(
+            "attempts", select="scenario_id,score,mode"
+        ):
             sid = a.get("scenario_id", "?")
             if sid not in scenario_data:
                 scenario_data[sid] = {"total_score": 0, "count": 0, "mode": a.get("mode", "?")}
@@ -75,14 +72,11 @@ class TeamAnalyticsService:
 
     async def category_performance(self) -> dict[str, dict[str, Any]]:
         """Average scores by scenario category."""
-        all_attempts = await self.attempt_repo.client.query(
-            "attempts", select="scenario_id,score,feedback_json"
-        )
-        all_attempts = all_attempts if isinstance(all_attempts, list) else []
-
         # We'll approximate category from scenario_id prefix
         category_data: dict[str, dict] = {}
-        for a in all_attempts:
+        async for a in self.attempt_repo.client.query_iter(
+            "attempts", select="scenario_id,score"
+        ):
             sid = a.get("scenario_id", "")
             # Infer category: learn_X_Y → learn, train_N → train, gen_X → generated
             if sid.startswith("learn_"):
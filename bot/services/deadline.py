@@ -0,0 +1,107 @@
+"""Request deadlines — a time budget that follows a request from the handler down to each LLM call."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import time
+from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUEST_BUDGET = 180.0  # seconds for one pipeline run, from the handler's point of view
+MIN_REQUEST_TIMEOUT = 1.0  # seconds; an HTTP attempt is not started with less budget than this
+
+
+class DeadlineExceeded(TimeoutError):
+    """The remaining budget cannot cover the next attempt."""
+
+
+class Deadline:
+    """An absolute ``time.monotonic()`` deadline.
+
+    ``exceeded`` is set when code running under this deadline gives up
+    because of it, so callers can tell a timeout from an ordinary failure
+    even when an agent turned the exception into an error result.
+    """
+
+    __slots__ = ("at", "exceeded")
+
+    def __init__(self, at: float) -> None:
+        self.at = at
+        self.exceeded = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.at - time.monotonic())
+
+    def check(self, need: float = 0.0) -> None:
+        """Raise ``DeadlineExceeded`` unless more than ``need`` seconds remain."""
+        if self.remaining() <= need:
+            self.exceeded = True
+            raise DeadlineExceeded(f"deadline reached ({self.remaining():.1f}s left, {need:.1f}s needed)")
+
+
+_deadline: contextvars.ContextVar[Deadline | None] = contextvars.ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _deadline.get()
+
+
+def remaining() -> float | None:
+    """Seconds left in the current budget (None when unbounded)."""
+    deadline = _deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: float | None, *, detach: bool = False) -> Iterator[Deadline | None]:
+    """Bound the block to ``seconds`` from now, never later than the enclosing deadline.
+
+    ``seconds=None`` keeps the enclosing deadline. ``detach=True`` ignores
+    it — for background work that outlives the request that started it.
+    """
+    outer = None if detach else _deadline.get()
+    if seconds is None:
+        deadline = outer
+    else:
+        at = time.monotonic() + max(0.0, seconds)
+        deadline = Deadline(min(at, outer.at) if outer is not None else at)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def request_timeout(default: float) -> float:
+    """HTTP timeout for one attempt: ``default`` capped by the remaining budget."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    deadline.check(MIN_REQUEST_TIMEOUT)
+    return min(default, deadline.remaining())
+
+
+async def backoff(delay: float) -> None:
+    """Sleep before a retry, or raise ``DeadlineExceeded`` if no attempt would fit afterwards."""
+    deadline = _deadline.get()
+    if deadline is not None:
+        deadline.check(delay + MIN_REQUEST_TIMEOUT)
+    await asyncio.sleep(delay)
+
+
+_request_budget: float | None = DEFAULT_REQUEST_BUDGET
+
+
+def install_request_budget(seconds: float | None) -> None:
+    """Set the end-to-end budget ``request_deadline()`` gives each request (None or 0 = unbounded)."""
+    global _request_budget
+    _request_budget = seconds or None
+
+
+def request_deadline() -> contextlib.AbstractContextManager[Deadline | None]:
+    """``deadline_scope`` with the installed per-request budget; handlers wrap pipeline runs in it."""
+    return deadline_scope(_request_budget)
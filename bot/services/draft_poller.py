@@ -12,6 +12,7 @@ from bot.agents.base import AgentInput
 from bot.agents.registry import AgentRegistry
 from bot.pipeline.context import PipelineContext
 from bot.services.image_utils import pre_resize_image
+from bot.services.llm_cache import with_response_cache
 from bot.services.llm_router import create_provider
 from bot.services.model_config import ModelConfigService
 from bot.storage.insforge_client import InsForgeClient
@@ -20,6 +21,7 @@ from bot.storage.repositories import DraftRequestRepo, LeadRegistryRepo
 logger = logging.getLogger(__name__)
 
 POLL_INTERVAL = 3  # seconds
+DRAFT_CACHE_TTL = 3600  # seconds; a re-submitted proof with the same instructions reuses the drafts
 
 
 async def _fetch_and_encode_image(
@@ -117,7 +119,9 @@ async def _process_draft_request(
         )
 
         # Resolve per-agent model override (always returns a provider)
-        ctx.llm = await ctx.get_llm_for_agent(agent.name)
+        llm = with_response_cache(
+            await ctx.get_llm_for_agent(agent.name), DRAFT_CACHE_TTL, persist=False,
+        )
 
         agent_input = AgentInput(
             user_message="Generate contextual response options from this screenshot.",
@@ -127,7 +131,7 @@ async def _process_draft_request(
             },
         )
 
-        output = await agent.run(agent_input, ctx)
+        output = await agent.run(agent_input, ctx.step_view(agent.name, llm))
 
         if output.success:
             await draft_repo.complete(request.id, output.data)
@@ -7,7 +7,9 @@ import logging
 from pathlib import Path
 from typing import Any
 
-from bot.services.llm_router import LLMProvider, OpenRouterProvider, _extract_json
+from bot.agents.schemas import EngagementPlanResult
+from bot.services.llm_router import LLMProvider, create_provider
+from bot.services.llm_usage import usage_scope
 from bot.storage.models import LeadActivityModel, LeadRegistryModel
 
 logger = logging.getLogger(__name__)
@@ -27,7 +29,8 @@ class EngagementService:
         self.api_key = openrouter_api_key
 
     def _create_llm(self) -> LLMProvider:
-        return OpenRouterProvider(self.api_key, model="moonshotai/kimi-k2.5")
+        """Lease the shared OpenRouter provider (``close()`` returns it to the pool)."""
+        return create_provider("openrouter", self.api_key, model="moonshotai/kimi-k2.5")
 
     async def generate_plan(
         self, lead: LeadRegistryModel, research: str | None = None
@@ -55,28 +58,9 @@ class EngagementService:
 
         llm = self._create_llm()
         try:
-            result = await llm.complete(system_prompt, user_message)
-
-            # The result might be a list wrapped in a dict or directly a list
-            if isinstance(result, dict):
-                # Check if it contains a list at top level
-                for key in ("steps", "plan", "engagement_plan"):
-                    if key in result and isinstance(result[key], list):
-                        return result[key]
-                # If raw_response, try to parse as JSON array
-                raw = result.get("raw_response", "")
-                if raw:
-                    try:
-                        parsed = json.loads(raw)
-                        if isinstance(parsed, list):
-                            return parsed
-                    except json.JSONDecodeError:
-                        pass
-                return []
-
-            if isinstance(result, list):
-                return result
-            return []
+            with usage_scope("engagement_plan", telegram_id=lead.telegram_id):
+                result = await llm.complete(system_prompt, user_message, schema=EngagementPlanResult)
+            return result["steps"]
         except Exception as e:
             logger.error("Failed to generate engagement plan: %s", e)
             return []
@@ -105,9 +89,10 @@ class EngagementService:
 
         llm = self._create_llm()
         try:
-            result = await llm.complete(
-                system_prompt, user_message, image_b64=screenshot_b64
-            )
+            with usage_scope("comment_generator", telegram_id=lead.telegram_id):
+                result = await llm.complete(
+                    system_prompt, user_message, image_b64=screenshot_b64
+                )
             # Return as text
             if isinstance(result, dict):
                 return result.get("raw_response", "") or json.dumps(result)
@@ -167,7 +152,8 @@ class EngagementService:
 
         llm = self._create_llm()
         try:
-            result = await llm.complete(system_prompt, user_message)
+            with usage_scope("lead_advisor", telegram_id=lead.telegram_id):
+                result = await llm.complete(system_prompt, user_message)
             if isinstance(result, dict):
                 return result.get("raw_response", "") or json.dumps(result)
             return str(result)
@@ -166,7 +166,7 @@ async def _send_stale_digest(
 
     try:
         # Fetch all active leads (not closed)
-        all_leads = await lead_repo.get_all(limit=500)
+        all_leads = await lead_repo.get_all_summaries(limit=500)
     except Exception as e:
         logger.error("Failed to query leads for stale digest: %s", e)
         return
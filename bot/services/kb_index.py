@@ -0,0 +1,154 @@
+"""Heading-aware chunking and BM25 retrieval over the markdown knowledge base."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+MAX_CHUNK_CHARS = 2400  # ~600 tokens; longer sections are split on paragraph boundaries
+MIN_CHUNK_CHARS = 80  # heading-only / near-empty sections are dropped
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:['.-][a-z0-9]+)*")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in into is it its "
+    "me my no not of on or our so than that the their them then there these they this to "
+    "us was we were what when where which who why will with you your".split()
+)
+
+# BM25 parameters (standard Okapi defaults)
+_K1 = 1.5
+_B = 0.75
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars per token for English prose)."""
+    return len(text) // 4 + 1
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+@dataclass
+class KBChunk:
+    """One retrievable section of a knowledge file."""
+
+    source: str  # display name, e.g. "Sales Playbook"
+    headings: tuple[str, ...]  # heading path from the document root
+    text: str  # section body including its own heading line
+    position: int  # order within the whole knowledge base
+    tokens: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.tokens = estimate_tokens(self.render())
+
+    def render(self) -> str:
+        path = " › ".join((self.source, *self.headings[:-1]))
+        return f"[{path}]\n{self.text}"
+
+
+def _split_long(text: str, max_chars: int) -> list[str]:
+    """Split on blank lines into pieces no longer than ``max_chars`` (when possible)."""
+    pieces: list[str] = []
+    current = ""
+    for para in re.split(r"\n\s*\n", text):
+        candidate = f"{current}\n\n{para}" if current else para
+        if len(candidate) > max_chars and current:
+            pieces.append(current)
+            current = para
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_markdown(
+    text: str, source: str, *, start: int = 0, max_chars: int = MAX_CHUNK_CHARS,
+) -> list[KBChunk]:
+    """Split markdown at headings, keeping each chunk's heading path for context."""
+    chunks: list[KBChunk] = []
+    stack: list[tuple[int, str]] = []
+    lines: list[str] = []
+
+    def flush() -> None:
+        body = "\n".join(lines).strip()
+        lines.clear()
+        if len(body) < MIN_CHUNK_CHARS:
+            return
+        headings = tuple(title for _, title in stack)
+        for piece in _split_long(body, max_chars):
+            chunks.append(KBChunk(source, headings, piece, start + len(chunks)))
+
+    for line in text.splitlines():
+        m = _HEADING_RE.match(line)
+        if m:
+            flush()
+            level = len(m.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, m.group(2).strip("# ")))
+        lines.append(line)
+    flush()
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of chunks; headings count double."""
+
+    def __init__(self, chunks: list[KBChunk]) -> None:
+        self.chunks = chunks
+        self._tf: list[Counter[str]] = []
+        self._len: list[int] = []
+        df: Counter[str] = Counter()
+        for chunk in chunks:
+            terms = tokenize(chunk.text) + tokenize(" ".join(chunk.headings))
+            tf = Counter(terms)
+            self._tf.append(tf)
+            self._len.append(len(terms))
+            df.update(tf.keys())
+        n = len(chunks)
+        self._avg_len = sum(self._len) / n if n else 0.0
+        self._idf = {t: math.log(1 + (n - d + 0.5) / (d + 0.5)) for t, d in df.items()}
+
+    def scores(self, query: str) -> list[float]:
+        terms = set(tokenize(query))
+        out: list[float] = []
+        for tf, length in zip(self._tf, self._len):
+            score = 0.0
+            norm = _K1 * (1 - _B + _B * length / self._avg_len) if self._avg_len else _K1
+            for t in terms:
+                f = tf.get(t)
+                if f:
+                    score += self._idf[t] * f * (_K1 + 1) / (f + norm)
+            out.append(score)
+        return out
+
+    def search(
+        self, query: str, budget_tokens: int, *, exclude: frozenset[int] = frozenset(),
+    ) -> list[KBChunk]:
+        """Best-scoring chunks that fit in ``budget_tokens``, returned in document order.
+
+        Chunks whose position is in ``exclude`` are never picked. When nothing
+        matches (empty or off-topic query), the opening chunks of the
+        knowledge base are used instead.
+        """
+        scores = self.scores(query)
+        ranked = sorted(
+            (i for i, s in enumerate(scores) if s > 0), key=lambda i: scores[i], reverse=True,
+        ) or list(range(len(self.chunks)))
+
+        picked: list[KBChunk] = []
+        used = 0
+        for i in ranked:
+            chunk = self.chunks[i]
+            if chunk.position in exclude or used + chunk.tokens > budget_tokens:
+                continue
+            picked.append(chunk)
+            used += chunk.tokens
+        picked.sort(key=lambda c: c.position)
+        return picked
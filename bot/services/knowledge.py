@@ -5,17 +5,36 @@ from __future__ import annotations
 import logging
 from pathlib import Path
 
+from bot.services.kb_index import BM25Index, KBChunk, chunk_markdown
+from bot.services.llm_router import CACHE_BREAKPOINT
+
 logger = logging.getLogger(__name__)
 
 _BASE_DIR = Path(__file__).resolve().parent.parent.parent / "data"
 
+DEFAULT_RETRIEVAL_BUDGET = 2500  # tokens of KB per prompt; 0 = always inject the full KB
+DEFAULT_CORE_BUDGET = 1200  # tokens of that budget spent on the fixed opening sections
+
 
 class KnowledgeService:
-    """Loads and caches knowledge base files."""
+    """Loads and caches knowledge base files.
+
+    ``load()`` also splits both files into heading-aware chunks and builds a
+    BM25 index, so prompts can carry only the sections relevant to the
+    prospect or scenario via ``retrieve()``.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        retrieval_budget: int = DEFAULT_RETRIEVAL_BUDGET,
+        core_budget: int = DEFAULT_CORE_BUDGET,
+    ) -> None:
         self._playbook: str = ""
         self._company_knowledge: str = ""
+        self.retrieval_budget = retrieval_budget
+        self.core_budget = core_budget
+        self._index: BM25Index | None = None
 
     def load(self) -> None:
         """Load knowledge files from disk. Call once at startup."""
@@ -34,6 +53,11 @@ class KnowledgeService:
         else:
             logger.warning("company_knowledge.md not found at %s", company_path)
 
+        chunks = chunk_markdown(self._playbook, "Sales Playbook")
+        chunks += chunk_markdown(self._company_knowledge, "Company Knowledge", start=len(chunks))
+        self._index = BM25Index(chunks)
+        logger.info("Indexed knowledge base: %d chunks", len(chunks))
+
     @property
     def playbook(self) -> str:
         return self._playbook
@@ -51,3 +75,46 @@ class KnowledgeService:
         if self._company_knowledge:
             parts.append("## Company Knowledge\n\n" + self._company_knowledge)
         return "\n\n---\n\n".join(parts)
+
+    @property
+    def chunks(self) -> list[KBChunk]:
+        return self._index.chunks if self._index else []
+
+    def retrieve(self, query: str, budget_tokens: int | None = None) -> str:
+        """Most relevant KB sections for ``query``, within ``budget_tokens``.
+
+        The result opens with a fixed core (the first sections of the KB, up
+        to ``core_budget`` or half the budget) that is identical for every
+        query, then ``CACHE_BREAKPOINT``, then the sections picked for
+        ``query``. Agents cache the system prompt up to the first breakpoint,
+        so only the stable core lands in the cached prefix.
+
+        Falls back to ``combined`` (no breakpoint) when retrieval is disabled
+        (budget 0) or the whole knowledge base already fits in the budget.
+        """
+        budget = self.retrieval_budget if budget_tokens is None else budget_tokens
+        if budget <= 0 or self._index is None:
+            return self.combined
+        if sum(c.tokens for c in self._index.chunks) <= budget:
+            return self.combined
+        core = self._core(min(self.core_budget, budget // 2))
+        core_tokens = sum(c.tokens for c in core)
+        picked = self._index.search(
+            query, budget - core_tokens, exclude=frozenset(c.position for c in core),
+        )
+        return _render(core) + CACHE_BREAKPOINT + _render(picked)
+
+    def _core(self, budget_tokens: int) -> list[KBChunk]:
+        """Leading chunks of the KB that fit in ``budget_tokens`` (same for every query)."""
+        core: list[KBChunk] = []
+        used = 0
+        for chunk in self.chunks:
+            if used + chunk.tokens > budget_tokens:
+                break
+            core.append(chunk)
+            used += chunk.tokens
+        return core
+
+
+def _render(chunks: list[KBChunk]) -> str:
+    return "\n\n---\n\n".join(c.render() for c in chunks)
@@ -0,0 +1,307 @@
+"""Content-addressed LLM response cache — in-memory LRU in front of a SQLite disk tier."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import os
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from bot.services.llm_router import LLMProvider, TextResponse, ToolCallResponse, _extract_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_ENTRIES = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+def cache_key(
+    model: str | None,
+    system_prompt: str,
+    user_message: str,
+    image_b64: str | None = None,
+    temperature: float | None = None,
+    schema: str | None = None,
+) -> str:
+    """SHA-256 over every input that can change the completion."""
+    h = hashlib.sha256()
+    for part in (model or "", system_prompt, user_message, image_b64 or "", repr(temperature), schema or ""):
+        h.update(part.encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def _cacheable(result: dict[str, Any]) -> bool:
+    # Unparseable or errored completions are never stored
+    return bool(result) and "raw_response" not in result and "error" not in result
+
+
+class LLMResponseCache:
+    """Two-tier cache of parsed ``complete()`` results keyed by ``cache_key``.
+
+    The memory tier is an LRU of at most ``memory_entries``; the optional
+    SQLite tier at ``path`` survives restarts and is trimmed to
+    ``disk_entries`` by last access. Each entry carries its own expiry so
+    agents can use different TTLs against one cache. Entries stored with
+    ``persist=False`` (e.g. extracted personal data) never reach the disk.
+    The SQLite file is created readable by the owner only.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        disk_entries: int = DEFAULT_DISK_ENTRIES,
+    ) -> None:
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+            os.chmod(path, 0o600)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(_SCHEMA)
+            self._db.commit()
+        self._lock = asyncio.Lock()  # serializes access to the SQLite connection
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if now < expires_at:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._memory[key]
+
+        if self._db is not None:
+            row = await self._disk(self._disk_get, key, now)
+            if row is not None:
+                expires_at, value = row
+                self._remember(key, expires_at, value)
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: dict[str, Any], ttl: float, *, persist: bool = True) -> None:
+        if ttl <= 0 or not _cacheable(value):
+            return
+        expires_at = time.time() + ttl
+        # Own copy: the caller keeps mutating the dict it was handed
+        self._remember(key, expires_at, copy.deepcopy(value))
+        self.stores += 1
+        if persist and self._db is not None:
+            await self._disk(self._disk_set, key, json.dumps(value), expires_at)
+
+    def _remember(self, key: str, expires_at: float, value: dict[str, Any]) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # -- SQLite tier (blocking calls run in a worker thread) ---------------
+
+    async def _disk(self, fn: Any, *args: Any) -> Any:
+        async with self._lock:
+            try:
+                return await asyncio.to_thread(fn, *args)
+            except sqlite3.Error as e:
+                logger.warning("LLM cache disk tier error, continuing without it: %s", e)
+                return None
+
+    def _disk_get(self, key: str, now: float) -> tuple[float, dict[str, Any]] | None:
+        assert self._db is not None
+        row = self._db.execute(
+            "SELECT value, expires_at FROM llm_responses WHERE key = ?", (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+        self._db.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._db.commit()
+        return row[1], json.loads(row[0])
+
+    def _disk_set(self, key: str, value: str, expires_at: float) -> None:
+        assert self._db is not None
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO llm_responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, value, expires_at, now),
+        )
+        self._db.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM llm_responses WHERE key NOT IN "
+            "(SELECT key FROM llm_responses ORDER BY accessed_at DESC LIMIT ?)",
+            (self.disk_entries,),
+        )
+        self._db.commit()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "memory_size": len(self._memory),
+            "disk": self._db is not None,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        self._memory.clear()
+
+
+class CachedProvider(LLMProvider):
+    """Serves ``complete()``/``complete_stream()`` from an ``LLMResponseCache``.
+
+    Hits are deep copies, so callers may mutate what they get back. With
+    ``persist=False`` results stay in the memory tier only. Tool-calling and
+    key validation pass straight through. ``close()`` closes the wrapped
+    provider (releasing a pool lease if it is one).
+    """
+
+    def __init__(
+        self, provider: LLMProvider, cache: LLMResponseCache, ttl: float, *, persist: bool = True,
+    ) -> None:
+        self._provider = provider
+        self._cache = cache
+        self._ttl = ttl
+        self._persist = persist
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._provider, name)
+
+    def _key(
+        self,
+        system_prompt: str,
+        user_message: str,
+        image_b64: str | None,
+        schema: type[BaseModel] | None = None,
+    ) -> str:
+        return cache_key(
+            getattr(self._provider, "model", None),
+            system_prompt,
+            user_message,
+            image_b64,
+            getattr(self._provider, "temperature", None),
+            schema.__name__ if schema is not None else None,
+        )
+
+    async def complete(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> dict[str, Any]:
+        key = self._key(system_prompt, user_message, image_b64, schema)
+        cached = await self._cache.get(key)
+        if cached is not None:
+            logger.debug("LLM cache hit (%s)", key[:12])
+            return copy.deepcopy(cached)
+        result = await self._provider.complete(system_prompt, user_message, image_b64=image_b64, schema=schema)
+        await self._cache.set(key, result, self._ttl, persist=self._persist)
+        return result
+
+    async def complete_stream(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str]:
+        key = self._key(system_prompt, user_message, image_b64, schema)
+        cached = await self._cache.get(key)
+        if cached is not None:
+            yield json.dumps(cached)
+            return
+        parts: list[str] = []
+        async for delta in self._provider.complete_stream(
+            system_prompt, user_message, image_b64=image_b64, schema=schema,
+        ):
+            parts.append(delta)
+            yield delta
+        await self._cache.set(key, _extract_json("".join(parts)), self._ttl, persist=self._persist)
+
+    async def complete_with_tools(
+        self,
+        system_prompt: str,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        *,
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+    ) -> TextResponse | ToolCallResponse:
+        return await self._provider.complete_with_tools(
+            system_prompt, messages, tools,
+            model=model, temperature=temperature, max_tokens=max_tokens,
+        )
+
+    async def validate_key(self) -> bool:
+        return await self._provider.validate_key()
+
+    async def close(self) -> None:
+        await self._provider.close()
+
+
+_cache: LLMResponseCache | None = None
+
+
+def install_response_cache(cache: LLMResponseCache | None) -> None:
+    """Make ``cache`` the process-wide cache used by ``with_response_cache``."""
+    global _cache
+    _cache = cache
+
+
+def get_response_cache() -> LLMResponseCache | None:
+    return _cache
+
+
+def with_response_cache(llm: LLMProvider, ttl: float, *, persist: bool = True) -> LLMProvider:
+    """Wrap ``llm`` so identical calls within ``ttl`` seconds are served from cache.
+
+    ``persist=False`` keeps results out of the disk tier. Returns ``llm``
+    unchanged when ``ttl`` is 0 or no cache is installed.
+    """
+    if ttl <= 0 or _cache is None or isinstance(llm, CachedProvider):
+        return llm
+    return CachedProvider(llm, _cache, ttl, persist=persist)
@@ -0,0 +1,300 @@
+"""Hedged LLM requests across a model fallback chain, driven by per-model latency histograms."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from pydantic import BaseModel
+
+from bot.services.llm_router import LLMProvider, TextResponse, ToolCallResponse
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds (last bucket is open-ended)
+LATENCY_BUCKETS = (0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120)
+MIN_SAMPLES = 20  # observations before a model's p95 drives its hedge delay
+MIN_HEDGE_AFTER = 2.0  # seconds; never hedge sooner than this
+DEFAULT_HEDGE_AFTER = 30.0  # seconds; used with no SLO and too few samples
+HEDGE_QUANTILE = 0.95
+
+# Messages a hedged stream's pump task hands to the consumer
+_DELTA, _ERROR, _END = "delta", "error", "end"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate quantiles."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th observation (None if empty)."""
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return float(LATENCY_BUCKETS[i]) if i < len(LATENCY_BUCKETS) else float(LATENCY_BUCKETS[-1]) * 2
+        return float(LATENCY_BUCKETS[-1]) * 2
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "count": self.total,
+            "mean": round(self.sum / self.total, 2) if self.total else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+class LatencyTracker:
+    """Latency histograms keyed by (model, kind); kind is "complete" or "ttft"."""
+
+    def __init__(self) -> None:
+        self._histograms: dict[tuple[str, str], LatencyHistogram] = {}
+
+    def observe(self, model: str, kind: str, seconds: float) -> None:
+        hist = self._histograms.get((model, kind))
+        if hist is None:
+            hist = self._histograms[(model, kind)] = LatencyHistogram()
+        hist.observe(seconds)
+
+    def hedge_after(self, model: str, kind: str, slo: float | None) -> float:
+        """Seconds to wait on ``model`` before hedging: its p95, capped by the SLO."""
+        hist = self._histograms.get((model, kind))
+        p95 = hist.quantile(HEDGE_QUANTILE) if hist and hist.total >= MIN_SAMPLES else None
+        if slo is None:
+            delay = p95 if p95 is not None else DEFAULT_HEDGE_AFTER
+        else:
+            delay = min(slo, p95) if p95 is not None else slo
+        return max(MIN_HEDGE_AFTER, delay)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {f"{model} ({kind})": h.stats() for (model, kind), h in sorted(self._histograms.items())}
+
+
+latency_tracker = LatencyTracker()
+
+
+def _model_name(provider: LLMProvider) -> str:
+    return getattr(provider, "model", None) or type(provider).__name__
+
+
+def _good(result: dict[str, Any]) -> bool:
+    return bool(result) and "raw_response" not in result and "error" not in result
+
+
+async def _cancel_all(tasks: list[asyncio.Task[Any]]) -> None:
+    for t in tasks:
+        t.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class HedgedProvider(LLMProvider):
+    """Primary provider plus ordered fallbacks, raced after a latency-driven delay.
+
+    The primary starts alone. If it has not answered within
+    ``latency_tracker.hedge_after(...)`` (its observed p95, capped by the
+    agent's SLO), or fails, the next model in the chain is started too. The
+    first good response wins; the rest are cancelled. Tool calls go to the
+    primary only. ``close()`` is a no-op — the wrapped providers are owned
+    by their callers.
+    """
+
+    def __init__(
+        self,
+        primary: LLMProvider,
+        fallbacks: list[LLMProvider],
+        *,
+        slo: float | None = None,
+        tracker: LatencyTracker = latency_tracker,
+    ) -> None:
+        self._chain = [primary, *fallbacks]
+        self._slo = slo
+        self._tracker = tracker
+        self.hedges = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._chain[0], name)
+
+    def _delay(self, provider: LLMProvider, kind: str) -> float:
+        return self._tracker.hedge_after(_model_name(provider), kind, self._slo)
+
+    async def complete(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> dict[str, Any]:
+        async def attempt(provider: LLMProvider) -> dict[str, Any]:
+            started = time.monotonic()
+            result = await provider.complete(system_prompt, user_message, image_b64=image_b64, schema=schema)
+            if _good(result):
+                self._tracker.observe(_model_name(provider), "complete", time.monotonic() - started)
+            return result
+
+        running: dict[asyncio.Task[dict[str, Any]], LLMProvider] = {}
+        pending_chain = list(self._chain)
+        fallback_result: dict[str, Any] | None = None
+        last_error: BaseException | None = None
+
+        def launch() -> LLMProvider:
+            provider = pending_chain.pop(0)
+            running[asyncio.create_task(attempt(provider))] = provider
+            return provider
+
+        newest = launch()
+        try:
+            while running:
+                timeout = self._delay(newest, "complete") if pending_chain else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges += 1
+                    newest = launch()
+                    logger.info("Hedging LLM call: %s slow, also trying %s", _model_name(self._chain[0]), _model_name(newest))
+                    continue
+                for task in done:
+                    provider = running.pop(task)
+                    if task.exception() is None and _good(task.result()):
+                        return task.result()
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        logger.warning("LLM %s failed in hedge chain: %s", _model_name(provider), last_error)
+                    elif fallback_result is None:
+                        fallback_result = task.result()
+                if not running and pending_chain:
+                    newest = launch()  # everything in flight failed: move down the chain now
+        finally:
+            await _cancel_all(list(running))
+
+        if fallback_result is not None:
+            return fallback_result
+        assert last_error is not None
+        raise last_error
+
+    async def complete_stream(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str]:
+        """Race streams on time-to-first-token; the first stream to produce text wins.
+
+        Each candidate stream is consumed entirely inside its own task and
+        hands deltas over through a queue, so the provider generator (and the
+        admission slot / tracing span it holds) is entered, cancelled and
+        closed in a single task.
+        """
+        pending_chain = list(self._chain)
+        pumps: dict[LLMProvider, asyncio.Task[None]] = {}
+        waiting: dict[asyncio.Task[tuple[str, Any]], tuple[LLMProvider, asyncio.Queue[tuple[str, Any]], float]] = {}
+        last_error: BaseException | None = None
+
+        async def pump(provider: LLMProvider, queue: asyncio.Queue[tuple[str, Any]]) -> None:
+            stream: Any = None
+            try:
+                stream = provider.complete_stream(system_prompt, user_message, image_b64=image_b64, schema=schema)
+                async for delta in stream:
+                    queue.put_nowait((_DELTA, delta))
+            except Exception as e:
+                queue.put_nowait((_ERROR, e))
+                return
+            finally:
+                if stream is not None:
+                    try:
+                        await stream.aclose()
+                    except Exception as e:
+                        logger.warning("Closing LLM %s stream failed: %s", _model_name(provider), e)
+            queue.put_nowait((_END, None))
+
+        def launch() -> LLMProvider:
+            provider = pending_chain.pop(0)
+            queue: asyncio.Queue[tuple[str, Any]] = asyncio.Queue()
+            pumps[provider] = asyncio.create_task(pump(provider, queue))
+            waiting[asyncio.create_task(queue.get())] = (provider, queue, time.monotonic())
+            return provider
+
+        winner: tuple[LLMProvider, asyncio.Queue[tuple[str, Any]]] | None = None
+        first = ""
+        newest = launch()
+        try:
+            while waiting and winner is None:
+                timeout = self._delay(newest, "ttft") if pending_chain else None
+                done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges += 1
+                    newest = launch()
+                    logger.info("Hedging LLM stream: no tokens yet, also trying %s", _model_name(newest))
+                    continue
+                for task in done:
+                    provider, queue, started = waiting.pop(task)
+                    kind, value = task.result()
+                    if kind == _DELTA:
+                        self._tracker.observe(_model_name(provider), "ttft", time.monotonic() - started)
+                        winner, first = (provider, queue), value
+                        break
+                    if kind == _ERROR:
+                        last_error = value
+                        logger.warning("LLM %s stream failed in hedge chain: %s", _model_name(provider), value)
+                if winner is None and not waiting and pending_chain:
+                    newest = launch()
+        finally:
+            await _cancel_all(list(waiting))
+            await _cancel_all([t for p, t in pumps.items() if winner is None or p is not winner[0]])
+
+        if winner is None:
+            if last_error is not None:
+                raise last_error
+            return  # every stream ended without text
+
+        provider, queue = winner
+        try:
+            yield first
+            while True:
+                kind, value = await queue.get()
+                if kind == _END:
+                    return
+                if kind == _ERROR:
+                    raise value
+                yield value
+        finally:
+            await _cancel_all([pumps[provider]])
+
+    async def complete_with_tools(
+        self,
+        system_prompt: str,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        *,
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+    ) -> TextResponse | ToolCallResponse:
+        return await self._chain[0].complete_with_tools(
+            system_prompt, messages, tools,
+            model=model, temperature=temperature, max_tokens=max_tokens,
+        )
+
+    async def validate_key(self) -> bool:
+        return await self._chain[0].validate_key()
+
+    async def close(self) -> None:
+        return None
@@ -0,0 +1,231 @@
+"""Process-wide LLM provider pool — shared providers and one HTTP pool per upstream host."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+from pydantic import BaseModel
+
+from bot.services.llm_router import (
+    CLAUDE_BASE_URL,
+    LLM_TIMEOUT,
+    OPENROUTER_BASE_URL,
+    LLMProvider,
+    TextResponse,
+    ToolCallResponse,
+    build_provider,
+)
+
+logger = logging.getLogger(__name__)
+
+# Pool defaults (overridable via Settings)
+DEFAULT_IDLE_TTL = 300.0  # seconds an unleased provider is kept
+DEFAULT_MAX_CONNECTIONS = 20  # per upstream host
+DEFAULT_MAX_KEEPALIVE = 10
+DEFAULT_KEEPALIVE_EXPIRY = 60.0  # seconds
+
+_BASE_URLS = {"claude": CLAUDE_BASE_URL, "openrouter": OPENROUTER_BASE_URL}
+
+PoolKey = tuple[str, str, str | None]
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Short, non-reversible identifier for an API key (safe to log and use as a dict key)."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class _PoolEntry:
+    __slots__ = ("provider", "refs", "last_used")
+
+    def __init__(self, provider: LLMProvider) -> None:
+        self.provider = provider
+        self.refs = 0
+        self.last_used = time.monotonic()
+
+
+class ProviderLease(LLMProvider):
+    """A caller's handle on a pooled provider.
+
+    Delegates every call to the shared provider. ``close()`` releases the
+    lease (once) instead of closing any connection.
+    """
+
+    def __init__(self, pool: LLMProviderPool, key: PoolKey, provider: LLMProvider) -> None:
+        self._pool = pool
+        self._key = key
+        self._provider = provider
+        self._released = False
+
+    def __getattr__(self, name: str) -> Any:
+        # model, api_key, ... of the underlying provider
+        return getattr(self._provider, name)
+
+    async def complete(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> dict[str, Any]:
+        return await self._provider.complete(system_prompt, user_message, image_b64=image_b64, schema=schema)
+
+    async def complete_stream(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str]:
+        async for delta in self._provider.complete_stream(
+            system_prompt, user_message, image_b64=image_b64, schema=schema,
+        ):
+            yield delta
+
+    async def complete_with_tools(
+        self,
+        system_prompt: str,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        *,
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+    ) -> TextResponse | ToolCallResponse:
+        return await self._provider.complete_with_tools(
+            system_prompt, messages, tools,
+            model=model, temperature=temperature, max_tokens=max_tokens,
+        )
+
+    async def validate_key(self) -> bool:
+        return await self._provider.validate_key()
+
+    async def close(self) -> None:
+        if not self._released:
+            self._released = True
+            self._pool.release(self._key)
+
+
+class LLMProviderPool:
+    """Providers keyed by (provider, key fingerprint, model) with refcounted leases.
+
+    All providers for the same upstream host share one pooled
+    ``httpx.AsyncClient``, so TLS connections to openrouter.ai and
+    api.anthropic.com are reused across users, agents and background jobs.
+    Unleased providers are evicted after ``idle_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    ) -> None:
+        self.idle_ttl = idle_ttl
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._entries: dict[PoolKey, _PoolEntry] = {}
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._last_sweep = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def shared_client(self, base_url: str) -> httpx.AsyncClient:
+        """The pooled HTTP client for an upstream host (created on first use)."""
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(base_url=base_url, timeout=LLM_TIMEOUT, limits=self._limits)
+            self._clients[base_url] = client
+        return client
+
+    def acquire(self, provider_name: str, api_key: str, model: str | None = None) -> ProviderLease:
+        """Lease a shared provider; call ``close()`` on the lease when done."""
+        base_url = _BASE_URLS.get(provider_name)
+        if base_url is None:
+            raise ValueError(f"Unknown provider: {provider_name}")
+        self._maybe_sweep()
+
+        key: PoolKey = (provider_name, key_fingerprint(api_key), model)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            provider = build_provider(
+                provider_name, api_key, model, http_client=self.shared_client(base_url),
+            )
+            entry = self._entries[key] = _PoolEntry(provider)
+        else:
+            self.hits += 1
+        entry.refs += 1
+        entry.last_used = time.monotonic()
+        return ProviderLease(self, key, entry.provider)
+
+    def release(self, key: PoolKey) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.refs = max(0, entry.refs - 1)
+        entry.last_used = time.monotonic()
+
+    def evict_idle(self) -> int:
+        """Drop providers with no leases that have been idle longer than ``idle_ttl``."""
+        now = time.monotonic()
+        stale = [
+            k for k, e in self._entries.items()
+            if e.refs == 0 and now - e.last_used >= self.idle_ttl
+        ]
+        for k in stale:
+            del self._entries[k]
+        self.evicted += len(stale)
+        self._last_sweep = now
+        return len(stale)
+
+    def _maybe_sweep(self) -> None:
+        if time.monotonic() - self._last_sweep >= self.idle_ttl / 4:
+            evicted = self.evict_idle()
+            if evicted:
+                logger.debug("LLM provider pool evicted %d idle providers", evicted)
+
+    def stats(self) -> dict[str, Any]:
+        """Pool occupancy and hit counters for monitoring."""
+        return {
+            "providers": len(self._entries),
+            "leased": sum(1 for e in self._entries.values() if e.refs),
+            "leases": sum(e.refs for e in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "hosts": sorted(httpx.URL(u).host for u in self._clients),
+        }
+
+    async def close(self) -> None:
+        """Close every shared HTTP client and forget all providers."""
+        for client in self._clients.values():
+            if not client.is_closed:
+                await client.aclose()
+        self._clients.clear()
+        self._entries.clear()
+
+
+_pool: LLMProviderPool | None = None
+
+
+def install_provider_pool(pool: LLMProviderPool | None) -> None:
+    """Make ``pool`` the process-wide pool used by ``create_provider``."""
+    global _pool
+    _pool = pool
+
+
+def get_provider_pool() -> LLMProviderPool | None:
+    return _pool
@@ -2,50 +2,320 @@
 
 from __future__ import annotations
 
+import contextlib
 import json
 import logging
-import re
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
 from typing import Any
 
 import httpx
+from pydantic import BaseModel, ValidationError
 
 from langfuse import get_client, observe
 
+from bot.services.deadline import backoff, request_timeout
+from bot.services.llm_scheduler import admission
+from bot.services.llm_usage import record_usage
+from bot.tracing.context import traced_span
+
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
 RETRY_DELAYS = [1, 3, 8]
 
+CLAUDE_BASE_URL = "https://api.anthropic.com"
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+LLM_TIMEOUT = 120.0  # seconds
+WEB_RESEARCH_MODEL = "x-ai/grok-4.1-fast"  # OpenRouter model with the web search plugin
+
+# Prompt caching: agents put CACHE_BREAKPOINT after the stable part of a system
+# prompt (template + knowledge base); providers mark everything before it cacheable.
+CACHE_BREAKPOINT = "\n<!-- cache-breakpoint -->\n"
+CACHE_MIN_PREFIX_CHARS = 4096  # ~1024 tokens, the smallest prefix Anthropic will cache
+# OpenRouter routes that need explicit cache_control (OpenAI/DeepSeek/Grok cache prefixes automatically)
+OPENROUTER_CACHE_CONTROL_MODELS = ("anthropic/", "google/gemini")
+
+# Structured output (complete(..., schema=...))
+STRUCTURED_REPAIR_CHARS = 6000  # how much of an invalid reply is echoed back in the repair request
+STRUCTURED_MAX_ERRORS = 5  # validation errors quoted in the repair request
+_SCAN_MAX_RESTARTS = 8  # rescans after an undecodable JSON candidate (see _scan_json)
+
+
+def _scan_json(text: str) -> Any:
+    """First complete top-level JSON value embedded in ``text`` (None if there is none).
+
+    A left-to-right scan tracks bracket depth, skipping string contents, so
+    code fences and surrounding prose are ignored. Each balanced candidate is
+    decoded once. A candidate that fails to decode (e.g. a stray ``{`` in
+    prose) is rescanned from its next character, at most
+    ``_SCAN_MAX_RESTARTS`` times; after that scanning resumes past it, which
+    keeps the worst case linear. Objects win over arrays; the first
+    decodable array is the fallback.
+    """
+    first_array: list[Any] | None = None
+    restarts = 0
+    depth = 0
+    start = 0
+    in_string = False
+    escaped = False
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        i += 1
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = depth > 0  # quotes in prose outside a value are ignored
+        elif ch in "{[":
+            if depth == 0:
+                start = i - 1
+            depth += 1
+        elif ch in "}]" and depth:
+            depth -= 1
+            if depth:
+                continue
+            try:
+                value = json.loads(text[start:i])
+            except json.JSONDecodeError:
+                if restarts < _SCAN_MAX_RESTARTS:
+                    restarts += 1
+                    i = start + 1
+                    in_string = False
+                continue
+            if isinstance(value, dict):
+                return value
+            if first_array is None and isinstance(value, list):
+                first_array = value
+    return first_array
+
+
+def _decode_json(text: str) -> Any:
+    """Parse a whole response as JSON, else the first JSON value inside it (None if none)."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return _scan_json(text)
+
 
 def _extract_json(text: str) -> dict[str, Any]:
     """Extract JSON from LLM response, handling code fences and extra text."""
-    # Try direct parse
     text = text.strip()
+    value = _decode_json(text)
+    if value is not None:
+        return value
+
+    # Return raw text wrapped
+    return {"raw_response": text}
+
+
+class StructuredOutputError(ValueError):
+    """A response that does not match the requested schema (after the repair retry)."""
+
+    def __init__(self, message: str, text: str) -> None:
+        super().__init__(message)
+        self.text = text
+
+
+def validate_structured(value: Any, schema: type[BaseModel]) -> dict[str, Any]:
+    """Validate a decoded JSON value against ``schema``; raises ``ValidationError``.
+
+    A bare array is accepted for single-field schemas (e.g. a model whose only
+    field is ``steps: list[...]``). Only fields present in the response are
+    returned, with their values coerced to the schema's types.
+    """
+    if isinstance(value, list) and len(schema.model_fields) == 1:
+        value = {next(iter(schema.model_fields)): value}
+    return schema.model_validate(value).model_dump(mode="json", exclude_unset=True)
+
+
+def parse_structured(text: str, schema: type[BaseModel]) -> dict[str, Any]:
+    """Decode and validate a response against ``schema``; raises ``StructuredOutputError``."""
+    value = _decode_json(text.strip())
+    if value is None:
+        raise StructuredOutputError("response contains no JSON value", text)
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
+        return validate_structured(value, schema)
+    except ValidationError as e:
+        problems = "; ".join(
+            f"{'.'.join(str(p) for p in err['loc']) or '(root)'}: {err['msg']}"
+            for err in e.errors()[:STRUCTURED_MAX_ERRORS]
+        )
+        raise StructuredOutputError(problems, text) from e
+
+
+def _schema_instruction(schema: type[BaseModel]) -> str:
+    """System-prompt suffix describing the expected output shape."""
+    return (
+        "\n\nRespond with a single JSON object (no prose, no code fences) "
+        f"matching this JSON Schema:\n{json.dumps(schema.model_json_schema(), separators=(',', ':'))}"
+    )
+
+
+def _response_format(schema: type[BaseModel]) -> dict[str, Any]:
+    """OpenAI-style ``response_format`` for chat/completions (ignored by routes without support)."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.__name__, "strict": False, "schema": schema.model_json_schema()},
+    }
+
+
+def _repair_message(user_message: str, text: str, error: StructuredOutputError) -> str:
+    return (
+        f"{user_message}\n\n---\nYour previous reply could not be used: {error}\n"
+        f"Previous reply:\n{text[:STRUCTURED_REPAIR_CHARS]}\n---\n"
+        "Return the corrected reply as JSON only."
+    )
+
+
+async def _validate_or_repair(
+    text: str,
+    user_message: str,
+    schema: type[BaseModel],
+    retry: Callable[[str], Awaitable[str]],
+) -> dict[str, Any]:
+    """``parse_structured``, with one repair round-trip if the first reply fails."""
+    try:
+        return parse_structured(text, schema)
+    except StructuredOutputError as e:
+        logger.warning("LLM reply failed %s validation (%s); requesting one repair", schema.__name__, e)
+        repaired = await retry(_repair_message(user_message, text, e))
+    return parse_structured(repaired, schema)
+
+
+def _estimate_tokens(*texts: str) -> int:
+    """Rough input-token count for admission budgets (~4 chars per token)."""
+    return sum(len(t) for t in texts) // 4 + 1
+
+
+def with_cache_breakpoint(text: str) -> str:
+    """``text`` followed by ``CACHE_BREAKPOINT``, unless it already marks where its stable part ends.
+
+    Retrieved knowledge (``KnowledgeService.retrieve``) carries its own
+    breakpoint after the fixed core, ahead of the per-query sections.
+    """
+    return text if CACHE_BREAKPOINT in text else text + CACHE_BREAKPOINT
+
+
+def split_cacheable(system_prompt: str) -> tuple[str, str]:
+    """Split a system prompt at ``CACHE_BREAKPOINT`` into (stable prefix, volatile suffix)."""
+    prefix, sep, suffix = system_prompt.partition(CACHE_BREAKPOINT)
+    if not sep:
+        return "", system_prompt
+    return prefix, suffix
+
+
+def _claude_system(system_prompt: str) -> str | list[dict[str, Any]]:
+    """``system`` field for the Messages API, with a cache breakpoint on the stable prefix."""
+    prefix, suffix = split_cacheable(system_prompt)
+    if len(prefix) < CACHE_MIN_PREFIX_CHARS:
+        return f"{prefix}\n{suffix}" if prefix else suffix
+    blocks: list[dict[str, Any]] = [
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+    ]
+    if suffix:
+        blocks.append({"type": "text", "text": suffix})
+    return blocks
+
+
+def _openrouter_system_message(model: str, system_prompt: str) -> dict[str, Any]:
+    """System message for chat/completions; adds cache_control where the route needs it."""
+    prefix, suffix = split_cacheable(system_prompt)
+    if len(prefix) < CACHE_MIN_PREFIX_CHARS or not model.startswith(OPENROUTER_CACHE_CONTROL_MODELS):
+        return {"role": "system", "content": f"{prefix}\n{suffix}" if prefix else suffix}
+    parts: list[dict[str, Any]] = [
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+    ]
+    if suffix:
+        parts.append({"type": "text", "text": suffix})
+    return {"role": "system", "content": parts}
+
+
+def _claude_usage_details(usage: dict[str, Any]) -> dict[str, int]:
+    """Langfuse usage_details from an Anthropic ``usage`` block, including cache tokens."""
+    details = {"input": usage.get("input_tokens", 0), "output": usage.get("output_tokens", 0)}
+    if usage.get("cache_read_input_tokens"):
+        details["input_cache_read"] = usage["cache_read_input_tokens"]
+    if usage.get("cache_creation_input_tokens"):
+        details["input_cache_creation"] = usage["cache_creation_input_tokens"]
+    return details
+
+
+def _openrouter_usage_details(usage: dict[str, Any]) -> dict[str, int]:
+    """Langfuse usage_details from an OpenRouter ``usage`` block, including cache tokens."""
+    details = {"input": usage.get("prompt_tokens", 0), "output": usage.get("completion_tokens", 0)}
+    prompt_details = usage.get("prompt_tokens_details") or {}
+    if prompt_details.get("cached_tokens"):
+        details["input_cache_read"] = prompt_details["cached_tokens"]
+    if prompt_details.get("cache_write_tokens"):
+        details["input_cache_creation"] = prompt_details["cache_write_tokens"]
+    return details
+
+
+def _openrouter_cost(usage: dict[str, Any]) -> float | None:
+    """USD cost reported in an OpenRouter ``usage`` block (requested via ``usage.include``)."""
+    cost = usage.get("cost")
+    return float(cost) if cost is not None else None
 
-    # Strip markdown code fences
-    fenced = re.search(r"```(?:json)?\s*\n?(.*?)\n?```", text, re.DOTALL)
-    if fenced:
+
+async def _iter_sse(resp: httpx.Response) -> AsyncIterator[dict[str, Any]]:
+    """Yield JSON payloads from a server-sent-events response (skips comments/keep-alives)."""
+    async for line in resp.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if payload == "[DONE]":
+            return
         try:
-            return json.loads(fenced.group(1).strip())
+            yield json.loads(payload)
         except json.JSONDecodeError:
-            pass
+            logger.debug("Skipping malformed SSE payload: %s", payload[:200])
+
+
+async def stream_complete(
+    llm: LLMProvider,
+    system_prompt: str,
+    user_message: str,
+    *,
+    image_b64: str | None = None,
+    on_delta: Callable[[str], Awaitable[None] | None] | None = None,
+    schema: type[BaseModel] | None = None,
+) -> dict[str, Any]:
+    """Complete via ``complete_stream()``, forwarding deltas, then parse JSON once at the end.
+
+    Without ``on_delta`` this is a plain ``complete()`` call. With ``schema``
+    the streamed request carries the same shape hints as ``complete()`` and
+    the joined text is validated the same way; a failed reply gets one
+    non-streamed repair request.
+    """
+    if on_delta is None:
+        return await llm.complete(system_prompt, user_message, image_b64=image_b64, schema=schema)
 
-    # Try to find JSON object in text
-    brace_match = re.search(r"\{.*\}", text, re.DOTALL)
-    if brace_match:
+    parts: list[str] = []
+    async for delta in llm.complete_stream(system_prompt, user_message, image_b64=image_b64, schema=schema):
+        parts.append(delta)
         try:
-            return json.loads(brace_match.group(0))
-        except json.JSONDecodeError:
-            pass
+            pending = on_delta(delta)
+            if pending is not None:
+                await pending
+        except Exception:
+            logger.debug("Stream delta consumer failed (non-critical)", exc_info=True)
+    if schema is None:
+        return _extract_json("".join(parts))
 
-    # Return raw text wrapped
-    return {"raw_response": text}
+    async def retry(message: str) -> str:
+        return "".join([
+            d async for d in llm.complete_stream(system_prompt, message, image_b64=image_b64, schema=schema)
+        ])
+
+    return await _validate_or_repair("".join(parts), user_message, schema, retry)
 
 
 @dataclass
@@ -55,14 +325,32 @@ class TextResponse:
     content: str
 
 
+@dataclass
+class ToolCall:
+    """One tool invocation requested by the LLM."""
+
+    tool_call_id: str
+    tool_name: str
+    tool_args: dict[str, Any]  # already JSON-parsed from the arguments string
+
+
 @dataclass
 class ToolCallResponse:
-    """Returned by complete_with_tools() when the LLM requests a tool call."""
+    """Returned by complete_with_tools() when the LLM requests one or more tool calls.
+
+    ``tool_call_id`` / ``tool_name`` / ``tool_args`` describe the first call;
+    ``calls`` holds every call from the turn, in the order the model gave them.
+    """
 
     tool_call_id: str
     tool_name: str
     tool_args: dict[str, Any]  # already JSON-parsed from the arguments string
     raw_message: dict[str, Any]  # full assistant message dict for appending to history
+    calls: list[ToolCall] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if not self.calls:
+            self.calls = [ToolCall(self.tool_call_id, self.tool_name, self.tool_args)]
 
 
 class LLMProvider(ABC):
@@ -70,9 +358,20 @@ class LLMProvider(ABC):
 
     @abstractmethod
     async def complete(
-        self, system_prompt: str, user_message: str, *, image_b64: str | None = None,
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
     ) -> dict[str, Any]:
-        """Send a completion request and return parsed JSON."""
+        """Send a completion request and return parsed JSON.
+
+        With ``schema``, the provider asks upstream for JSON output where it
+        can, validates the reply against the model and makes one repair
+        request if it does not fit; ``StructuredOutputError`` is raised when
+        the repaired reply still fails.
+        """
         ...
 
     @abstractmethod
@@ -89,6 +388,24 @@ class LLMProvider(ABC):
         """Send a tool-use completion request, returning text or a tool call."""
         ...
 
+    async def complete_stream(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield raw text deltas as they arrive.
+
+        With ``schema`` the request carries the same output-shape hints as
+        ``complete(..., schema=...)``; validating the joined text is left to
+        the caller (see ``stream_complete``). Default for providers without
+        streaming: one delta holding the JSON-encoded ``complete()`` result.
+        """
+        result = await self.complete(system_prompt, user_message, image_b64=image_b64, schema=schema)
+        yield json.dumps(result)
+
     @abstractmethod
     async def validate_key(self) -> bool:
         """Validate the API key works."""
@@ -102,25 +419,57 @@ class LLMProvider(ABC):
 class ClaudeProvider(LLMProvider):
     """Anthropic Claude API provider."""
 
-    def __init__(self, api_key: str, model: str = "claude-sonnet-4-20250514") -> None:
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-sonnet-4-20250514",
+        *,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
         self.api_key = api_key
         self.model = model
-        self._client = httpx.AsyncClient(
-            base_url="https://api.anthropic.com",
-            headers={
-                "x-api-key": api_key,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json",
-            },
-            timeout=120.0,
-        )
+        # Auth travels per request so a pooled client can be shared across keys
+        self._headers = {
+            "x-api-key": api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json",
+        }
+        self._owns_client = http_client is None
+        self._client = http_client or httpx.AsyncClient(base_url=CLAUDE_BASE_URL, timeout=LLM_TIMEOUT)
 
-    @observe(as_type="generation", name="llm:claude")
     async def complete(
-        self, system_prompt: str, user_message: str, *, image_b64: str | None = None,
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
     ) -> dict[str, Any]:
-        import asyncio
+        text = await self._complete_text(system_prompt, user_message, image_b64=image_b64, schema=schema)
+        if text is None:
+            return {"error": "Max retries exceeded"}
+        if schema is None:
+            return _extract_json(text)
+
+        async def retry(message: str) -> str:
+            return await self._complete_text(system_prompt, message, image_b64=image_b64, schema=schema) or ""
+
+        return await _validate_or_repair(text, user_message, schema, retry)
+
+    @observe(as_type="generation", name="llm:claude")
+    async def _complete_text(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> str | None:
+        """One Messages API round-trip (with retries); returns the reply text.
 
+        With ``schema`` the shape is appended to the system prompt and the
+        reply is prefilled with ``{`` so the model starts a JSON object.
+        """
         # Build user content - multipart if image provided
         if image_b64:
             user_content: list[dict[str, Any]] | str = [
@@ -137,26 +486,35 @@ class ClaudeProvider(LLMProvider):
         else:
             user_content = user_message
 
+        messages: list[dict[str, Any]] = [{"role": "user", "content": user_content}]
+        prefill = ""
+        if schema is not None:
+            system_prompt += _schema_instruction(schema)
+            prefill = "{"
+            messages.append({"role": "assistant", "content": prefill})
+
         for attempt in range(MAX_RETRIES):
             try:
-                resp = await self._client.post(
-                    "/v1/messages",
-                    json={
-                        "model": self.model,
-                        "max_tokens": 4096,
-                        "system": system_prompt,
-                        "messages": [{"role": "user", "content": user_content}],
-                    },
-                )
-                resp.raise_for_status()
+                async with admission(CLAUDE_BASE_URL, tokens=_estimate_tokens(system_prompt, user_message)):
+                    started = time.monotonic()
+                    resp = await self._client.post(
+                        "/v1/messages",
+                        headers=self._headers,
+                        timeout=request_timeout(LLM_TIMEOUT),
+                        json={
+                            "model": self.model,
+                            "max_tokens": 4096,
+                            "system": _claude_system(system_prompt),
+                            "messages": messages,
+                        },
+                    )
+                    resp.raise_for_status()
                 data = resp.json()
-                text = data["content"][0]["text"]
+                text = prefill + data["content"][0]["text"]
 
                 # Record Langfuse generation observation
                 try:
                     usage = data.get("usage", {})
-                    input_tokens = usage.get("input_tokens", 0)
-                    output_tokens = usage.get("output_tokens", 0)
                     get_client().update_current_generation(
                         model=self.model,
                         input={
@@ -165,32 +523,131 @@ class ClaudeProvider(LLMProvider):
                             "has_image": bool(image_b64),
                         },
                         output=text[:2000],
-                        usage_details={"input": input_tokens, "output": output_tokens},
+                        usage_details=_claude_usage_details(usage),
                         metadata={"provider": "claude"},
                     )
                 except Exception:
                     logger.debug("Langfuse observation update failed (non-critical)", exc_info=True)
 
-                return _extract_json(text)
+                record_usage(
+                    provider="claude", model=self.model, kind="complete",
+                    usage_details=_claude_usage_details(data.get("usage", {})),
+                    latency_ms=(time.monotonic() - started) * 1000,
+                )
+                return text
             except httpx.HTTPStatusError as e:
                 if e.response.status_code in (429, 500, 502, 503) and attempt < MAX_RETRIES - 1:
-                    await asyncio.sleep(RETRY_DELAYS[attempt])
+                    await backoff(RETRY_DELAYS[attempt])
                     continue
                 logger.error("Claude API error: %s", e)
                 raise
             except Exception as e:
                 if attempt < MAX_RETRIES - 1:
-                    await asyncio.sleep(RETRY_DELAYS[attempt])
+                    await backoff(RETRY_DELAYS[attempt])
                     continue
                 logger.error("Claude completion error: %s", e)
                 raise
 
-        return {"error": "Max retries exceeded"}
+        return None
+
+    @observe(as_type="generation", name="llm:claude:stream")
+    async def complete_stream(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream text deltas from the Messages API (``stream: true``).
+
+        With ``schema`` the shape is appended to the system prompt and the
+        reply is prefilled with ``{`` (prepended to the first delta), as in
+        ``_complete_text``. Retries only before the first delta; once text
+        has been yielded an error is raised to the caller.
+        """
+        if image_b64:
+            user_content: list[dict[str, Any]] | str = [
+                {
+                    "type": "image",
+                    "source": {"type": "base64", "media_type": "image/jpeg", "data": image_b64},
+                },
+                {"type": "text", "text": user_message},
+            ]
+        else:
+            user_content = user_message
+
+        messages: list[dict[str, Any]] = [{"role": "user", "content": user_content}]
+        prefill = ""
+        if schema is not None:
+            system_prompt += _schema_instruction(schema)
+            prefill = "{"
+            messages.append({"role": "assistant", "content": prefill})
+
+        for attempt in range(MAX_RETRIES):
+            parts: list[str] = []
+            usage: dict[str, Any] = {}
+            try:
+                async with admission(CLAUDE_BASE_URL, tokens=_estimate_tokens(system_prompt, user_message)):
+                    started = time.monotonic()
+                    async with self._client.stream(
+                        "POST",
+                        "/v1/messages",
+                        headers=self._headers,
+                        timeout=request_timeout(LLM_TIMEOUT),
+                        json={
+                            "model": self.model,
+                            "max_tokens": 4096,
+                            "stream": True,
+                            "system": _claude_system(system_prompt),
+                            "messages": messages,
+                        },
+                    ) as resp:
+                        resp.raise_for_status()
+                        async for event in _iter_sse(resp):
+                            etype = event.get("type")
+                            if etype == "content_block_delta":
+                                text = event.get("delta", {}).get("text")
+                                if text:
+                                    if not parts:
+                                        text = prefill + text
+                                    parts.append(text)
+                                    yield text
+                            elif etype == "message_start":
+                                usage.update(event.get("message", {}).get("usage", {}))
+                            elif etype == "message_delta":
+                                usage.update(event.get("usage", {}))
+                            elif etype == "error":
+                                raise RuntimeError(event.get("error", {}).get("message", "stream error"))
+                break
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in (429, 500, 502, 503)
+                if not parts and retryable and attempt < MAX_RETRIES - 1:
+                    await backoff(RETRY_DELAYS[attempt])
+                    continue
+                logger.error("Claude streaming error: %s", e)
+                raise
+
+        try:
+            get_client().update_current_generation(
+                model=self.model,
+                input={"system": system_prompt[:500], "user": user_message[:500], "has_image": bool(image_b64)},
+                output="".join(parts)[:2000],
+                usage_details=_claude_usage_details(usage),
+                metadata={"provider": "claude", "stream": True},
+            )
+        except Exception:
+            logger.debug("Langfuse observation update failed (non-critical)", exc_info=True)
+        record_usage(
+            provider="claude", model=self.model, kind="stream",
+            usage_details=_claude_usage_details(usage), latency_ms=(time.monotonic() - started) * 1000,
+        )
 
     async def validate_key(self) -> bool:
         try:
             resp = await self._client.post(
                 "/v1/messages",
+                headers=self._headers,
                 json={
                     "model": self.model,
                     "max_tokens": 10,
@@ -215,33 +672,65 @@ class ClaudeProvider(LLMProvider):
         raise NotImplementedError("Tool calling not yet supported for Claude provider")
 
     async def close(self) -> None:
-        if not self._client.is_closed:
+        if self._owns_client and not self._client.is_closed:
             await self._client.aclose()
 
 
 class OpenRouterProvider(LLMProvider):
     """OpenRouter API provider (OpenAI-compatible)."""
 
-    def __init__(self, api_key: str, model: str = "moonshotai/kimi-k2.5") -> None:
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "moonshotai/kimi-k2.5",
+        *,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
         self.api_key = api_key
         self.model = model
-        self._client = httpx.AsyncClient(
-            base_url="https://openrouter.ai/api/v1",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://getdeal.ai",
-                "X-Title": "Deal Quest Bot",
-            },
-            timeout=120.0,
-        )
+        # Auth travels per request so a pooled client can be shared across keys
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://getdeal.ai",
+            "X-Title": "Deal Quest Bot",
+        }
+        self._owns_client = http_client is None
+        self._client = http_client or httpx.AsyncClient(base_url=OPENROUTER_BASE_URL, timeout=LLM_TIMEOUT)
 
-    @observe(as_type="generation", name="llm:openrouter")
     async def complete(
-        self, system_prompt: str, user_message: str, *, image_b64: str | None = None,
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
     ) -> dict[str, Any]:
-        import asyncio
+        text = await self._complete_text(system_prompt, user_message, image_b64=image_b64, schema=schema)
+        if text is None:
+            return {"error": "Max retries exceeded"}
+        if schema is None:
+            return _extract_json(text)
+
+        async def retry(message: str) -> str:
+            return await self._complete_text(system_prompt, message, image_b64=image_b64, schema=schema) or ""
+
+        return await _validate_or_repair(text, user_message, schema, retry)
+
+    @observe(as_type="generation", name="llm:openrouter")
+    async def _complete_text(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> str | None:
+        """One chat/completions round-trip (with retries); returns the reply text.
 
+        With ``schema`` the request carries a ``json_schema`` response_format;
+        routes that do not support it still get the shape in the system prompt.
+        """
         # Build user content — multipart if image provided
         if image_b64:
             user_content: list[dict[str, Any]] | str = [
@@ -254,29 +743,31 @@ class OpenRouterProvider(LLMProvider):
         else:
             user_content = user_message
 
+        body: dict[str, Any] = {
+            "model": self.model, "max_tokens": 4096, "temperature": 0.7, "usage": {"include": True},
+        }
+        if schema is not None:
+            system_prompt += _schema_instruction(schema)
+            body["response_format"] = _response_format(schema)
+        body["messages"] = [
+            _openrouter_system_message(self.model, system_prompt),
+            {"role": "user", "content": user_content},
+        ]
+
         for attempt in range(MAX_RETRIES):
             try:
-                resp = await self._client.post(
-                    "/chat/completions",
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_content},
-                        ],
-                        "max_tokens": 4096,
-                        "temperature": 0.7,
-                    },
-                )
-                resp.raise_for_status()
+                async with admission(OPENROUTER_BASE_URL, tokens=_estimate_tokens(system_prompt, user_message)):
+                    started = time.monotonic()
+                    resp = await self._client.post(
+                        "/chat/completions", headers=self._headers, json=body, timeout=request_timeout(LLM_TIMEOUT),
+                    )
+                    resp.raise_for_status()
                 data = resp.json()
                 text = data["choices"][0]["message"]["content"]
 
                 # Record Langfuse generation observation
                 try:
                     usage = data.get("usage", {})
-                    prompt_tokens = usage.get("prompt_tokens", 0)
-                    completion_tokens = usage.get("completion_tokens", 0)
                     cost_value = usage.get("cost")
 
                     update_kwargs: dict[str, Any] = {
@@ -287,7 +778,7 @@ class OpenRouterProvider(LLMProvider):
                             "has_image": bool(image_b64),
                         },
                         "output": text[:2000],
-                        "usage_details": {"input": prompt_tokens, "output": completion_tokens},
+                        "usage_details": _openrouter_usage_details(usage),
                         "metadata": {"provider": "openrouter"},
                     }
                     if cost_value is not None:
@@ -297,26 +788,121 @@ class OpenRouterProvider(LLMProvider):
                 except Exception:
                     logger.debug("Langfuse observation update failed (non-critical)", exc_info=True)
 
-                return _extract_json(text)
+                usage = data.get("usage") or {}
+                record_usage(
+                    provider="openrouter", model=self.model, kind="complete",
+                    usage_details=_openrouter_usage_details(usage), cost=_openrouter_cost(usage),
+                    latency_ms=(time.monotonic() - started) * 1000,
+                )
+                return text
             except httpx.HTTPStatusError as e:
                 if e.response.status_code in (429, 500, 502, 503) and attempt < MAX_RETRIES - 1:
-                    await asyncio.sleep(RETRY_DELAYS[attempt])
+                    await backoff(RETRY_DELAYS[attempt])
                     continue
                 logger.error("OpenRouter API error: %s", e)
                 raise
             except Exception as e:
                 if attempt < MAX_RETRIES - 1:
-                    await asyncio.sleep(RETRY_DELAYS[attempt])
+                    await backoff(RETRY_DELAYS[attempt])
                     continue
                 logger.error("OpenRouter completion error: %s", e)
                 raise
 
-        return {"error": "Max retries exceeded"}
+        return None
+
+    @observe(as_type="generation", name="llm:openrouter:stream")
+    async def complete_stream(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        image_b64: str | None = None,
+        schema: type[BaseModel] | None = None,
+    ) -> AsyncIterator[str]:
+        """Stream text deltas from chat/completions (``stream: true``).
+
+        With ``schema`` the request carries the shape in the system prompt and
+        a ``json_schema`` response_format, as in ``_complete_text``. Retries
+        only before the first delta; once text has been yielded an error is
+        raised to the caller.
+        """
+        if image_b64:
+            user_content: list[dict[str, Any]] | str = [
+                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_b64}"}},
+                {"type": "text", "text": user_message},
+            ]
+        else:
+            user_content = user_message
+
+        body: dict[str, Any] = {
+            "model": self.model, "max_tokens": 4096, "temperature": 0.7,
+            "stream": True, "usage": {"include": True},
+        }
+        if schema is not None:
+            system_prompt += _schema_instruction(schema)
+            body["response_format"] = _response_format(schema)
+        body["messages"] = [
+            _openrouter_system_message(self.model, system_prompt),
+            {"role": "user", "content": user_content},
+        ]
+
+        for attempt in range(MAX_RETRIES):
+            parts: list[str] = []
+            usage: dict[str, Any] = {}
+            try:
+                async with admission(OPENROUTER_BASE_URL, tokens=_estimate_tokens(system_prompt, user_message)):
+                    started = time.monotonic()
+                    async with self._client.stream(
+                        "POST",
+                        "/chat/completions",
+                        headers=self._headers,
+                        timeout=request_timeout(LLM_TIMEOUT),
+                        json=body,
+                    ) as resp:
+                        resp.raise_for_status()
+                        async for chunk in _iter_sse(resp):
+                            if chunk.get("error"):
+                                raise RuntimeError(chunk["error"].get("message", "stream error"))
+                            if chunk.get("usage"):
+                                usage = chunk["usage"]
+                            for choice in chunk.get("choices") or []:
+                                text = (choice.get("delta") or {}).get("content")
+                                if text:
+                                    parts.append(text)
+                                    yield text
+                break
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in (429, 500, 502, 503)
+                if not parts and retryable and attempt < MAX_RETRIES - 1:
+                    await backoff(RETRY_DELAYS[attempt])
+                    continue
+                logger.error("OpenRouter streaming error: %s", e)
+                raise
+
+        try:
+            update_kwargs: dict[str, Any] = {
+                "model": self.model,
+                "input": {"system": system_prompt[:500], "user": user_message[:500], "has_image": bool(image_b64)},
+                "output": "".join(parts)[:2000],
+                "usage_details": _openrouter_usage_details(usage),
+                "metadata": {"provider": "openrouter", "stream": True},
+            }
+            if usage.get("cost") is not None:
+                update_kwargs["cost_details"] = {"total": float(usage["cost"])}
+            get_client().update_current_generation(**update_kwargs)
+        except Exception:
+            logger.debug("Langfuse observation update failed (non-critical)", exc_info=True)
+        record_usage(
+            provider="openrouter", model=self.model, kind="stream",
+            usage_details=_openrouter_usage_details(usage), cost=_openrouter_cost(usage),
+            latency_ms=(time.monotonic() - started) * 1000,
+        )
 
     async def validate_key(self) -> bool:
         try:
             resp = await self._client.post(
                 "/chat/completions",
+                headers=self._headers,
                 json={
                     "model": self.model,
                     "messages": [{"role": "user", "content": "Hi"}],
@@ -343,38 +929,58 @@ class OpenRouterProvider(LLMProvider):
         Prepends the system prompt as a system message and includes tool definitions
         in every request — OpenRouter requires tools array for the full conversation.
         """
-        import asyncio
-
         effective_model = model if model is not None else self.model
-        all_messages = [{"role": "system", "content": system_prompt}] + messages
+        all_messages = [_openrouter_system_message(effective_model, system_prompt)] + messages
 
         for attempt in range(MAX_RETRIES):
             try:
-                resp = await self._client.post(
-                    "/chat/completions",
-                    json={
-                        "model": effective_model,
-                        "messages": all_messages,
-                        "tools": tools,
-                        "tool_choice": "auto",
-                        "max_tokens": max_tokens,
-                        "temperature": temperature,
-                    },
-                )
-                resp.raise_for_status()
+                async with admission(
+                    OPENROUTER_BASE_URL, tokens=_estimate_tokens(system_prompt, json.dumps(messages)),
+                ):
+                    started = time.monotonic()
+                    resp = await self._client.post(
+                        "/chat/completions",
+                        headers=self._headers,
+                        timeout=request_timeout(LLM_TIMEOUT),
+                        json={
+                            "model": effective_model,
+                            "messages": all_messages,
+                            "tools": tools,
+                            "tool_choice": "auto",
+                            "max_tokens": max_tokens,
+                            "temperature": temperature,
+                            "usage": {"include": True},
+                        },
+                    )
+                    resp.raise_for_status()
                 data = resp.json()
+                usage = data.get("usage") or {}
+                record_usage(
+                    provider="openrouter", model=effective_model, kind="tools",
+                    usage_details=_openrouter_usage_details(usage), cost=_openrouter_cost(usage),
+                    latency_ms=(time.monotonic() - started) * 1000,
+                )
                 choice = data["choices"][0]
                 message = choice["message"]
                 finish_reason = choice.get("finish_reason", "")
 
                 # Tool call response
                 if finish_reason == "tool_calls" and message.get("tool_calls"):
-                    tc = message["tool_calls"][0]
+                    calls = [
+                        ToolCall(
+                            tool_call_id=tc["id"],
+                            tool_name=tc["function"]["name"],
+                            tool_args=json.loads(tc["function"]["arguments"] or "{}"),
+                        )
+                        for tc in message["tool_calls"]
+                    ]
+                    first = calls[0]
                     return ToolCallResponse(
-                        tool_call_id=tc["id"],
-                        tool_name=tc["function"]["name"],
-                        tool_args=json.loads(tc["function"]["arguments"]),
+                        tool_call_id=first.tool_call_id,
+                        tool_name=first.tool_name,
+                        tool_args=first.tool_args,
                         raw_message=message,
+                        calls=calls,
                     )
 
                 # Text response
@@ -382,13 +988,13 @@ class OpenRouterProvider(LLMProvider):
 
             except httpx.HTTPStatusError as e:
                 if e.response.status_code in (429, 500, 502, 503) and attempt < MAX_RETRIES - 1:
-                    await asyncio.sleep(RETRY_DELAYS[attempt])
+                    await backoff(RETRY_DELAYS[attempt])
                     continue
                 logger.error("OpenRouter tools API error: %s", e)
                 raise
             except Exception as e:
                 if attempt < MAX_RETRIES - 1:
-                    await asyncio.sleep(RETRY_DELAYS[attempt])
+                    await backoff(RETRY_DELAYS[attempt])
                     continue
                 logger.error("OpenRouter tools completion error: %s", e)
                 raise
@@ -396,7 +1002,7 @@ class OpenRouterProvider(LLMProvider):
         return TextResponse(content="I'm having trouble processing that right now. Please try again.")
 
     async def close(self) -> None:
-        if not self._client.is_closed:
+        if self._owns_client and not self._client.is_closed:
             await self._client.aclose()
 
 
@@ -405,51 +1011,87 @@ def create_provider(
     api_key: str,
     model: str | None = None,
 ) -> LLMProvider:
-    """Factory to create an LLM provider instance."""
+    """Factory to create an LLM provider instance.
+
+    When a process-wide ``LLMProviderPool`` is installed, this returns a
+    lease on a shared provider instead; ``close()`` on the lease releases
+    it back to the pool, so existing create/close call sites stay as-is.
+    """
+    from bot.services.llm_pool import get_provider_pool
+
+    pool = get_provider_pool()
+    if pool is not None:
+        return pool.acquire(provider_name, api_key, model)
+    return build_provider(provider_name, api_key, model)
+
+
+def build_provider(
+    provider_name: str,
+    api_key: str,
+    model: str | None = None,
+    *,
+    http_client: httpx.AsyncClient | None = None,
+) -> LLMProvider:
+    """Construct a standalone provider (owning its client unless one is passed)."""
     if provider_name == "claude":
-        return ClaudeProvider(api_key, model=model or "claude-sonnet-4-20250514")
+        return ClaudeProvider(api_key, model=model or "claude-sonnet-4-20250514", http_client=http_client)
     elif provider_name == "openrouter":
-        return OpenRouterProvider(api_key, model=model or "moonshotai/kimi-k2.5")
+        return OpenRouterProvider(api_key, model=model or "moonshotai/kimi-k2.5", http_client=http_client)
     else:
         raise ValueError(f"Unknown provider: {provider_name}")
 
 
 async def web_research_call(api_key: str, query: str) -> str:
     """Call Grok via OpenRouter with web search plugin for deep prospect research."""
-    async with httpx.AsyncClient(timeout=120.0) as client:
+    from bot.services.llm_pool import get_provider_pool
+
+    pool = get_provider_pool()
+    shared = pool.shared_client(OPENROUTER_BASE_URL) if pool is not None else None
+    async with contextlib.AsyncExitStack() as stack:
+        client = shared or await stack.enter_async_context(httpx.AsyncClient(timeout=LLM_TIMEOUT))
         try:
-            resp = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://getdeal.ai",
-                    "X-Title": "Deal Quest Bot",
-                },
-                json={
-                    "model": "x-ai/grok-4.1-fast",
-                    "plugins": [{"id": "web"}],
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": (
-                                "You are a sales research analyst. Research this person and their company "
-                                "thoroughly using web search. Find:\n"
-                                "- Their LinkedIn activity, recent posts, career history\n"
-                                "- Company news, funding rounds, recent announcements\n"
-                                "- Industry trends relevant to their role\n"
-                                "- Mutual connections or shared interests\n"
-                                "- Any public speaking, articles, or thought leadership\n\n"
-                                "Provide a comprehensive research brief that a sales rep can use "
-                                "to personalize their outreach."
-                            ),
-                        },
-                        {"role": "user", "content": query},
-                    ],
-                },
-            )
-            resp.raise_for_status()
+            async with admission(OPENROUTER_BASE_URL, tokens=_estimate_tokens(query)):
+                started = time.monotonic()
+                resp = await client.post(
+                    f"{OPENROUTER_BASE_URL}/chat/completions",
+                    timeout=request_timeout(LLM_TIMEOUT),
+                    headers={
+                        "Authorization": f"Bearer {api_key}",
+                        "Content-Type": "application/json",
+                        "HTTP-Referer": "https://getdeal.ai",
+                        "X-Title": "Deal Quest Bot",
+                    },
+                    json={
+                        "model": WEB_RESEARCH_MODEL,
+                        "plugins": [{"id": "web"}],
+                        "usage": {"include": True},
+                        "messages": [
+                            {
+                                "role": "system",
+                                "content": (
+                                    "You are a sales research analyst. Research this person and their company "
+                                    "thoroughly using web search. Find:\n"
+                                    "- Their LinkedIn activity, recent posts, career history\n"
+                                    "- Company news, funding rounds, recent announcements\n"
+                                    "- Industry trends relevant to their role\n"
+                                    "- Mutual connections or shared interests\n"
+                                    "- Any public speaking, articles, or thought leadership\n\n"
+                                    "Provide a comprehensive research brief that a sales rep can use "
+                                    "to personalize their outreach."
+                                ),
+                            },
+                            {"role": "user", "content": query},
+                        ],
+                    },
+                )
+                resp.raise_for_status()
             data = resp.json()
+            usage = data.get("usage") or {}
+            record_usage(
+                provider="openrouter", model=WEB_RESEARCH_MODEL, kind="research",
+                usage_details=_openrouter_usage_details(usage), cost=_openrouter_cost(usage),
+                latency_ms=(time.monotonic() - started) * 1000,
+            )
             return data["choices"][0]["message"]["content"]
         except Exception as e:
             logger.error("Web research call failed: %s", e)
@@ -0,0 +1,266 @@
+"""LLM admission control — per-upstream concurrency, token budgets and priority lanes."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+
+from bot.storage.resilience import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes (lower value is served first)
+INTERACTIVE = 0
+BACKGROUND = 1
+LANE_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+DEFAULT_MAX_CONCURRENCY = 8  # per upstream host
+BACKGROUND_SHARE = 0.75  # background calls may use at most this share of the current limit
+THROTTLE_PAUSE = 5.0  # seconds to pause admissions after a 429 without Retry-After
+_WAIT_SAMPLES = 500
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+def set_priority(priority: int) -> contextvars.Token[int]:
+    """Set the lane for LLM calls made from the current task (and tasks it spawns)."""
+    return _priority.set(priority)
+
+
+class _LaneStats:
+    __slots__ = ("admitted", "wait_total", "wait_max", "samples")
+
+    def __init__(self) -> None:
+        self.admitted = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.samples: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+
+    def record(self, waited: float) -> None:
+        self.admitted += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.samples.append(waited)
+
+    def p95(self) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class UpstreamLimiter:
+    """Admission for one upstream host.
+
+    Concurrency follows AIMD: each 429 halves the limit (and pauses new
+    admissions for Retry-After), and every ``limit`` consecutive successes
+    raise it by one, up to ``max_concurrency``. An optional token bucket
+    caps estimated input tokens per minute. Waiters are served lane by lane,
+    interactive first.
+    """
+
+    def __init__(
+        self, host: str, *, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, tokens_per_minute: int = 0,
+    ) -> None:
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.in_flight = 0
+        self.throttled = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._tokens = float(tokens_per_minute)
+        self._refilled = time.monotonic()
+        self._waiters: dict[int, deque[asyncio.Future[None]]] = {lane: deque() for lane in LANE_NAMES}
+        self._stats: dict[int, _LaneStats] = {lane: _LaneStats() for lane in LANE_NAMES}
+
+    # -- concurrency ---------------------------------------------------------
+
+    def _lane_limit(self, priority: int) -> int:
+        if priority == INTERACTIVE:
+            return self.limit
+        return max(1, int(self.limit * BACKGROUND_SHARE))
+
+    def _can_admit(self, priority: int) -> bool:
+        return time.monotonic() >= self._paused_until and self.in_flight < self._lane_limit(priority)
+
+    def _waiters_ahead(self, priority: int) -> bool:
+        return any(self._waiters[lane] for lane in self._waiters if lane <= priority)
+
+    def _wake(self) -> None:
+        for lane in sorted(self._waiters):
+            queue = self._waiters[lane]
+            while queue and self._can_admit(lane):
+                fut = queue.popleft()
+                if fut.done():
+                    continue
+                self.in_flight += 1
+                fut.set_result(None)
+            if queue:
+                return  # lower lanes keep waiting behind this one
+
+    async def acquire(self, priority: int, tokens: int = 0) -> None:
+        lane = priority if priority in self._waiters else BACKGROUND
+        started = time.monotonic()
+        if self._can_admit(lane) and not self._waiters_ahead(lane):
+            self.in_flight += 1
+        else:
+            fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self._waiters[lane].append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self.release()  # admitted just as we were cancelled
+                else:
+                    with contextlib.suppress(ValueError):
+                        self._waiters[lane].remove(fut)
+                raise
+        try:
+            await self._spend_tokens(tokens)
+        except BaseException:
+            self.release()
+            raise
+        self._stats[lane].record(time.monotonic() - started)
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake()
+
+    # -- token budget ------------------------------------------------------
+
+    async def _spend_tokens(self, tokens: int) -> None:
+        if self.tokens_per_minute <= 0 or tokens <= 0:
+            return
+        need = min(float(tokens), float(self.tokens_per_minute))
+        rate = self.tokens_per_minute / 60.0
+        while True:
+            now = time.monotonic()
+            self._tokens = min(float(self.tokens_per_minute), self._tokens + (now - self._refilled) * rate)
+            self._refilled = now
+            if self._tokens >= need:
+                self._tokens -= need
+                return
+            await asyncio.sleep((need - self._tokens) / rate)
+
+    # -- feedback ----------------------------------------------------------
+
+    def on_success(self) -> None:
+        self._successes += 1
+        if self.limit < self.max_concurrency and self._successes >= self.limit:
+            self.limit += 1
+            self._successes = 0
+            self._wake()
+
+    def on_throttle(self, retry_after: float | None) -> None:
+        self.throttled += 1
+        self._successes = 0
+        new_limit = max(1, self.limit // 2)
+        pause = retry_after if retry_after is not None else THROTTLE_PAUSE
+        if new_limit != self.limit:
+            logger.warning(
+                "LLM upstream %s throttled (429): concurrency %d -> %d, pausing %.1fs",
+                self.host, self.limit, new_limit, pause,
+            )
+        self.limit = new_limit
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        asyncio.get_running_loop().call_later(pause, self._wake)
+
+    def stats(self) -> dict[str, Any]:
+        lanes = {}
+        for lane, name in LANE_NAMES.items():
+            st = self._stats[lane]
+            lanes[name] = {
+                "queued": len(self._waiters[lane]),
+                "admitted": st.admitted,
+                "avg_wait": round(st.wait_total / st.admitted, 3) if st.admitted else 0.0,
+                "p95_wait": round(st.p95(), 3),
+                "max_wait": round(st.wait_max, 3),
+            }
+        return {
+            "host": self.host,
+            "limit": self.limit,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "throttled": self.throttled,
+            "tokens_per_minute": self.tokens_per_minute,
+            "lanes": lanes,
+        }
+
+
+class LLMScheduler:
+    """One ``UpstreamLimiter`` per upstream host, created on first use."""
+
+    def __init__(
+        self, *, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, tokens_per_minute: int = 0,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self._limiters: dict[str, UpstreamLimiter] = {}
+
+    def limiter(self, host: str) -> UpstreamLimiter:
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = UpstreamLimiter(
+                host, max_concurrency=self.max_concurrency, tokens_per_minute=self.tokens_per_minute,
+            )
+        return limiter
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host: str, *, tokens: int = 0, priority: int | None = None) -> AsyncIterator[None]:
+        """Hold one admission slot for ``host`` around an upstream call.
+
+        A 429 raised inside the block (``HTTPStatusError``) shrinks the
+        host's concurrency; a clean exit counts as a success.
+        """
+        limiter = self.limiter(host)
+        await limiter.acquire(current_priority() if priority is None else priority, tokens)
+        try:
+            yield
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429:
+                limiter.on_throttle(parse_retry_after(e.response.headers.get("retry-after")))
+            raise
+        else:
+            limiter.on_success()
+        finally:
+            limiter.release()
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [self._limiters[h].stats() for h in sorted(self._limiters)]
+
+
+_scheduler: LLMScheduler | None = None
+
+
+def install_llm_scheduler(scheduler: LLMScheduler | None) -> None:
+    """Make ``scheduler`` the process-wide scheduler used by every provider call."""
+    global _scheduler
+    _scheduler = scheduler
+
+
+def get_llm_scheduler() -> LLMScheduler | None:
+    return _scheduler
+
+
+@contextlib.asynccontextmanager
+async def admission(host: str, *, tokens: int = 0) -> AsyncIterator[None]:
+    """``LLMScheduler.slot`` on the installed scheduler; a no-op when none is installed."""
+    if _scheduler is None:
+        yield
+        return
+    async with _scheduler.slot(host, tokens=tokens):
+        yield
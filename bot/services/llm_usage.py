@@ -0,0 +1,245 @@
+"""LLM usage accounting — per-call token/cost records, in-process rollups and batched persistence."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+from collections import deque
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from typing import Any
+
+from bot.storage.models import LLMUsageModel
+from bot.tracing.context import get_current_trace_id
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL = 30.0  # seconds
+MAX_BUFFERED = 5000  # records kept for persistence while InsForge is unreachable
+ROLLUP_DIMENSIONS = ("agent", "pipeline", "model", "telegram_id")
+
+
+class UsageScope:
+    """Who an LLM call is billed to: agent, pipeline and Telegram user."""
+
+    __slots__ = ("agent", "pipeline", "telegram_id")
+
+    def __init__(
+        self, agent: str | None = None, pipeline: str | None = None, telegram_id: int | None = None,
+    ) -> None:
+        self.agent = agent
+        self.pipeline = pipeline
+        self.telegram_id = telegram_id
+
+
+_scope: contextvars.ContextVar[UsageScope] = contextvars.ContextVar("llm_usage_scope", default=UsageScope())
+
+
+def current_scope() -> UsageScope:
+    return _scope.get()
+
+
+@contextlib.contextmanager
+def usage_scope(
+    agent: str | None = None, *, pipeline: str | None = None, telegram_id: int | None = None,
+) -> Iterator[UsageScope]:
+    """Attribute LLM calls made inside the block; unset fields inherit the enclosing scope."""
+    outer = _scope.get()
+    scope = UsageScope(
+        agent=agent or outer.agent,
+        pipeline=pipeline or outer.pipeline,
+        telegram_id=telegram_id or outer.telegram_id,
+    )
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+class _Rollup:
+    __slots__ = ("calls", "prompt_tokens", "completion_tokens", "cache_read_tokens", "cost", "latency_ms")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_read_tokens = 0
+        self.cost = 0.0
+        self.latency_ms = 0.0
+
+    def add(self, record: LLMUsageModel) -> None:
+        self.calls += 1
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.cache_read_tokens += record.cache_read_tokens
+        self.cost += record.cost or 0.0
+        self.latency_ms += record.latency_ms
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cost": round(self.cost, 4),
+            "avg_latency_ms": round(self.latency_ms / self.calls, 1) if self.calls else 0.0,
+        }
+
+
+class UsageAggregator:
+    """Rolls usage records up per agent / pipeline / model / user and persists them in batches.
+
+    ``record()`` is synchronous and never raises, so providers can call it
+    on their hot path. A background loop bulk-inserts buffered records every
+    ``flush_interval`` seconds, or sooner once ``batch_size`` are waiting.
+    Rollups cover the lifetime of the process; the table keeps the history.
+    """
+
+    def __init__(
+        self,
+        usage_repo: Any,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.usage_repo = usage_repo
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.started_at = datetime.now(timezone.utc)
+        self.total = _Rollup()
+        self._rollups: dict[str, dict[Any, _Rollup]] = {dim: {} for dim in ROLLUP_DIMENSIONS}
+        self._buffer: deque[LLMUsageModel] = deque(maxlen=MAX_BUFFERED)
+        self._batch_ready = asyncio.Event()
+        self._stop_event = asyncio.Event()
+        self._flush_task: asyncio.Task[None] | None = None
+        self.persisted = 0
+        self.dropped = 0
+
+    async def start(self) -> None:
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info("LLM usage aggregator started (batch_size=%d, flush_interval=%.1fs)", self.batch_size, self.flush_interval)
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still buffered."""
+        self._stop_event.set()
+        self._batch_ready.set()
+        if self._flush_task:
+            try:
+                await asyncio.wait_for(self._flush_task, timeout=5.0)
+            except asyncio.TimeoutError:
+                self._flush_task.cancel()
+        await self._flush_now()
+
+    def record(self, record: LLMUsageModel) -> None:
+        self.total.add(record)
+        for dim in ROLLUP_DIMENSIONS:
+            key = getattr(record, dim)
+            rollup = self._rollups[dim].get(key)
+            if rollup is None:
+                rollup = self._rollups[dim][key] = _Rollup()
+            rollup.add(record)
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1  # the oldest record is evicted; rollups still count it
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self._batch_ready.set()
+
+    async def _flush_loop(self) -> None:
+        while not self._stop_event.is_set():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            self._batch_ready.clear()
+            if not self._stop_event.is_set():
+                await self._flush_now()
+
+    async def _flush_now(self) -> None:
+        if not self._buffer:
+            return
+        batch = list(self._buffer)
+        self._buffer.clear()
+        try:
+            self.persisted += await self.usage_repo.create_many(batch)
+        except Exception as e:
+            logger.error("Failed to persist %d LLM usage records: %s", len(batch), e)
+            # Keep them for the next flush. Records that arrived meanwhile already
+            # sit in the buffer, so only the newest that still fit are re-queued;
+            # extendleft on a full deque would silently evict from the right.
+            room = self._buffer.maxlen - len(self._buffer)
+            overflow = max(0, len(batch) - room)
+            self.dropped += overflow
+            self._buffer.extendleft(reversed(batch[overflow:]))
+
+    def top(self, dimension: str, limit: int = 5) -> list[tuple[Any, dict[str, Any]]]:
+        """Largest consumers along ``dimension``, ordered by cost then total tokens."""
+        rollups = self._rollups[dimension]
+        ranked = sorted(
+            rollups.items(),
+            key=lambda kv: (kv[1].cost, kv[1].prompt_tokens + kv[1].completion_tokens),
+            reverse=True,
+        )
+        return [(key, r.as_dict()) for key, r in ranked[:limit]]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "since": self.started_at.isoformat(),
+            "total": self.total.as_dict(),
+            "buffered": len(self._buffer),
+            "persisted": self.persisted,
+            "dropped": self.dropped,
+        }
+
+
+_aggregator: UsageAggregator | None = None
+
+
+def install_usage_aggregator(aggregator: UsageAggregator | None) -> None:
+    """Make ``aggregator`` the process-wide sink for ``record_usage``."""
+    global _aggregator
+    _aggregator = aggregator
+
+
+def get_usage_aggregator() -> UsageAggregator | None:
+    return _aggregator
+
+
+def record_usage(
+    *,
+    provider: str,
+    model: str,
+    kind: str,
+    usage_details: dict[str, int],
+    latency_ms: float,
+    cost: float | None = None,
+) -> None:
+    """Emit one usage record, attributed to the current scope and trace.
+
+    ``usage_details`` is the Langfuse-style dict built by the providers
+    (``input``, ``output``, ``input_cache_read``, ``input_cache_creation``).
+    A no-op when no aggregator is installed.
+    """
+    if _aggregator is None:
+        return
+    scope = _scope.get()
+    try:
+        _aggregator.record(LLMUsageModel(
+            provider=provider,
+            model=model,
+            kind=kind,
+            agent=scope.agent,
+            pipeline=scope.pipeline,
+            telegram_id=scope.telegram_id,
+            trace_id=get_current_trace_id(),
+            prompt_tokens=usage_details.get("input", 0),
+            completion_tokens=usage_details.get("output", 0),
+            cache_read_tokens=usage_details.get("input_cache_read", 0),
+            cache_creation_tokens=usage_details.get("input_cache_creation", 0),
+            cost=cost,
+            latency_ms=round(latency_ms, 2),
+            created_at=datetime.now(timezone.utc).isoformat(),
+        ))
+    except Exception:
+        logger.debug("LLM usage record dropped", exc_info=True)
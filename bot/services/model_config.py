@@ -2,18 +2,27 @@
 
 Admin model overrides always use the shared OpenRouter API key
 (from cfg.openrouter_api_key). This avoids cross-provider issues.
-Changes take effect within 60 seconds via TTL cache.
+Changes take effect within 60 seconds via TTL cache. Override providers
+are leases on the process-wide LLM provider pool, held while the override
+is active.
+
+Fallback chains for hedged requests come from ``agents.yaml`` (``fallbacks:``)
+and can be replaced per agent by ``fallback_models`` / ``latency_slo_seconds``
+on the agent's override row.
 """
 
 from __future__ import annotations
 
 import logging
 import time
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from bot.services.llm_router import LLMProvider, create_provider
 from bot.storage.repositories import AgentModelConfigRepo
 
+if TYPE_CHECKING:
+    from bot.agents.config import FallbackConfig
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,9 +31,15 @@ class ModelConfigService:
 
     CACHE_TTL = 60  # seconds
 
-    def __init__(self, config_repo: AgentModelConfigRepo, shared_openrouter_key: str) -> None:
+    def __init__(
+        self,
+        config_repo: AgentModelConfigRepo,
+        shared_openrouter_key: str,
+        fallbacks: dict[str, FallbackConfig] | None = None,
+    ) -> None:
         self._repo = config_repo
         self._shared_key = shared_openrouter_key
+        self._fallbacks = fallbacks or {}
         self._cache: dict[str, dict[str, Any]] = {}
         self._cache_time: float = 0
         self._provider_cache: dict[str, LLMProvider] = {}
@@ -45,8 +60,23 @@ class ModelConfigService:
         if not override or not self._shared_key:
             return None
 
-        model_id = override["model_id"]
+        return self._lease(override["model_id"])
+
+    async def get_fallback_chain(self, agent_name: str) -> tuple[list[LLMProvider], float | None]:
+        """Fallback providers (in order) and latency SLO for an agent's hedged calls."""
+        override = await self.get_override(agent_name) or {}
+        defaults = self._fallbacks.get(agent_name)
+        models = override.get("fallback_models") or (defaults.models if defaults else [])
+        slo = override.get("latency_slo_seconds")
+        if slo is None and defaults:
+            slo = defaults.latency_slo_seconds
+        if not self._shared_key or not isinstance(models, list):
+            return [], slo
+        return [self._lease(m) for m in models if isinstance(m, str) and m], slo
+
+    def _lease(self, model_id: str) -> LLMProvider:
         if model_id not in self._provider_cache:
+            # Pooled lease: shares the OpenRouter connection pool with every other caller
             self._provider_cache[model_id] = create_provider(
                 "openrouter", self._shared_key, model=model_id
             )
@@ -60,12 +90,28 @@ class ModelConfigService:
             rows = await self._repo.get_all_active()
             self._cache = {r["agent_name"]: r for r in rows}
             self._cache_time = time.time()
+            await self._release_unused_providers()
             logger.debug("Model config cache refreshed: %d overrides", len(self._cache))
         except Exception as e:
             logger.error("Failed to refresh model config cache: %s", e)
 
+    async def _release_unused_providers(self) -> None:
+        """Return leases for models no agent override or fallback chain uses any more."""
+        active = {r.get("model_id") for r in self._cache.values()}
+        for r in self._cache.values():
+            if isinstance(r.get("fallback_models"), list):
+                active.update(r["fallback_models"])
+        for fb in self._fallbacks.values():
+            active.update(fb.models)
+        for model_id in [m for m in self._provider_cache if m not in active]:
+            provider = self._provider_cache.pop(model_id)
+            try:
+                await provider.close()
+            except Exception:
+                pass
+
     async def close(self) -> None:
-        """Close cached provider instances."""
+        """Release cached provider leases."""
         for provider in self._provider_cache.values():
             try:
                 await provider.close()
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
+import time
 from enum import Enum
 from typing import Sequence
 
@@ -12,6 +14,11 @@ from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 logger = logging.getLogger(__name__)
 
 _UPDATE_INTERVAL = 6  # seconds between edits (safe above Telegram ~3s flood limit)
+_STREAM_INTERVAL = 3  # seconds between edits while an LLM reply is streaming in
+_PREVIEW_LIMIT = 3500  # chars of streamed preview (Telegram caps messages at 4096)
+
+# "key": "value  — the value may still be unterminated mid-stream
+_JSON_STRING_FIELD = re.compile(r'"([A-Za-z_][\w]*)"\s*:\s*"((?:[^"\\]|\\.)*)', re.DOTALL)
 
 
 class Phase(str, Enum):
@@ -65,6 +72,20 @@ _TAIL: dict[Phase, list[str]] = {
 }
 
 
+def _json_preview(buffer: str) -> str:
+    """Readable preview of a partially streamed JSON reply (string fields only)."""
+    lines: list[str] = []
+    for key, raw in _JSON_STRING_FIELD.findall(buffer):
+        value = raw.replace("\\n", "\n").replace('\\"', '"').replace("\\\\", "\\").strip()
+        if len(value) < 3:
+            continue
+        lines.append(f"{key.replace('_', ' ').capitalize()}: {value}")
+    text = "\n\n".join(lines) if lines else buffer.strip()
+    if len(text) > _PREVIEW_LIMIT:
+        text = "\u2026" + text[-_PREVIEW_LIMIT:]
+    return text
+
+
 def _still_working_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -78,8 +99,13 @@ class ProgressUpdater:
 
     Usage::
 
-        async with ProgressUpdater(status_msg, Phase.EVALUATION):
+        async with ProgressUpdater(status_msg, Phase.EVALUATION) as progress:
+            ctx.stream_sink = progress.feed
             await runner.run(pipeline_config, ctx)
+
+    Once ``feed()`` receives the first streamed delta the updater switches
+    from canned phase messages to a live preview of the reply, edited at
+    most every ``_STREAM_INTERVAL`` seconds.
     """
 
     def __init__(
@@ -97,17 +123,25 @@ class ProgressUpdater:
         self._messages = list(messages) if messages else list(_MESSAGES[phase])
         self._tail = list(tail) if tail else list(_TAIL[phase])
         self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
         self._task: asyncio.Task | None = None  # type: ignore[type-arg]
         self._index = 0
+        self._buffer: list[str] = []
+        self._streaming = False
+        self._last_edit = 0.0
 
     async def __aenter__(self) -> ProgressUpdater:
         self._stop.clear()
+        self._wake.clear()
         self._index = 0
+        self._buffer = []
+        self._streaming = False
         self._task = asyncio.create_task(self._loop())
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:  # noqa: ANN001
         self._stop.set()
+        self._wake.set()
         if self._task and not self._task.done():
             # Give the loop a moment to notice the event and exit cleanly
             try:
@@ -120,20 +154,36 @@ class ProgressUpdater:
                     pass
         return None  # don't suppress exceptions
 
+    def feed(self, delta: str) -> None:
+        """Append a streamed LLM delta; the first one triggers an immediate edit."""
+        self._buffer.append(delta)
+        if not self._streaming:
+            self._streaming = True
+            self._wake.set()
+
     # ------------------------------------------------------------------
 
     async def _loop(self) -> None:
-        """Edit the status message every *interval* seconds."""
+        """Edit the status message every *interval* seconds (or with stream progress)."""
         while not self._stop.is_set():
+            if self._streaming:
+                delay = max(0.0, _STREAM_INTERVAL - (time.monotonic() - self._last_edit))
+            else:
+                delay = self._interval
             try:
-                await asyncio.wait_for(self._stop.wait(), timeout=self._interval)
-                # If we reach here, stop was set — exit
-                return
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
             except asyncio.TimeoutError:
                 pass  # timeout elapsed → time to update
+            self._wake.clear()
+            if self._stop.is_set():
+                return
 
-            text = self._next_text()
-            await self._safe_edit(text)
+            self._last_edit = time.monotonic()
+            if self._streaming:
+                # Raw model text: an unbalanced * _ or ` would fail Markdown parsing
+                await self._safe_edit(_json_preview("".join(self._buffer)), plain=True)
+            else:
+                await self._safe_edit(self._next_text())
 
     def _next_text(self) -> str:
         if self._index < len(self._messages):
@@ -145,10 +195,15 @@ class ProgressUpdater:
         self._index += 1
         return text
 
-    async def _safe_edit(self, text: str) -> None:
-        """Edit the message, swallowing expected Telegram errors."""
+    async def _safe_edit(self, text: str, *, plain: bool = False) -> None:
+        """Edit the message, swallowing expected Telegram errors.
+
+        ``plain=True`` sends the text without a parse mode (streamed previews);
+        otherwise the bot's default Markdown applies.
+        """
+        extra = {"parse_mode": None} if plain else {}
         try:
-            await self._msg.edit_text(text, reply_markup=_still_working_keyboard())
+            await self._msg.edit_text(text, reply_markup=_still_working_keyboard(), **extra)
         except Exception as exc:
             err = str(exc).lower()
             # message is not modified — same text sent twice
@@ -161,8 +216,6 @@ class ProgressUpdater:
                 return
             # Flood control — back off
             if "retry after" in err:
-                import re
-
                 m = re.search(r"retry after (\d+)", err)
                 wait = int(m.group(1)) + 1 if m else 7
                 logger.warning("Telegram flood control, backing off %ds", wait)
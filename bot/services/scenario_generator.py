@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import random
 import string
 from pathlib import Path
 
+from bot.agents.schemas import ScenarioBatchResult
 from bot.services.knowledge import KnowledgeService
+from bot.services.llm_usage import usage_scope
 from bot.storage.models import GeneratedScenarioModel
 from bot.storage.repositories import CasebookRepo, GeneratedScenarioRepo
 
@@ -34,7 +35,7 @@ class ScenarioGeneratorService:
 
     async def generate_batch(self, count: int = 5) -> list[GeneratedScenarioModel]:
         """Generate a batch of scenarios via LLM, validate, and save to DB."""
-        from bot.services.llm_router import OpenRouterProvider, _extract_json
+        from bot.services.llm_router import create_provider
 
         # Load prompt template
         if not _PROMPT_PATH.exists():
@@ -69,48 +70,29 @@ class ScenarioGeneratorService:
         # Build final prompt
         system_prompt = (
             prompt_template
-            .replace("{KNOWLEDGE_BASE_PLACEHOLDER}", self.knowledge.combined[:3000])
+            .replace("{KNOWLEDGE_BASE_PLACEHOLDER}", self.knowledge.retrieve(casebook_text, budget_tokens=750))
             .replace("{CASEBOOK_PLACEHOLDER}", casebook_text)
             .replace("{COUNT}", str(count))
         )
 
         # Call LLM
-        llm = OpenRouterProvider(self.api_key, model="moonshotai/kimi-k2.5")
+        llm = create_provider("openrouter", self.api_key, model="moonshotai/kimi-k2.5")
         try:
-            result = await llm.complete(
-                system_prompt,
-                f"Generate {count} unique training scenarios now. Return only the JSON array.",
-            )
+            with usage_scope("scenario_generator"):
+                result = await llm.complete(
+                    system_prompt,
+                    f"Generate {count} unique training scenarios now. Return only JSON.",
+                    schema=ScenarioBatchResult,
+                )
         except Exception as e:
             logger.error("Scenario generation LLM call failed: %s", e)
-            await llm.close()
             return []
         finally:
             await llm.close()
 
-        # Parse and validate
+        # Validate and save
         scenarios: list[GeneratedScenarioModel] = []
-
-        # Result could be a dict with the array inside, or parsed directly
-        raw_list: list[dict] = []
-        if isinstance(result, dict):
-            # Check if it's wrapped
-            if "scenarios" in result:
-                raw_list = result["scenarios"]
-            elif "raw_response" in result:
-                # Try to parse the raw response as a JSON array
-                try:
-                    parsed = json.loads(result["raw_response"])
-                    if isinstance(parsed, list):
-                        raw_list = parsed
-                except (json.JSONDecodeError, TypeError):
-                    logger.error("Failed to parse scenario generation response")
-                    return []
-            else:
-                # Single scenario wrapped in dict
-                raw_list = [result]
-        elif isinstance(result, list):
-            raw_list = result
+        raw_list: list[dict] = result["scenarios"]
 
         for item in raw_list:
             if not isinstance(item, dict):
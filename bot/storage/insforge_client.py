@@ -3,11 +3,27 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import json
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 
+from bot.storage.resilience import (  # noqa: F401  (CircuitOpenError re-exported for callers)
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    parse_retry_after,
+)
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is the fallback decoder
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,16 +38,138 @@ _POSTGREST_OPS = (
 RETRYABLE_STATUS_CODES = {429, 500, 502, 503}
 MAX_RETRIES = 3
 BASE_DELAY = 0.5  # seconds
+MAX_RETRY_DELAY = 10.0  # seconds; a longer Retry-After fails the call instead of blocking it
+
+# Responses that count as upstream failures for the circuit breaker
+# (429 is back-pressure, not an outage: it is retried but does not trip the breaker)
+BREAKER_FAILURE_STATUS_CODES = {500, 502, 503, 504}
+
+# Circuit breaker / retry budget defaults (overridable via Settings)
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 30.0  # seconds
+DEFAULT_RETRY_BUDGET = 20.0  # retry tokens, refilled at RETRY_BUDGET_REFILL per second
+RETRY_BUDGET_REFILL = 2.0
+
+# Rows per multi-row INSERT in create_many() — keeps request bodies well under proxy limits
+BULK_CHUNK_SIZE = 100
+
+# Rows per page fetched by query_iter()
+QUERY_PAGE_SIZE = 500
+
+# Path prefixes on the shared transport
+_RECORDS_PATH = "/api/database/records"
+_RPC_PATH = "/api/database/rpc"
+_STORAGE_PATH = "/api/storage/buckets"
+
+# Connection pool defaults (overridable via Settings)
+DEFAULT_MAX_CONNECTIONS = 50
+DEFAULT_MAX_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0  # seconds
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _decode_json(resp: httpx.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return json.loads(resp.content)
+
+
+def _error_code(exc: BaseException) -> tuple[int | None, str | None]:
+    """(HTTP status, PostgREST error code) of a failed call, or (None, None)."""
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None, None
+    try:
+        body = exc.response.json()
+    except ValueError:
+        body = None
+    code = body.get("code") if isinstance(body, dict) else None
+    return exc.response.status_code, code
+
+
+def is_missing_function(exc: BaseException) -> bool:
+    """True when an RPC failed because the function is not deployed (PostgREST 404 / PGRST202).
+
+    Timeouts, 5xx and ``CircuitOpenError`` are not: the call may have been
+    applied server-side, so it must not be replayed another way.
+    """
+    status, code = _error_code(exc)
+    return status == 404 or code == "PGRST202"
+
+
+def is_undefined_column(exc: BaseException) -> bool:
+    """True when a query failed because a selected column does not exist (PostgREST 42703 / 400)."""
+    status, code = _error_code(exc)
+    return code == "42703" or (status == 400 and code is None)
 
 
 class InsForgeClient:
-    """Async wrapper around InsForge database API."""
+    """Async wrapper around InsForge database API.
+
+    All calls (records, RPC, storage uploads) share one pooled ``httpx``
+    transport per client, so TCP+TLS handshakes are paid once per connection
+    rather than once per request.
+    """
 
-    def __init__(self, base_url: str, anon_key: str) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        anon_key: str,
+        *,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False,
+        coalesce_reads: bool = False,
+        breaker_threshold: int = DEFAULT_BREAKER_THRESHOLD,
+        breaker_cooldown: float = DEFAULT_BREAKER_COOLDOWN,
+        retry_budget: float = DEFAULT_RETRY_BUDGET,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
         self.anon_key = anon_key
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        if http2 and not _h2_available():
+            logger.warning("InsForge HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+            http2 = False
+        self._http2 = http2
+        # Custom transport (e.g. LocalInsForge) replaces the network pool entirely
+        self._transport = transport
         self._client: httpx.AsyncClient | None = None
 
+        # Single-flight state for query(): request key -> shared in-flight fetch.
+        # Writes bump a per-table generation (None = RPC, table unknown) that is
+        # part of the key, so a read issued after a write never joins an older fetch.
+        self._coalesce_reads = coalesce_reads
+        self._inflight_reads: dict[tuple[Any, ...], asyncio.Future[Any]] = {}
+        self._write_generation: dict[str | None, int] = {}
+        self._coalesced_reads = 0
+
+        # One client talks to one host: breaker + retry budget are shared by every call
+        self._breaker = CircuitBreaker(
+            httpx.URL(self.base_url).host or self.base_url,
+            failure_threshold=breaker_threshold,
+            recovery_timeout=breaker_cooldown,
+        )
+        self._retry_budget = RetryBudget(capacity=retry_budget, refill_per_second=RETRY_BUDGET_REFILL)
+
+        # Pool usage counters (see pool_stats())
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._pool_waits = 0
+        self._requests_total = 0
+
     @property
     def _headers(self) -> dict[str, str]:
         return {
@@ -42,14 +180,91 @@ class InsForgeClient:
         }
 
     async def _get_client(self) -> httpx.AsyncClient:
+        # Only auth is a client-level default: JSON headers are passed per request
+        # so multipart uploads can set their own Content-Type on the same pool.
         if self._client is None or self._client.is_closed:
             self._client = httpx.AsyncClient(
-                base_url=f"{self.base_url}/api/database/records",
-                headers=self._headers,
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.anon_key}"},
                 timeout=30.0,
+                limits=self._limits,
+                http2=self._http2,
+                transport=self._transport,
             )
         return self._client
 
+    async def warm_up(self) -> None:
+        """Open the pool and establish a first keep-alive connection.
+
+        Call once at startup so the first user request does not pay the
+        TCP+TLS handshake. Any HTTP status counts as success.
+        """
+        client = await self._get_client()
+        try:
+            await client.head("/", timeout=10.0)
+            logger.info(
+                "InsForge connection pool warmed (http2=%s, max_connections=%s, keepalive=%s)",
+                self._http2, self._limits.max_connections, self._limits.max_keepalive_connections,
+            )
+        except Exception as e:
+            logger.warning("InsForge warm-up failed (continuing): %s", e)
+
+    def pool_stats(self) -> dict[str, Any]:
+        """Snapshot of connection pool usage for monitoring."""
+        stats: dict[str, Any] = {
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "waits": self._pool_waits,
+            "requests_total": self._requests_total,
+            "coalesced_reads": self._coalesced_reads,
+            "max_connections": self._limits.max_connections,
+            "http2": self._http2,
+            "breaker": self._breaker.stats(),
+            "retry_budget": self._retry_budget.stats(),
+        }
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            idle = sum(1 for c in connections if c.is_idle())
+            stats["connections_open"] = len(connections)
+            stats["connections_idle"] = idle
+            stats["connections_in_use"] = len(connections) - idle
+        return stats
+
+    @property
+    def breaker_state(self) -> str:
+        """Circuit breaker state: ``closed``, ``open`` or ``half_open``."""
+        return self._breaker.state
+
+    async def _send(self, client: httpx.AsyncClient, method: str, *args: Any, **kwargs: Any) -> httpx.Response:
+        """Issue one request on the shared pool, tracking in-use/wait counters.
+
+        Raises ``CircuitOpenError`` without touching the network while the
+        breaker is open; every outcome is reported back to the breaker.
+        """
+        self._breaker.acquire()
+        self._requests_total += 1
+        max_conn = self._limits.max_connections
+        if max_conn is not None and self._in_flight >= max_conn:
+            self._pool_waits += 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            resp = await getattr(client, method)(*args, **kwargs)
+        except httpx.TransportError:
+            self._breaker.record_failure()
+            raise
+        except BaseException:
+            self._breaker.release()
+            raise
+        finally:
+            self._in_flight -= 1
+        if resp.status_code in BREAKER_FAILURE_STATUS_CODES:
+            self._breaker.record_failure()
+        else:
+            self._breaker.record_success()
+        return resp
+
     async def _request_with_retry(
         self,
         client: httpx.AsyncClient,
@@ -57,25 +272,37 @@ class InsForgeClient:
         *args: Any,
         **kwargs: Any,
     ) -> httpx.Response:
-        """Execute HTTP request with exponential backoff on transient failures."""
-        last_error: httpx.HTTPStatusError | None = None
+        """Execute HTTP request with exponential backoff on transient failures.
+
+        Delays honour ``Retry-After``. Each retry spends a token from the
+        client-wide retry budget; with the budget empty, the breaker open, or
+        a ``Retry-After`` beyond ``MAX_RETRY_DELAY``, the last error is
+        raised immediately instead.
+        """
         for attempt in range(MAX_RETRIES + 1):
+            resp = await self._send(client, method, *args, **kwargs)
             try:
-                resp = await getattr(client, method)(*args, **kwargs)
                 resp.raise_for_status()
                 return resp
             except httpx.HTTPStatusError as e:
-                if e.response.status_code not in RETRYABLE_STATUS_CODES:
+                if e.response.status_code not in RETRYABLE_STATUS_CODES or attempt == MAX_RETRIES:
                     raise
-                last_error = e
-                if attempt < MAX_RETRIES:
-                    delay = BASE_DELAY * (2 ** attempt)
+                retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                delay = retry_after if retry_after is not None else BASE_DELAY * (2 ** attempt)
+                if delay > MAX_RETRY_DELAY or self._breaker.state == OPEN:
+                    raise
+                if not self._retry_budget.try_spend():
                     logger.warning(
-                        "InsForge %s retryable error %d (attempt %d/%d), retrying in %.1fs",
-                        method.upper(), e.response.status_code, attempt + 1, MAX_RETRIES + 1, delay,
+                        "InsForge %s error %d: retry budget exhausted, not retrying",
+                        method.upper(), e.response.status_code,
                     )
-                    await asyncio.sleep(delay)
-        raise last_error  # type: ignore[misc]
+                    raise
+                logger.warning(
+                    "InsForge %s retryable error %d (attempt %d/%d), retrying in %.1fs",
+                    method.upper(), e.response.status_code, attempt + 1, MAX_RETRIES + 1, delay,
+                )
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
 
     async def close(self) -> None:
         if self._client and not self._client.is_closed:
@@ -90,9 +317,119 @@ class InsForgeClient:
         order: str | None = None,
         limit: int | None = None,
         single: bool = False,
+        coalesce: bool | None = None,
     ) -> list[dict[str, Any]] | dict[str, Any] | None:
-        """Query records from a table."""
+        """Query records from a table.
+
+        With single-flight enabled (``coalesce_reads`` on the client, or
+        ``coalesce=True`` per call), concurrent identical queries share one
+        in-flight HTTP request. A write to the table (or any RPC) starts a new
+        generation, so later reads never join a fetch that began before it.
+        Every caller receives its own deep copy of the decoded result, so
+        callers may still mutate what they get back.
+        """
+        params = self._build_query_params(select, filters, order, limit)
+
+        if not (self._coalesce_reads if coalesce is None else coalesce):
+            return await self._query_once(table, params, single)
+
+        key = (
+            table,
+            self._write_generation.get(table, 0),
+            self._write_generation.get(None, 0),
+            tuple(sorted(params.items())),
+            single,
+        )
+        task = self._inflight_reads.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._query_once(table, params, single))
+            self._inflight_reads[key] = task
+            task.add_done_callback(lambda _t: self._inflight_reads.pop(key, None))
+        else:
+            self._coalesced_reads += 1
+        # shield: a cancelled caller must not cancel the fetch other callers wait on
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _invalidate_reads(self, table: str | None) -> None:
+        """Start a new read generation for ``table`` (``None``: every table)."""
+        self._write_generation[table] = self._write_generation.get(table, 0) + 1
+
+    async def query_iter(
+        self,
+        table: str,
+        *,
+        select: str = "*",
+        filters: dict[str, Any] | None = None,
+        order: str | None = None,
+        page_size: int = QUERY_PAGE_SIZE,
+        key_column: str = "id",
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream rows page by page instead of loading the whole result set.
+
+        Without ``order`` this uses keyset pagination on ``key_column``
+        (``id > last_seen``), which stays cheap however deep the scan goes;
+        the key column is added to ``select`` if missing. With an explicit
+        ``order`` (or a filter on the key column) it falls back to
+        limit/offset paging in that order, advancing by the rows actually
+        returned. Paging stops at the first empty page.
+        """
+        keyset = order is None and not (filters and key_column in filters)
+        if keyset:
+            columns = [c.strip() for c in select.split(",")]
+            if select != "*" and key_column not in columns:
+                select = f"{select},{key_column}"
+            order = f"{key_column}.asc"
+
+        last_key: Any = None
+        offset = 0
+        while True:
+            params = self._build_query_params(select, filters, order, page_size)
+            if keyset and last_key is not None:
+                params[key_column] = f"gt.{last_key}"
+            elif not keyset and offset:
+                params["offset"] = str(offset)
+
+            page = await self._query_once(table, params, False)
+            if not page or not isinstance(page, list):
+                return
+            for row in page:
+                yield row
+            # A short page is not the end: the server may cap rows per response
+            # (PostgREST max-rows) below page_size. Only an empty page ends the scan.
+            last_key = page[-1].get(key_column)
+            offset += len(page)
+            if keyset and last_key is None:
+                return
+
+    async def count(self, table: str, *, filters: dict[str, Any] | None = None) -> int:
+        """Number of rows matching ``filters``, without transferring them.
+
+        Sends ``Prefer: count=exact`` with ``limit=1`` and reads the total
+        from the ``Content-Range`` header (``0-0/42``, or ``*/0`` when empty).
+        """
         client = await self._get_client()
+        params = self._build_query_params("id", filters, None, 1)
+        try:
+            resp = await self._request_with_retry(
+                client, "get", f"{_RECORDS_PATH}/{table}",
+                params=params, headers={**self._headers, "Prefer": "count=exact"},
+            )
+        except Exception as e:
+            logger.error("InsForge count error on %s: %s", table, e)
+            raise
+        total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+        if not total.isdigit():
+            raise ValueError(f"InsForge count on {table}: no exact total in Content-Range {total!r}")
+        return int(total)
+
+    @staticmethod
+    def _build_query_params(
+        select: str,
+        filters: dict[str, Any] | None,
+        order: str | None,
+        limit: int | None,
+    ) -> dict[str, str]:
+        """Translate query() arguments into PostgREST query-string params."""
         params: dict[str, str] = {"select": select}
 
         if filters:
@@ -110,14 +447,22 @@ class InsForgeClient:
             params["order"] = order
         if limit:
             params["limit"] = str(limit)
+        return params
 
+    async def _query_once(
+        self, table: str, params: dict[str, str], single: bool,
+    ) -> list[dict[str, Any]] | dict[str, Any] | None:
+        """Issue a single GET against the records API."""
+        client = await self._get_client()
         headers = dict(self._headers)
         if single:
             headers["Accept"] = "application/vnd.pgrst.object+json"
 
         try:
-            resp = await self._request_with_retry(client, "get", f"/{table}", params=params, headers=headers)
-            return resp.json()
+            resp = await self._request_with_retry(
+                client, "get", f"{_RECORDS_PATH}/{table}", params=params, headers=headers,
+            )
+            return _decode_json(resp)
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 406 and single:
                 return None
@@ -135,14 +480,14 @@ class InsForgeClient:
         try:
             resp = await self._request_with_retry(
                 client, "post",
-                f"/{table}",
+                f"{_RECORDS_PATH}/{table}",
                 json=[data],
                 headers={
                     **self._headers,
                     "Prefer": "return=representation",
                 },
             )
-            result = resp.json()
+            result = _decode_json(resp)
             return result[0] if isinstance(result, list) and result else result
         except httpx.HTTPStatusError as e:
             body = e.response.text[:500] if e.response else "no body"
@@ -154,6 +499,59 @@ class InsForgeClient:
         except Exception as e:
             logger.error("InsForge create error on %s: %s", table, e)
             raise
+        finally:
+            self._invalidate_reads(table)
+
+    async def create_many(
+        self,
+        table: str,
+        rows: list[dict[str, Any]],
+        *,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> list[dict[str, Any]]:
+        """Insert many records with one multi-row POST per chunk.
+
+        Returns the created rows in the same order as ``rows``. Rows may have
+        different key sets: the union of keys is sent as ``columns`` and
+        ``missing=default`` lets absent keys fall back to column defaults.
+        """
+        if not rows:
+            return []
+
+        client = await self._get_client()
+        created: list[dict[str, Any]] = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            columns: dict[str, None] = {}
+            for row in chunk:
+                columns.update(dict.fromkeys(row))
+            try:
+                resp = await self._request_with_retry(
+                    client, "post",
+                    f"{_RECORDS_PATH}/{table}",
+                    params={"columns": ",".join(columns)},
+                    json=chunk,
+                    headers={
+                        **self._headers,
+                        "Prefer": "return=representation,missing=default",
+                    },
+                )
+                result = _decode_json(resp)
+                if isinstance(result, list):
+                    created.extend(result)
+            except httpx.HTTPStatusError as e:
+                body = e.response.text[:500] if e.response else "no body"
+                logger.error(
+                    "InsForge bulk create error on %s (%d rows): %s | Response body: %s",
+                    table, len(chunk), e, body,
+                )
+                raise
+            except Exception as e:
+                logger.error("InsForge bulk create error on %s: %s", table, e)
+                raise
+            finally:
+                self._invalidate_reads(table)
+        return created
 
     async def update(
         self, table: str, filters: dict[str, Any], data: dict[str, Any]
@@ -170,7 +568,7 @@ class InsForgeClient:
         try:
             resp = await self._request_with_retry(
                 client, "patch",
-                f"/{table}",
+                f"{_RECORDS_PATH}/{table}",
                 params=params,
                 json=data,
                 headers={
@@ -178,7 +576,7 @@ class InsForgeClient:
                     "Prefer": "return=representation",
                 },
             )
-            result = resp.json()
+            result = _decode_json(resp)
             return result[0] if isinstance(result, list) and result else result
         except httpx.HTTPStatusError as e:
             body = e.response.text[:500] if e.response else "no body"
@@ -187,6 +585,8 @@ class InsForgeClient:
         except Exception as e:
             logger.error("InsForge update error on %s: %s", table, e)
             raise
+        finally:
+            self._invalidate_reads(table)
 
     async def upsert(
         self, table: str, data: dict[str, Any]
@@ -200,11 +600,11 @@ class InsForgeClient:
         try:
             resp = await self._request_with_retry(
                 client, "post",
-                f"/{table}",
+                f"{_RECORDS_PATH}/{table}",
                 json=[data],
                 headers=headers,
             )
-            result = resp.json()
+            result = _decode_json(resp)
             return result[0] if isinstance(result, list) and result else result
         except httpx.HTTPStatusError as e:
             body = e.response.text[:500] if e.response else "no body"
@@ -213,6 +613,8 @@ class InsForgeClient:
         except Exception as e:
             logger.error("InsForge upsert error on %s: %s", table, e)
             raise
+        finally:
+            self._invalidate_reads(table)
 
     async def delete(self, table: str, filters: dict[str, Any]) -> None:
         """Delete records matching filters."""
@@ -225,44 +627,52 @@ class InsForgeClient:
                 params[key] = f"eq.{value}"
 
         try:
-            await self._request_with_retry(client, "delete", f"/{table}", params=params)
+            await self._request_with_retry(
+                client, "delete", f"{_RECORDS_PATH}/{table}", params=params, headers=self._headers,
+            )
         except Exception as e:
             logger.error("InsForge delete error on %s: %s", table, e)
             raise
+        finally:
+            self._invalidate_reads(table)
 
     async def upload_file(
         self, bucket: str, key: str, file_bytes: bytes, content_type: str = "image/jpeg"
     ) -> dict[str, Any] | None:
         """Upload a file to InsForge storage bucket."""
-        url = f"{self.base_url}/api/storage/buckets/{bucket}/objects/{key}"
-        headers = {
-            "Authorization": f"Bearer {self.anon_key}",
-        }
+        client = await self._get_client()
         files = {"file": (key, file_bytes, content_type)}
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                resp = await client.post(url, headers=headers, files=files)
-                resp.raise_for_status()
-                return resp.json()
+            resp = await self._send(
+                client, "post",
+                f"{_STORAGE_PATH}/{bucket}/objects/{key}",
+                files=files,
+                timeout=60.0,
+            )
+            resp.raise_for_status()
+            return _decode_json(resp)
         except Exception as e:
             logger.error("InsForge upload error on %s/%s: %s", bucket, key, e)
             raise
 
     def get_file_url(self, bucket: str, key: str) -> str:
         """Get the public URL for a stored file."""
-        return f"{self.base_url}/api/storage/buckets/{bucket}/objects/{key}"
+        return f"{self.base_url}{_STORAGE_PATH}/{bucket}/objects/{key}"
 
     async def rpc(self, function_name: str, params: dict[str, Any] | None = None) -> Any:
         """Call a PostgREST RPC function via /api/database/rpc/."""
+        client = await self._get_client()
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                resp = await client.post(
-                    f"{self.base_url}/api/database/rpc/{function_name}",
-                    json=params or {},
-                    headers=self._headers,
-                )
-                resp.raise_for_status()
-                return resp.json()
+            resp = await self._send(
+                client, "post",
+                f"{_RPC_PATH}/{function_name}",
+                json=params or {},
+                headers=self._headers,
+            )
+            resp.raise_for_status()
+            return _decode_json(resp)
         except Exception as e:
             logger.error("InsForge RPC error on %s: %s", function_name, e)
             raise
+        finally:
+            self._invalidate_reads(None)
@@ -0,0 +1,421 @@
+"""In-process InsForge stand-in for tests and benchmarks (no network).
+
+``LocalInsForge`` is an ``httpx`` transport that implements the subset of
+the InsForge PostgREST proxy that ``InsForgeClient`` uses:
+
+- ``/api/database/records/{table}``: GET with select / eq, neq, gt, gte,
+  lt, lte, like, ilike, in, is filters / order / limit / offset /
+  ``Prefer: count=exact``; POST
+  (single + multi-row, ``columns``, ``Prefer: return=representation``,
+  ``missing=default``, ``resolution=merge-duplicates``); PATCH; DELETE
+- ``/api/database/rpc/{fn}``: Python handlers, with the migration-011
+  counter functions registered by default
+- ``/api/storage/buckets/{bucket}/objects/{key}``: in-memory uploads
+
+Rows live in plain dicts. Latency and error rates can be injected to
+reproduce slow or flaky upstream behaviour deterministically::
+
+    local = LocalInsForge(latency=0.02, error_rate=0.05, seed=1)
+    client = InsForgeClient("http://insforge.local", "local", transport=local)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import json
+import random
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import unquote
+
+import httpx
+
+RpcHandler = Callable[["LocalInsForge", dict[str, Any]], Any]
+
+# Unique constraints that matter for upsert/duplicate behaviour (mirrors insforge/ + migrations/)
+DEFAULT_UNIQUE_KEYS: dict[str, tuple[str, ...]] = {
+    "users": ("telegram_id",),
+    "user_memory": ("telegram_id",),
+    "scenarios_seen": ("telegram_id", "scenario_id"),
+    "agent_model_config": ("agent_name",),
+    "generated_scenarios": ("scenario_id",),
+}
+
+
+def _has_engagement_plan(row: dict[str, Any]) -> bool:
+    plan = row.get("engagement_plan")
+    return isinstance(plan, list) and len(plan) > 0
+
+
+# Generated columns, computed on read (mirrors migrations that add GENERATED ... STORED)
+DEFAULT_COMPUTED_COLUMNS: dict[str, dict[str, Callable[[dict[str, Any]], Any]]] = {
+    "lead_registry": {"has_engagement_plan": _has_engagement_plan},  # 012_lead_summary_projection.sql
+}
+
+# Status returned for injected failures — retryable in InsForgeClient
+INJECTED_ERROR_STATUS = 503
+
+_RANGE_OPS = {
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+# Query-string keys that are not column filters
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "columns", "on_conflict"}
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _coerce(raw: str, sample: Any) -> Any:
+    """Convert a query-string literal to the type of the stored value it is compared with."""
+    if isinstance(sample, bool):
+        return raw.lower() == "true"
+    if isinstance(sample, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return float(raw)
+    if isinstance(sample, float):
+        return float(raw)
+    if isinstance(sample, str):
+        # Timestamps: compare as datetimes so "Z" and "+00:00" forms agree
+        try:
+            return datetime.fromisoformat(raw.replace("Z", "+00:00"))
+        except ValueError:
+            return raw
+    return raw
+
+
+def _literal(raw: str, sample: Any) -> Any:
+    """Equality operand: strings compare verbatim, other types are coerced."""
+    return raw if isinstance(sample, str) else _coerce(raw, sample)
+
+
+def _comparable(value: Any, target: Any) -> Any:
+    if isinstance(target, datetime) and isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    return value
+
+
+def _match(row: dict[str, Any], column: str, expr: str) -> bool:
+    """Evaluate one PostgREST filter expression (``op.value``) against a row."""
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+    op, _, raw = expr.partition(".")
+    raw = unquote(raw)
+    value = row.get(column)
+
+    if op == "is":
+        result = {"null": value is None, "true": value is True, "false": value is False}.get(raw.lower(), False)
+    elif value is None:
+        result = False
+    elif op == "in":
+        items = [v.strip().strip('"') for v in raw.strip("()").split(",") if v.strip()]
+        result = value in [_literal(v, value) for v in items]
+    elif op == "eq":
+        result = value == _literal(raw, value)
+    elif op == "neq":
+        result = value != _literal(raw, value)
+    elif op in _RANGE_OPS:
+        target = _coerce(raw, value)
+        try:
+            result = _RANGE_OPS[op](_comparable(value, target), target)
+        except TypeError:
+            result = _RANGE_OPS[op](str(value), raw)
+    elif op in ("like", "ilike"):
+        pattern = raw.replace("%", "*")
+        if op == "ilike":
+            result = fnmatch.fnmatchcase(str(value).lower(), pattern.lower())
+        else:
+            result = fnmatch.fnmatchcase(str(value), pattern)
+    else:
+        raise ValueError(f"unsupported operator: {op}")
+    return not result if negate else result
+
+
+def _order_rows(rows: list[dict[str, Any]], order: str) -> list[dict[str, Any]]:
+    """Apply ``col.asc|desc[.nullsfirst|nullslast]`` terms (last term sorted first)."""
+    for term in reversed([t.strip() for t in order.split(",") if t.strip()]):
+        parts = term.split(".")
+        column = parts[0]
+        desc = "desc" in parts[1:]
+        # PostgreSQL default: NULLS LAST for ASC, NULLS FIRST for DESC
+        nulls_first = "nullsfirst" in parts[1:] or (desc and "nullslast" not in parts[1:])
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=desc)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+def _project(row: dict[str, Any], select: str) -> dict[str, Any]:
+    if not select or select.strip() == "*":
+        return dict(row)
+    columns = [c.strip() for c in select.split(",") if c.strip()]
+    return {c: row.get(c) for c in columns}
+
+
+class LocalInsForge(httpx.AsyncBaseTransport):
+    """In-memory PostgREST/InsForge fake usable as an ``httpx`` transport."""
+
+    def __init__(
+        self,
+        *,
+        latency: float | tuple[float, float] = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+        unique_keys: dict[str, tuple[str, ...]] | None = None,
+        computed_columns: dict[str, dict[str, Callable[[dict[str, Any]], Any]]] | None = None,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self.unique_keys = {**DEFAULT_UNIQUE_KEYS, **(unique_keys or {})}
+        self.computed_columns = {**DEFAULT_COMPUTED_COLUMNS, **(computed_columns or {})}
+        self.tables: dict[str, list[dict[str, Any]]] = {}
+        self.files: dict[tuple[str, str], bytes] = {}
+        self._next_id: Counter[str] = Counter()
+        self._rpc: dict[str, RpcHandler] = {}
+        self.requests: Counter[str] = Counter()
+        self.injected_errors = 0
+        for name, handler in _DEFAULT_RPCS.items():
+            self.register_rpc(name, handler)
+
+    # ── Seeding / inspection ──────────────────────────────────────
+
+    def seed_rows(self, table: str, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Insert rows directly (no latency/errors); returns the stored copies."""
+        return [self._insert(table, dict(r)) for r in rows]
+
+    def rows(self, table: str) -> list[dict[str, Any]]:
+        return self.tables.setdefault(table, [])
+
+    def register_rpc(self, name: str, handler: RpcHandler) -> None:
+        """Register ``handler(local, params) -> result`` for ``/rpc/{name}``."""
+        self._rpc[name] = handler
+
+    def reset_stats(self) -> None:
+        self.requests.clear()
+        self.injected_errors = 0
+
+    # ── Transport entry point ─────────────────────────────────────
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        path = request.url.path
+        self.requests[f"{request.method} {path}"] += 1
+
+        delay = self._rng.uniform(*self.latency) if isinstance(self.latency, tuple) else self.latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.error_rate > 0 and self._rng.random() < self.error_rate:
+            self.injected_errors += 1
+            return self._error(INJECTED_ERROR_STATUS, "injected failure", "LOCAL")
+
+        try:
+            if path.startswith("/api/database/records/"):
+                return self._records(request, path.removeprefix("/api/database/records/"))
+            if path.startswith("/api/database/rpc/"):
+                return self._call_rpc(request, path.removeprefix("/api/database/rpc/"))
+            if path.startswith("/api/storage/buckets/"):
+                return self._storage(request, path.removeprefix("/api/storage/buckets/"))
+            if path == "/":
+                return httpx.Response(200, json={"status": "ok"})
+        except ValueError as e:
+            return self._error(400, str(e), "PGRST100")
+        return self._error(404, f"no route for {request.method} {path}", "PGRST404")
+
+    # ── Records ───────────────────────────────────────────────────
+
+    def _records(self, request: httpx.Request, table: str) -> httpx.Response:
+        params = request.url.params
+        prefer = request.headers.get("prefer", "")
+        method = request.method
+
+        if method == "GET":
+            rows = self._select(table, params)
+            if "vnd.pgrst.object" in request.headers.get("accept", ""):
+                if len(rows) != 1:
+                    return self._error(406, f"expected 1 row, got {len(rows)}", "PGRST116")
+                return httpx.Response(200, json=rows[0])
+            if "count=exact" in prefer:
+                total = len(self._filtered(table, params))
+                offset = int(params.get("offset", 0))
+                span = f"{offset}-{offset + len(rows) - 1}" if rows else "*"
+                return httpx.Response(200, json=rows, headers={"Content-Range": f"{span}/{total}"})
+            return httpx.Response(200, json=rows)
+
+        if method == "POST":
+            body = json.loads(request.content or b"[]")
+            payload = body if isinstance(body, list) else [body]
+            columns = params.get("columns")
+            if columns:
+                keep = {c.strip() for c in columns.split(",")}
+                payload = [{k: v for k, v in row.items() if k in keep} for row in payload]
+            merge = "resolution=merge-duplicates" in prefer
+            conflict = params.get("on_conflict")
+            conflict_keys = tuple(conflict.split(",")) if conflict else None
+            created: list[dict[str, Any]] = []
+            for row in payload:
+                existing = self._find_conflict(table, row, conflict_keys)
+                if existing is not None:
+                    if not merge:
+                        return self._error(409, "duplicate key value violates unique constraint", "23505")
+                    existing.update(row)
+                    created.append(dict(existing))
+                else:
+                    created.append(self._insert(table, row))
+            return self._representation(created, prefer, 201)
+
+        if method == "PATCH":
+            data = json.loads(request.content or b"{}")
+            updated = []
+            for row in self._filtered(table, params):
+                row.update(data)
+                updated.append(dict(row))
+            return self._representation(updated, prefer, 200)
+
+        if method == "DELETE":
+            doomed = self._filtered(table, params)
+            ids = {id(r) for r in doomed}
+            self.tables[table] = [r for r in self.rows(table) if id(r) not in ids]
+            return self._representation([dict(r) for r in doomed], prefer, 200)
+
+        return self._error(405, f"method {method} not allowed", "PGRST105")
+
+    def _filtered(self, table: str, params: httpx.QueryParams) -> list[dict[str, Any]]:
+        filters = [(k, v) for k, v in params.multi_items() if k not in _RESERVED_PARAMS]
+        return [r for r in self.rows(table) if all(_match(self._view(table, r), k, v) for k, v in filters)]
+
+    def _view(self, table: str, row: dict[str, Any]) -> dict[str, Any]:
+        """Row as seen by readers, including generated columns."""
+        computed = self.computed_columns.get(table)
+        if not computed:
+            return row
+        return {**row, **{name: fn(row) for name, fn in computed.items()}}
+
+    def _select(self, table: str, params: httpx.QueryParams) -> list[dict[str, Any]]:
+        rows = self._filtered(table, params)
+        if params.get("order"):
+            rows = _order_rows(rows, params["order"])
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        rows = rows[offset:offset + int(limit)] if limit else rows[offset:]
+        return [_project(self._view(table, r), params.get("select", "*")) for r in rows]
+
+    def _find_conflict(
+        self, table: str, row: dict[str, Any], keys: tuple[str, ...] | None,
+    ) -> dict[str, Any] | None:
+        candidates = [keys] if keys else [("id",), self.unique_keys.get(table, ())]
+        for cols in candidates:
+            if not cols or any(row.get(c) is None for c in cols):
+                continue
+            for existing in self.rows(table):
+                if all(existing.get(c) == row[c] for c in cols):
+                    return existing
+        return None
+
+    def _insert(self, table: str, row: dict[str, Any]) -> dict[str, Any]:
+        if row.get("id") is None:
+            self._next_id[table] += 1
+            row["id"] = self._next_id[table]
+        else:
+            self._next_id[table] = max(self._next_id[table], int(row["id"]))
+        row.setdefault("created_at", _now_iso())
+        self.rows(table).append(row)
+        return dict(row)
+
+    @staticmethod
+    def _representation(rows: list[dict[str, Any]], prefer: str, status: int) -> httpx.Response:
+        if "return=representation" in prefer:
+            return httpx.Response(status, json=rows)
+        return httpx.Response(204 if status == 200 else status)
+
+    @staticmethod
+    def _error(status: int, message: str, code: str) -> httpx.Response:
+        return httpx.Response(status, json={"code": code, "message": message, "details": None, "hint": None})
+
+    # ── RPC / storage ─────────────────────────────────────────────
+
+    def _call_rpc(self, request: httpx.Request, name: str) -> httpx.Response:
+        handler = self._rpc.get(name)
+        if handler is None:
+            return self._error(404, f"Could not find the function {name}", "PGRST202")
+        params = json.loads(request.content or b"{}")
+        return httpx.Response(200, json=handler(self, params))
+
+    def _storage(self, request: httpx.Request, rest: str) -> httpx.Response:
+        bucket, _, key = rest.partition("/objects/")
+        if request.method == "POST":
+            self.files[(bucket, key)] = request.content
+            return httpx.Response(200, json={"bucket": bucket, "key": key, "size": len(request.content)})
+        if request.method == "GET" and (bucket, key) in self.files:
+            return httpx.Response(200, content=self.files[(bucket, key)])
+        return self._error(404, "object not found", "404")
+
+
+# ── Built-in RPCs (insforge/migrations/011_atomic_counters.sql) ──────
+
+
+def _rpc_increment_xp_and_level(local: LocalInsForge, params: dict[str, Any]) -> list[dict[str, Any]]:
+    for row in local.rows("users"):
+        if row.get("telegram_id") == params["p_telegram_id"]:
+            row["total_xp"] = (row.get("total_xp") or 0) + params["p_xp"]
+            remaining, level = row["total_xp"], 1
+            while remaining >= level * 200:
+                remaining -= level * 200
+                level += 1
+            row["current_level"] = level
+            row["updated_at"] = _now_iso()
+            return [dict(row)]
+    return []
+
+
+def _rpc_increment_scenario_usage(local: LocalInsForge, params: dict[str, Any]) -> list[dict[str, Any]]:
+    for row in local.rows("generated_scenarios"):
+        if row.get("scenario_id") == params["p_scenario_id"]:
+            used = row.get("times_used") or 0
+            row["avg_score"] = round(((row.get("avg_score") or 0) * used + params["p_score"]) / (used + 1), 2)
+            row["times_used"] = used + 1
+            return [dict(row)]
+    return []
+
+
+def _rpc_bump_reminder_count(local: LocalInsForge, params: dict[str, Any]) -> list[dict[str, Any]]:
+    for row in local.rows("scheduled_reminders"):
+        if row.get("id") == params["p_reminder_id"]:
+            row["reminder_count"] = (row.get("reminder_count") or 0) + 1
+            row["last_reminded_at"] = params["p_now"]
+            row["updated_at"] = params["p_now"]
+            return [dict(row)]
+    return []
+
+
+def _rpc_snooze_reminder(local: LocalInsForge, params: dict[str, Any]) -> list[dict[str, Any]]:
+    for row in local.rows("scheduled_reminders"):
+        if row.get("id") == params["p_reminder_id"]:
+            row["due_at"] = params["p_new_due"]
+            row["status"] = "pending"
+            row["snooze_count"] = (row.get("snooze_count") or 0) + 1
+            row["updated_at"] = _now_iso()
+            return [dict(row)]
+    return []
+
+
+_DEFAULT_RPCS: dict[str, RpcHandler] = {
+    "increment_xp_and_level": _rpc_increment_xp_and_level,
+    "increment_scenario_usage": _rpc_increment_scenario_usage,
+    "bump_reminder_count": _rpc_bump_reminder_count,
+    "snooze_reminder": _rpc_snooze_reminder,
+}
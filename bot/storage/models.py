@@ -109,6 +109,24 @@ class LeadRegistryModel(BaseModel):
     updated_at: str | None = None
 
 
+class LeadSummaryModel(BaseModel):
+    """Lightweight lead projection for list/pagination screens (no analysis blobs)."""
+
+    id: int | None = None
+    user_id: int | None = None
+    telegram_id: int
+    prospect_name: str | None = None
+    prospect_first_name: str | None = None
+    prospect_last_name: str | None = None
+    prospect_company: str | None = None
+    status: str = "analyzed"
+    photo_url: str | None = None
+    has_engagement_plan: bool = False
+    next_followup: str | None = None
+    created_at: str | None = None
+    updated_at: str | None = None
+
+
 class LeadActivityModel(BaseModel):
     id: int | None = None
     lead_id: int
@@ -276,3 +294,23 @@ class TmaEventModel(BaseModel):
     status: str = "pending"
     created_at: str | None = None
     delivered_at: str | None = None
+
+
+class LLMUsageModel(BaseModel):
+    """Tokens, cost and latency of one upstream LLM call."""
+
+    id: int | None = None
+    provider: str  # claude, openrouter
+    model: str
+    kind: str = "complete"  # complete, stream, tools, research
+    agent: str | None = None
+    pipeline: str | None = None
+    telegram_id: int | None = None
+    trace_id: str | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    cost: float | None = None  # USD, when the upstream reports it
+    latency_ms: float = 0.0
+    created_at: str | None = None
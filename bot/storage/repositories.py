@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, TypeVar
 
-from bot.storage.insforge_client import InsForgeClient
+from pydantic import BaseModel, TypeAdapter
+
+from bot.storage.cache import TTLCache
+from bot.storage.insforge_client import InsForgeClient, is_missing_function, is_undefined_column
 from bot.storage.models import (
     AgentModelConfigModel,
     AttemptModel,
@@ -17,6 +21,8 @@ from bot.storage.models import (
     LeadActivityModel,
     LeadAnalysisHistoryModel,
     LeadRegistryModel,
+    LeadSummaryModel,
+    LLMUsageModel,
     PipelineSpanModel,
     PipelineTraceModel,
     PlanRequestModel,
@@ -31,33 +37,123 @@ from bot.storage.models import (
 
 logger = logging.getLogger(__name__)
 
+# Column projections — list/summary reads select only what their screens
+# render; detail views keep the full row.
+LEAD_FULL_COLUMNS = "*"
+LEAD_SUMMARY_COLUMNS = (
+    "id,user_id,telegram_id,prospect_name,prospect_first_name,prospect_last_name,"
+    "prospect_company,status,photo_url,has_engagement_plan,next_followup,created_at,updated_at"
+)
+ATTEMPT_SCORE_COLUMNS = "id,user_id,telegram_id,scenario_id,mode,score,xp_earned,created_at"
+USER_MEMORY_COLUMNS = "id,user_id,telegram_id,memory_data"
+
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@functools.cache
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter[list[Any]]:
+    """Build (once per model) a validator for a whole list of rows."""
+    return TypeAdapter(list[model])  # type: ignore[valid-type]
+
+
+def _validate_rows(model: type[M], rows: Any) -> list[M]:
+    """Validate a query result into models in one pydantic call (empty on non-list)."""
+    if not rows or not isinstance(rows, list):
+        return []
+    return _list_adapter(model).validate_python(rows)
+
+
+def _first_row(result: Any) -> dict[str, Any] | None:
+    """Normalize an RPC result (SETOF row → list, or a single object) to one row."""
+    if isinstance(result, list):
+        return result[0] if result else None
+    return result if isinstance(result, dict) else None
+
 
 class UserRepo:
-    def __init__(self, client: InsForgeClient) -> None:
+    """Users table with a read-through cache on get_by_telegram_id.
+
+    Writes through this repo refresh or invalidate the cached entry; writes
+    from elsewhere (e.g. the TMA) become visible within ``cache_ttl`` seconds.
+    Missing users are never cached so a fresh /start is seen immediately.
+    """
+
+    def __init__(
+        self,
+        client: InsForgeClient,
+        *,
+        cache_ttl: float = 30.0,
+        cache_size: int = 1024,
+    ) -> None:
         self.client = client
         self.table = "users"
+        self._cache: TTLCache[UserModel] = TTLCache(ttl=cache_ttl, max_size=cache_size)
+
+    def cache_stats(self) -> dict[str, Any]:
+        return self._cache.stats()
 
     async def get_by_telegram_id(self, telegram_id: int) -> UserModel | None:
+        cached = self._cache.get(telegram_id)
+        if cached is not None:
+            return cached.model_copy()
         rows = await self.client.query(
             self.table, filters={"telegram_id": telegram_id}, limit=1
         )
         if rows and isinstance(rows, list) and len(rows) > 0:
-            return UserModel(**rows[0])
+            user = UserModel(**rows[0])
+            self._cache.set(telegram_id, user.model_copy())
+            return user
         return None
 
     async def create(self, user: UserModel) -> UserModel:
         data = user.model_dump(exclude_none=True, exclude={"id", "created_at", "updated_at"})
         result = await self.client.create(self.table, data)
+        self._cache.invalidate(user.telegram_id)
         return UserModel(**result) if result else user
 
     async def update(self, telegram_id: int, **kwargs: Any) -> UserModel | None:
         kwargs["updated_at"] = datetime.now(timezone.utc).isoformat()
-        result = await self.client.update(
-            self.table, {"telegram_id": telegram_id}, kwargs
-        )
-        return UserModel(**result) if result else None
+        try:
+            result = await self.client.update(
+                self.table, {"telegram_id": telegram_id}, kwargs
+            )
+        except Exception:
+            self._cache.invalidate(telegram_id)
+            raise
+        if not result:
+            self._cache.invalidate(telegram_id)
+            return None
+        user = UserModel(**result)
+        self._cache.set(telegram_id, user.model_copy())
+        return user
 
     async def update_xp(self, telegram_id: int, xp_to_add: int) -> UserModel | None:
+        """Atomically add XP and recompute level via the increment_xp_and_level RPC.
+
+        Falls back to read-modify-write only if the function is not deployed
+        yet (see insforge/migrations/011_atomic_counters.sql); any other RPC
+        failure is raised, since the increment may already have been applied.
+        """
+        try:
+            row = _first_row(await self.client.rpc(
+                "increment_xp_and_level",
+                {"p_telegram_id": telegram_id, "p_xp": xp_to_add},
+            ))
+        except Exception as e:
+            if not is_missing_function(e):
+                self._cache.invalidate(telegram_id)  # the increment may have landed
+                raise
+            logger.warning("increment_xp_and_level RPC not deployed, falling back to read-modify-write")
+        else:
+            if not row:
+                self._cache.invalidate(telegram_id)
+                return None
+            user = UserModel(**row)
+            self._cache.set(telegram_id, user.model_copy())
+            return user
+
+        self._cache.invalidate(telegram_id)
         user = await self.get_by_telegram_id(telegram_id)
         if not user:
             return None
@@ -74,6 +170,7 @@ class UserRepo:
         return await self.update(telegram_id, total_xp=new_xp, current_level=level)
 
     async def delete_by_telegram_id(self, telegram_id: int) -> None:
+        self._cache.invalidate(telegram_id)
         await self.client.delete(self.table, {"telegram_id": telegram_id})
 
 
@@ -84,7 +181,10 @@ class UserMemoryRepo:
 
     async def get(self, telegram_id: int) -> UserMemoryModel | None:
         rows = await self.client.query(
-            self.table, filters={"telegram_id": telegram_id}, limit=1
+            self.table,
+            select=USER_MEMORY_COLUMNS,
+            filters={"telegram_id": telegram_id},
+            limit=1,
         )
         if rows and isinstance(rows, list) and len(rows) > 0:
             return UserMemoryModel(**rows[0])
@@ -193,20 +293,20 @@ class AttemptRepo:
             filters={"telegram_id": telegram_id, "scenario_id": scenario_id},
             order="created_at.desc",
         )
-        if rows and isinstance(rows, list):
-            return [AttemptModel(**r) for r in rows]
-        return []
+        return _validate_rows(AttemptModel, rows)
 
-    async def get_recent(self, telegram_id: int, limit: int = 10) -> list[AttemptModel]:
+    async def get_recent(
+        self, telegram_id: int, limit: int = 10, *, select: str = ATTEMPT_SCORE_COLUMNS,
+    ) -> list[AttemptModel]:
+        """Recent attempts for score summaries — skips feedback_json unless asked for."""
         rows = await self.client.query(
             self.table,
+            select=select,
             filters={"telegram_id": telegram_id},
             order="created_at.desc",
             limit=limit,
         )
-        if rows and isinstance(rows, list):
-            return [AttemptModel(**r) for r in rows]
-        return []
+        return _validate_rows(AttemptModel, rows)
 
     async def get_all_recent(self, limit: int = 100) -> list[AttemptModel]:
         """Get recent attempts across all users (for team analytics)."""
@@ -215,9 +315,7 @@ class AttemptRepo:
             order="created_at.desc",
             limit=limit,
         )
-        if rows and isinstance(rows, list):
-            return [AttemptModel(**r) for r in rows]
-        return []
+        return _validate_rows(AttemptModel, rows)
 
     async def get_team_for_scenario(self, scenario_id: str) -> list[AttemptModel]:
         """Get all team answers for a specific scenario."""
@@ -226,9 +324,7 @@ class AttemptRepo:
             filters={"scenario_id": scenario_id},
             order="created_at.desc",
         )
-        if rows and isinstance(rows, list):
-            return [AttemptModel(**r) for r in rows]
-        return []
+        return _validate_rows(AttemptModel, rows)
 
 
 class SupportSessionRepo:
@@ -253,9 +349,7 @@ class TrackProgressRepo:
             filters={"telegram_id": telegram_id, "track_id": track_id},
             order="level_id.asc",
         )
-        if rows and isinstance(rows, list):
-            return [TrackProgressModel(**r) for r in rows]
-        return []
+        return _validate_rows(TrackProgressModel, rows)
 
     async def get_level(self, telegram_id: int, track_id: str, level_id: str) -> TrackProgressModel | None:
         rows = await self.client.query(
@@ -310,19 +404,31 @@ class TrackProgressRepo:
 
     async def init_track(self, user_id: int, telegram_id: int, track_id: str, level_ids: list[str]) -> None:
         """Initialize track progress for all levels: first unlocked, rest locked."""
-        for i, level_id in enumerate(level_ids):
-            existing = await self.get_level(telegram_id, track_id, level_id)
-            if not existing:
-                await self.client.create(
-                    self.table,
-                    {
-                        "user_id": user_id,
-                        "telegram_id": telegram_id,
-                        "track_id": track_id,
-                        "level_id": level_id,
-                        "status": "unlocked" if i == 0 else "locked",
-                    },
-                )
+        if not level_ids:
+            return
+        rows = await self.client.query(
+            self.table,
+            select="level_id",
+            filters={
+                "telegram_id": telegram_id,
+                "track_id": track_id,
+                "level_id": f"in.({','.join(level_ids)})",
+            },
+        )
+        existing = {r["level_id"] for r in rows} if rows and isinstance(rows, list) else set()
+        missing = [
+            {
+                "user_id": user_id,
+                "telegram_id": telegram_id,
+                "track_id": track_id,
+                "level_id": level_id,
+                "status": "unlocked" if i == 0 else "locked",
+            }
+            for i, level_id in enumerate(level_ids)
+            if level_id not in existing
+        ]
+        if missing:
+            await self.client.create_many(self.table, missing)
 
 
 class LeadRegistryRepo:
@@ -345,8 +451,21 @@ class LeadRegistryRepo:
         if not prospect_name and not prospect_company:
             return None
 
-        # Fetch user's recent leads and match in Python (PostgREST has limited fuzzy support)
-        leads = await self.get_for_user(telegram_id, limit=50)
+        # Match on the summary projection in Python (PostgREST has limited fuzzy
+        # support), then load the full row only for the hit.
+        match = self._match_duplicate(
+            await self.get_summaries_for_user(telegram_id, limit=50),
+            prospect_name,
+            prospect_company,
+        )
+        if match is None or match.id is None:
+            return None
+        return await self.get_by_id(match.id)
+
+    @staticmethod
+    def _match_duplicate(
+        leads: list[LeadSummaryModel], prospect_name: str | None, prospect_company: str | None,
+    ) -> LeadSummaryModel | None:
         for lead in leads:
             # Match by name (case-insensitive)
             if prospect_name and lead.prospect_name:
@@ -375,9 +494,7 @@ class LeadRegistryRepo:
             order="created_at.desc",
             limit=limit,
         )
-        if rows and isinstance(rows, list):
-            return [LeadRegistryModel(**r) for r in rows]
-        return []
+        return _validate_rows(LeadRegistryModel, rows)
 
     async def get_all(self, limit: int = 50) -> list[LeadRegistryModel]:
         rows = await self.client.query(
@@ -385,13 +502,53 @@ class LeadRegistryRepo:
             order="created_at.desc",
             limit=limit,
         )
-        if rows and isinstance(rows, list):
-            return [LeadRegistryModel(**r) for r in rows]
-        return []
+        return _validate_rows(LeadRegistryModel, rows)
+
+    async def get_summaries_for_user(self, telegram_id: int, limit: int = 20) -> list[LeadSummaryModel]:
+        """List-screen projection of a user's leads (newest first)."""
+        return await self._get_summaries({"telegram_id": telegram_id}, limit)
+
+    async def get_all_summaries(self, limit: int = 50) -> list[LeadSummaryModel]:
+        """List-screen projection of all leads (newest first)."""
+        return await self._get_summaries(None, limit)
+
+    async def _get_summaries(
+        self, filters: dict[str, Any] | None, limit: int
+    ) -> list[LeadSummaryModel]:
+        try:
+            rows = await self.client.query(
+                self.table,
+                select=LEAD_SUMMARY_COLUMNS,
+                filters=filters,
+                order="created_at.desc",
+                limit=limit,
+            )
+        except Exception as e:
+            # has_engagement_plan comes from migration 012 — derive it from the
+            # full row until that column exists. Anything else (timeouts, 5xx,
+            # open breaker) is not retried with the heavier query.
+            if not is_undefined_column(e):
+                raise
+            logger.warning("Lead summary projection failed, falling back to full rows: %s", e)
+            rows = await self.client.query(
+                self.table,
+                select=LEAD_FULL_COLUMNS,
+                filters=filters,
+                order="created_at.desc",
+                limit=limit,
+            )
+            if rows and isinstance(rows, list):
+                return _validate_rows(
+                    LeadSummaryModel,
+                    [{**r, "has_engagement_plan": bool(r.get("engagement_plan"))} for r in rows],
+                )
+            return []
+        return _validate_rows(LeadSummaryModel, rows)
 
     async def get_by_id(self, lead_id: int) -> LeadRegistryModel | None:
         rows = await self.client.query(
-            self.table, filters={"id": lead_id}, limit=1
+            self.table, select=LEAD_FULL_COLUMNS, filters={"id": lead_id}, limit=1,
+            coalesce=True,
         )
         if rows and isinstance(rows, list) and len(rows) > 0:
             return LeadRegistryModel(**rows[0])
@@ -433,7 +590,7 @@ class LeadRegistryRepo:
         if not rows or not isinstance(rows, list):
             return []
 
-        leads = [LeadRegistryModel(**r) for r in rows]
+        leads = _validate_rows(LeadRegistryModel, rows)
 
         # Filter in Python: exclude closed, verify next_followup is due
         from datetime import datetime as _dt
@@ -580,9 +737,7 @@ class LeadActivityRepo:
             order="created_at.desc",
             limit=limit,
         )
-        if rows and isinstance(rows, list):
-            return [LeadActivityModel(**r) for r in rows]
-        return []
+        return _validate_rows(LeadActivityModel, rows)
 
     async def get_recent_for_user(self, telegram_id: int, limit: int = 10) -> list[LeadActivityModel]:
         rows = await self.client.query(
@@ -591,9 +746,7 @@ class LeadActivityRepo:
             order="created_at.desc",
             limit=limit,
         )
-        if rows and isinstance(rows, list):
-            return [LeadActivityModel(**r) for r in rows]
-        return []
+        return _validate_rows(LeadActivityModel, rows)
 
 
 class LeadAnalysisHistoryRepo:
@@ -653,9 +806,7 @@ class LeadAnalysisHistoryRepo:
             order="version_number.desc",
             limit=limit,
         )
-        if rows and isinstance(rows, list):
-            return [LeadAnalysisHistoryModel(**r) for r in rows]
-        return []
+        return _validate_rows(LeadAnalysisHistoryModel, rows)
 
     async def get_latest(self, lead_id: int) -> LeadAnalysisHistoryModel | None:
         """Get the most recent analysis version for a lead."""
@@ -714,7 +865,7 @@ class ScheduledReminderRepo:
         if not rows or not isinstance(rows, list):
             return []
 
-        reminders = [ScheduledReminderModel(**r) for r in rows]
+        reminders = _validate_rows(ScheduledReminderModel, rows)
 
         # Filter in Python: verify due_at is due
         from datetime import datetime as _dt
@@ -766,6 +917,16 @@ class ScheduledReminderRepo:
 
     async def mark_reminded(self, reminder_id: int, now_iso: str) -> None:
         """Mark a reminder as having been sent (increment reminder_count)."""
+        try:
+            await self.client.rpc(
+                "bump_reminder_count", {"p_reminder_id": reminder_id, "p_now": now_iso},
+            )
+            return
+        except Exception as e:
+            if not is_missing_function(e):
+                raise
+            logger.warning("bump_reminder_count RPC not deployed, falling back to read-modify-write")
+
         rows = await self.client.query(
             self.table,
             filters={"id": reminder_id},
@@ -795,6 +956,16 @@ class ScheduledReminderRepo:
 
     async def snooze(self, reminder_id: int, new_due_iso: str) -> None:
         """Snooze a reminder by updating due_at and incrementing snooze_count."""
+        try:
+            await self.client.rpc(
+                "snooze_reminder", {"p_reminder_id": reminder_id, "p_new_due": new_due_iso},
+            )
+            return
+        except Exception as e:
+            if not is_missing_function(e):
+                raise
+            logger.warning("snooze_reminder RPC not deployed, falling back to read-modify-write")
+
         rows = await self.client.query(
             self.table,
             filters={"id": reminder_id},
@@ -828,9 +999,7 @@ class ScheduledReminderRepo:
             filters={"lead_id": lead_id},
             order="step_id.asc",
         )
-        if rows and isinstance(rows, list):
-            return [ScheduledReminderModel(**r) for r in rows]
-        return []
+        return _validate_rows(ScheduledReminderModel, rows)
 
     async def get_by_lead_and_step(self, lead_id: int, step_id: int) -> ScheduledReminderModel | None:
         """Get a specific reminder by lead_id and step_id."""
@@ -856,15 +1025,19 @@ class CasebookRepo:
             order="quality_score.desc",
             limit=limit,
         )
-        if rows and isinstance(rows, list):
-            return [CasebookModel(**r) for r in rows]
-        return []
+        return _validate_rows(CasebookModel, rows)
 
     async def create(self, entry: CasebookModel) -> CasebookModel:
         data = entry.model_dump(exclude_none=True, exclude={"id", "created_at"})
         result = await self.client.create(self.table, data)
         return CasebookModel(**result) if result else entry
 
+    async def create_many(self, entries: list[CasebookModel]) -> list[CasebookModel]:
+        """Bulk-insert casebook entries (backfills, imports) in chunked requests."""
+        data = [e.model_dump(exclude_none=True, exclude={"id", "created_at"}) for e in entries]
+        rows = await self.client.create_many(self.table, data)
+        return _validate_rows(CasebookModel, rows) if rows else entries
+
 
 class GeneratedScenarioRepo:
     def __init__(self, client: InsForgeClient) -> None:
@@ -876,10 +1049,9 @@ class GeneratedScenarioRepo:
             self.table,
             order="created_at.desc",
             limit=limit,
+            coalesce=True,
         )
-        if rows and isinstance(rows, list):
-            return [GeneratedScenarioModel(**r) for r in rows]
-        return []
+        return _validate_rows(GeneratedScenarioModel, rows)
 
     async def get_unseen(self, seen_ids: list[str], limit: int = 50) -> list[GeneratedScenarioModel]:
         """Get generated scenarios not in the seen list."""
@@ -893,6 +1065,16 @@ class GeneratedScenarioRepo:
 
     async def increment_usage(self, scenario_id: str, score: int) -> None:
         """Increment times_used and update running avg_score."""
+        try:
+            await self.client.rpc(
+                "increment_scenario_usage", {"p_scenario_id": scenario_id, "p_score": score},
+            )
+            return
+        except Exception as e:
+            if not is_missing_function(e):
+                raise
+            logger.warning("increment_scenario_usage RPC not deployed, falling back to read-modify-write")
+
         rows = await self.client.query(
             self.table,
             filters={"scenario_id": scenario_id},
@@ -937,6 +1119,18 @@ class TraceRepo:
         result = await self.client.create(self.spans_table, data)
         return PipelineSpanModel(**result) if result else span
 
+    async def create_traces(self, traces: list[PipelineTraceModel]) -> int:
+        """Bulk-insert traces. Returns the number of rows written."""
+        data = [t.model_dump(exclude_none=True, exclude={"id", "created_at"}) for t in traces]
+        rows = await self.client.create_many(self.traces_table, data)
+        return len(rows)
+
+    async def create_spans(self, spans: list[PipelineSpanModel]) -> int:
+        """Bulk-insert spans. Returns the number of rows written."""
+        data = [s.model_dump(exclude_none=True, exclude={"id", "created_at"}) for s in spans]
+        rows = await self.client.create_many(self.spans_table, data)
+        return len(rows)
+
     async def get_traces(
         self,
         *,
@@ -955,9 +1149,7 @@ class TraceRepo:
             order="created_at.desc",
             limit=limit,
         )
-        if rows and isinstance(rows, list):
-            return [PipelineTraceModel(**r) for r in rows]
-        return []
+        return _validate_rows(PipelineTraceModel, rows)
 
     async def get_spans_for_trace(self, trace_id: str) -> list[PipelineSpanModel]:
         rows = await self.client.query(
@@ -965,9 +1157,7 @@ class TraceRepo:
             filters={"trace_id": trace_id},
             order="start_time.asc",
         )
-        if rows and isinstance(rows, list):
-            return [PipelineSpanModel(**r) for r in rows]
-        return []
+        return _validate_rows(PipelineSpanModel, rows)
 
 
 class ConversationHistoryRepo:
@@ -987,21 +1177,23 @@ class ConversationHistoryRepo:
         )
         if rows and isinstance(rows, list):
             # Reverse to get chronological order (oldest first)
-            return [ConversationTurnModel(**r) for r in reversed(rows)]
+            return _validate_rows(ConversationTurnModel, rows[::-1])
         return []
 
     async def save_turns(self, telegram_id: int, turns: list[ConversationTurnModel]) -> None:
         """Replace all stored turns for a user with the current window.
 
-        Strategy: delete existing rows, insert current window.
+        Strategy: delete existing rows, insert current window in one bulk request.
         This is simpler and safer than diffing — the window is small (20 turns max).
         """
         try:
             await self.client.delete(self.table, {"telegram_id": telegram_id})
+            rows = []
             for turn in turns:
                 data = turn.model_dump(exclude_none=True, exclude={"id", "created_at"})
                 data["telegram_id"] = telegram_id
-                await self.client.create(self.table, data)
+                rows.append(data)
+            await self.client.create_many(self.table, rows)
         except Exception as e:
             logger.error("Failed to save conversation history for user %s: %s", telegram_id, e)
 
@@ -1281,3 +1473,17 @@ class TmaEventRepo:
                 )
                 count += 1
         return count
+
+
+class LLMUsageRepo:
+    """Repository for per-call LLM usage records."""
+
+    def __init__(self, client: InsForgeClient) -> None:
+        self.client = client
+        self.table = "llm_usage"
+
+    async def create_many(self, records: list[LLMUsageModel]) -> int:
+        """Bulk-insert usage records. Returns the number of rows written."""
+        data = [r.model_dump(exclude_none=True, exclude={"id"}) for r in records]
+        rows = await self.client.create_many(self.table, data)
+        return len(rows)
@@ -0,0 +1,164 @@
+"""Circuit breaker and retry budget for calls to a single upstream host."""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while its circuit breaker is open."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"{host} unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed → open after N consecutive failures; half-open probe after a cooldown.
+
+    While open, ``acquire()`` raises ``CircuitOpenError`` immediately. After
+    ``recovery_timeout`` seconds one probe call is let through (half-open):
+    success closes the circuit, failure re-opens it for another cooldown.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+    ) -> None:
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def acquire(self) -> None:
+        """Admit one call or raise ``CircuitOpenError``."""
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._state = HALF_OPEN
+            self._probe_in_flight = True
+            logger.info("Circuit half-open for %s, sending probe request", self.host)
+            return
+        self.rejected += 1
+        retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(self.host, retry_in)
+
+    def record_success(self) -> None:
+        if self._state == OPEN:
+            # A call admitted before the circuit opened: only the probe may close it
+            return
+        if self._state == HALF_OPEN:
+            logger.info("Circuit closed for %s", self.host)
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._state != OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    "Circuit opened for %s after %d consecutive failures (cooldown %.0fs)",
+                    self.host, self._consecutive_failures, self.recovery_timeout,
+                )
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Give back an admitted call that ended without an outcome (e.g. cancelled)."""
+        self._probe_in_flight = False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "host": self.host,
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class RetryBudget:
+    """Token bucket shared by every retry on a client.
+
+    Each retry spends one token; tokens refill at ``refill_per_second`` up to
+    ``capacity``. When the bucket is empty, failed calls are not retried, so
+    a brownout cannot multiply load on the upstream.
+    """
+
+    def __init__(self, *, capacity: float = 20.0, refill_per_second: float = 2.0) -> None:
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self.spent = 0
+        self.exhausted = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def try_spend(self) -> bool:
+        self._refill()
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.spent += 1
+            return True
+        self.exhausted += 1
+        return False
+
+    def stats(self) -> dict[str, Any]:
+        self._refill()
+        return {
+            "tokens": round(self._tokens, 1),
+            "capacity": self.capacity,
+            "spent": self.spent,
+            "exhausted": self.exhausted,
+        }
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
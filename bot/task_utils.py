@@ -1,9 +1,17 @@
-"""Background task management -- prevents GC and logs errors."""
+"""Background task management -- prevents GC and logs errors; bounded executor for background steps."""
 
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import contextvars
 import logging
+import time
+from collections import deque
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from bot.services.llm_scheduler import BACKGROUND, set_priority
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +23,11 @@ def create_background_task(coro, *, name: str | None = None) -> asyncio.Task:  #
 
     Prevents garbage collection of fire-and-forget tasks and ensures
     exceptions are logged at ERROR level instead of being silently swallowed.
+    LLM calls made from the task queue in the scheduler's background lane.
     """
-    task = asyncio.create_task(coro, name=name)
+    context = contextvars.copy_context()
+    context.run(set_priority, BACKGROUND)
+    task = asyncio.create_task(coro, name=name, context=context)
     _background_tasks.add(task)
 
     def _on_done(t: asyncio.Task) -> None:  # type: ignore[type-arg]
@@ -30,3 +41,250 @@ def create_background_task(coro, *, name: str | None = None) -> asyncio.Task:  #
 
     task.add_done_callback(_on_done)
     return task
+
+
+# ---------------------------------------------------------------------------
+# Bounded executor for background pipeline steps
+# ---------------------------------------------------------------------------
+
+OVERFLOW_POLICIES = ("drop", "coalesce", "block")
+DEFAULT_BACKGROUND_WORKERS = 4
+DEFAULT_BACKGROUND_QUEUE = 100
+
+
+class BackgroundQueueFull(RuntimeError):
+    """A background job was rejected: the queue is full (``drop``/``coalesce``) or shutting down."""
+
+
+class _Job:
+    __slots__ = ("coro", "context", "key", "name", "futures", "queued_at")
+
+    def __init__(self, coro: Coroutine[Any, Any, Any], key: str | None, name: str | None) -> None:
+        self.coro = coro
+        self.context = contextvars.copy_context()
+        self.key = key
+        self.name = name
+        self.futures: list[asyncio.Future[Any]] = []
+        self.queued_at = time.monotonic()
+
+
+class BackgroundExecutor:
+    """Fixed pool of workers running background jobs from a bounded queue.
+
+    When the queue is full the overflow policy decides: ``drop`` rejects the
+    new job, ``block`` makes ``submit()`` wait for room, and ``coalesce``
+    rejects it too but first folds it into a queued job with the same key —
+    under ``coalesce`` a key is never queued twice: the newest job replaces
+    the older one, whose submitter gets ``BackgroundQueueFull`` (its work is
+    discarded, not run with someone else's input). Jobs run in the
+    context they were submitted from (so in the scheduler's background lane
+    when submitted from a background task). ``shutdown()`` waits for
+    outstanding ``reserve()``-ations, stops intake and drains queued and
+    running jobs until its deadline, then cancels the rest.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = DEFAULT_BACKGROUND_WORKERS,
+        max_queue: int = DEFAULT_BACKGROUND_QUEUE,
+        overflow: str = "block",
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}, expected one of {OVERFLOW_POLICIES}")
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.overflow = overflow
+        self._queue: deque[_Job] = deque()
+        self._queued_keys: dict[str, _Job] = {}
+        self._changed = asyncio.Condition()
+        self._workers: list[asyncio.Task[None]] = []
+        self._running: set[asyncio.Task[Any]] = set()
+        self._closed = False
+        self._reserved = 0
+        self._unreserved = asyncio.Event()
+        self._unreserved.set()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def start(self) -> None:
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"background_worker_{i}") for i in range(self.workers)
+        ]
+        logger.info(
+            "Background executor started (workers=%d, max_queue=%d, overflow=%s)",
+            self.workers, self.max_queue, self.overflow,
+        )
+
+    def reserve(self) -> Callable[[], None]:
+        """Announce a job that will be submitted later; returns an idempotent release callback.
+
+        ``shutdown()`` keeps intake open (within its deadline) until every
+        reservation is released, so work scheduled just before shutdown is
+        still queued and drained rather than rejected.
+        """
+        self._reserved += 1
+        self._unreserved.clear()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self._reserved -= 1
+            if not self._reserved:
+                self._unreserved.set()
+
+        return release
+
+    async def submit(
+        self, coro: Coroutine[Any, Any, Any], *, key: str | None = None, name: str | None = None,
+    ) -> asyncio.Future[Any]:
+        """Queue ``coro`` and return a future for its result.
+
+        Raises ``BackgroundQueueFull`` (and closes ``coro``) when the job is
+        rejected; with ``block`` this only happens during shutdown.
+        """
+        fut: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        async with self._changed:
+            if not self._closed and self.overflow == "coalesce" and key is not None and key in self._queued_keys:
+                job = self._queued_keys[key]
+                job.coro.close()
+                for superseded in job.futures:
+                    if not superseded.done():
+                        superseded.set_exception(
+                            BackgroundQueueFull(f"background job {job.name or key} superseded by a newer one"),
+                        )
+                job.coro, job.context, job.name = coro, contextvars.copy_context(), name
+                job.futures = [fut]
+                self.submitted += 1
+                self.coalesced += 1
+                return fut
+            if self.overflow == "block":
+                await self._changed.wait_for(lambda: self._closed or len(self._queue) < self.max_queue)
+            if self._closed or len(self._queue) >= self.max_queue:
+                coro.close()
+                self.dropped += 1
+                reason = "shutting down" if self._closed else f"{len(self._queue)} jobs queued"
+                raise BackgroundQueueFull(f"background job {name or key or '?'} rejected: {reason}")
+            job = _Job(coro, key, name)
+            job.futures.append(fut)
+            self._queue.append(job)
+            if key is not None:
+                self._queued_keys[key] = job
+            self.submitted += 1
+            self._changed.notify_all()
+        return fut
+
+    async def _worker(self) -> None:
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: bool(self._queue) or self._closed)
+                if not self._queue:
+                    return  # closed and drained
+                job = self._queue.popleft()
+                if job.key is not None and self._queued_keys.get(job.key) is job:
+                    del self._queued_keys[job.key]
+                self._changed.notify_all()  # room for blocked submitters
+            await self._run(job)
+
+    async def _run(self, job: _Job) -> None:
+        waited = time.monotonic() - job.queued_at
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        task = asyncio.create_task(job.coro, name=job.name, context=job.context)
+        self._running.add(task)
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            self._resolve(job, cancelled=True)
+            raise
+        except Exception as exc:
+            self.failed += 1
+            logger.error("Background job %s failed: %s", job.name, exc, exc_info=exc)
+            self._resolve(job, exc=exc)
+        else:
+            self.completed += 1
+            self._resolve(job, result=result)
+        finally:
+            self._running.discard(task)
+
+    @staticmethod
+    def _resolve(
+        job: _Job, *, result: Any = None, exc: BaseException | None = None, cancelled: bool = False,
+    ) -> None:
+        for fut in job.futures:
+            if fut.done():
+                continue
+            if cancelled:
+                fut.cancel()
+            elif exc is not None:
+                fut.set_exception(exc)
+            else:
+                fut.set_result(result)
+
+    async def shutdown(self, timeout: float) -> None:
+        """Stop intake, let workers drain the queue for up to ``timeout`` seconds, cancel what is left."""
+        deadline = time.monotonic() + timeout
+        if self._reserved:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._unreserved.wait(), timeout)
+        async with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+        pending = len(self._queue) + len(self._running)
+        if pending or self._reserved:
+            logger.info("Draining %d background jobs (up to %.0fs)", pending, timeout)
+        cancelled = 0
+        if self._workers:
+            _, stuck = await asyncio.wait(self._workers, timeout=max(0.0, deadline - time.monotonic()))
+            cancelled = len(self._running)
+            for task in stuck:
+                task.cancel()  # also cancels the job it is awaiting
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        abandoned = len(self._queue)
+        while self._queue:
+            job = self._queue.popleft()
+            job.coro.close()
+            self._resolve(job, cancelled=True)
+        self._queued_keys.clear()
+        if cancelled or abandoned:
+            logger.warning(
+                "Background executor stopped: %d jobs cancelled, %d never started", cancelled, abandoned,
+            )
+
+    def stats(self) -> dict[str, Any]:
+        started = self.completed + self.failed + len(self._running)
+        return {
+            "workers": self.workers,
+            "overflow": self.overflow,
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "running": len(self._running),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "avg_wait": round(self._wait_total / started, 3) if started else 0.0,
+            "max_wait": round(self._wait_max, 3),
+        }
+
+
+_executor: BackgroundExecutor | None = None
+
+
+def install_background_executor(executor: BackgroundExecutor | None) -> None:
+    """Make ``executor`` run background pipeline steps (None = unbounded ``create_background_task``)."""
+    global _executor
+    _executor = executor
+
+
+def get_background_executor() -> BackgroundExecutor | None:
+    return _executor
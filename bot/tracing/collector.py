@@ -16,7 +16,8 @@ class TraceCollector:
     """Collects and batches trace data for background persistence.
 
     Buffers traces and spans in memory, flushing to InsForge periodically
-    or when buffer reaches batch_size.
+    or when buffer reaches batch_size. Each flush writes traces and spans
+    with one bulk insert per table rather than one request per row.
     """
 
     def __init__(
@@ -106,8 +107,7 @@ class TraceCollector:
             self._trace_buffer.clear()
             logger.debug("Flushing %d traces", len(traces))
             try:
-                for trace in traces:
-                    await self.trace_repo.create_trace(trace)
+                await self.trace_repo.create_traces(traces)
             except Exception as e:
                 logger.error("Failed to flush traces: %s", e)
 
@@ -117,8 +117,7 @@ class TraceCollector:
             self._span_buffer.clear()
             logger.debug("Flushing %d spans", len(spans))
             try:
-                for span in spans:
-                    await self.trace_repo.create_span(span)
+                await self.trace_repo.create_spans(spans)
             except Exception as e:
                 logger.error("Failed to flush spans: %s", e)
 
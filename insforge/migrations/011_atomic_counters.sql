@@ -0,0 +1,89 @@
+-- Atomic counter updates — replace read-modify-write round trips in the bot
+-- Execute via InsForge dashboard SQL editor
+--
+-- Each function updates and returns the new row in a single call
+-- (POST /api/database/rpc/<name>). Row locks taken by UPDATE serialize
+-- concurrent callers, so no increments are lost.
+
+-- XP + level: each level requires level*200 XP (mirrors UserRepo.update_xp)
+CREATE OR REPLACE FUNCTION increment_xp_and_level(p_telegram_id BIGINT, p_xp INTEGER)
+RETURNS SETOF users
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_new_xp    INTEGER;
+    v_remaining INTEGER;
+    v_level     INTEGER := 1;
+BEGIN
+    UPDATE users
+       SET total_xp = COALESCE(total_xp, 0) + p_xp,
+           updated_at = NOW()
+     WHERE telegram_id = p_telegram_id
+    RETURNING total_xp INTO v_new_xp;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    v_remaining := v_new_xp;
+    WHILE v_remaining >= v_level * 200 LOOP
+        v_remaining := v_remaining - v_level * 200;
+        v_level := v_level + 1;
+    END LOOP;
+
+    RETURN QUERY
+        UPDATE users
+           SET current_level = v_level
+         WHERE telegram_id = p_telegram_id
+        RETURNING *;
+END;
+$$;
+
+-- Generated scenario usage: times_used + running avg_score
+CREATE OR REPLACE FUNCTION increment_scenario_usage(p_scenario_id TEXT, p_score INTEGER)
+RETURNS SETOF generated_scenarios
+LANGUAGE sql
+AS $$
+    UPDATE generated_scenarios
+       SET times_used = COALESCE(times_used, 0) + 1,
+           avg_score = ROUND(
+               ((COALESCE(avg_score, 0)::numeric * COALESCE(times_used, 0)) + p_score)
+               / (COALESCE(times_used, 0) + 1),
+               2
+           )
+     WHERE scenario_id = p_scenario_id
+    RETURNING *;
+$$;
+
+-- Reminder sent: bump reminder_count and stamp last_reminded_at
+CREATE OR REPLACE FUNCTION bump_reminder_count(p_reminder_id INTEGER, p_now TIMESTAMP WITH TIME ZONE)
+RETURNS SETOF scheduled_reminders
+LANGUAGE sql
+AS $$
+    UPDATE scheduled_reminders
+       SET reminder_count = COALESCE(reminder_count, 0) + 1,
+           last_reminded_at = p_now,
+           updated_at = p_now
+     WHERE id = p_reminder_id
+    RETURNING *;
+$$;
+
+-- Reminder snoozed: move due_at, reset to pending, bump snooze_count
+CREATE OR REPLACE FUNCTION snooze_reminder(p_reminder_id INTEGER, p_new_due TIMESTAMP WITH TIME ZONE)
+RETURNS SETOF scheduled_reminders
+LANGUAGE sql
+AS $$
+    UPDATE scheduled_reminders
+       SET due_at = p_new_due,
+           status = 'pending',
+           snooze_count = COALESCE(snooze_count, 0) + 1,
+           updated_at = NOW()
+     WHERE id = p_reminder_id
+    RETURNING *;
+$$;
+
+-- Bot calls these through PostgREST as anon
+GRANT EXECUTE ON FUNCTION increment_xp_and_level(BIGINT, INTEGER) TO anon;
+GRANT EXECUTE ON FUNCTION increment_scenario_usage(TEXT, INTEGER) TO anon;
+GRANT EXECUTE ON FUNCTION bump_reminder_count(INTEGER, TIMESTAMP WITH TIME ZONE) TO anon;
+GRANT EXECUTE ON FUNCTION snooze_reminder(INTEGER, TIMESTAMP WITH TIME ZONE) TO anon;
@@ -0,0 +1,16 @@
+-- Lead list projection: expose "has a plan" without shipping the plan JSON
+-- Execute via InsForge dashboard SQL editor
+--
+-- List screens (/leads, pagination, stats → leads) only need to know whether
+-- a lead has an engagement plan. A stored generated column lets them select
+-- a boolean instead of the full engagement_plan JSONB.
+
+ALTER TABLE lead_registry
+  ADD COLUMN IF NOT EXISTS has_engagement_plan BOOLEAN
+  GENERATED ALWAYS AS (
+    CASE
+      WHEN jsonb_typeof(engagement_plan::jsonb) = 'array'
+        THEN jsonb_array_length(engagement_plan::jsonb) > 0
+      ELSE FALSE
+    END
+  ) STORED;
@@ -0,0 +1,12 @@
+-- Hedged fallback chains for per-agent model overrides
+-- Execute via InsForge dashboard SQL editor
+--
+-- fallback_models: ordered OpenRouter model ids raced against model_id when it
+-- is slower than its observed p95 latency (capped at latency_slo_seconds).
+-- When empty, the chain from data/agents.yaml (fallbacks:) applies.
+
+ALTER TABLE agent_model_config
+    ADD COLUMN IF NOT EXISTS fallback_models JSONB NOT NULL DEFAULT '[]'::jsonb;
+
+ALTER TABLE agent_model_config
+    ADD COLUMN IF NOT EXISTS latency_slo_seconds REAL;
@@ -0,0 +1,39 @@
+-- LLM usage records — one row per upstream LLM call
+-- Execute via InsForge dashboard SQL editor
+--
+-- Written in batches by the bot's usage aggregator (bot/services/llm_usage.py).
+-- agent/pipeline are NULL for calls made outside a pipeline step; trace_id is
+-- set only when the call ran inside a traced pipeline.
+
+CREATE TABLE IF NOT EXISTS llm_usage (
+    id BIGSERIAL PRIMARY KEY,
+    provider VARCHAR(20) NOT NULL,           -- claude, openrouter
+    model VARCHAR(100) NOT NULL,
+    kind VARCHAR(20) NOT NULL,               -- complete, stream, tools, research
+    agent VARCHAR(50),
+    pipeline VARCHAR(50),
+    telegram_id BIGINT,
+    trace_id UUID,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_creation_tokens INTEGER NOT NULL DEFAULT 0,
+    cost NUMERIC(12, 6),                     -- USD as reported by the upstream (OpenRouter only)
+    latency_ms NUMERIC(10, 2) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Indexes for the rollups the admin screen and cost reviews run
+CREATE INDEX IF NOT EXISTS idx_llm_usage_created_at ON llm_usage (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_agent ON llm_usage (agent, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_telegram_id ON llm_usage (telegram_id, created_at DESC);
+
+-- Enable RLS (InsForge requirement)
+ALTER TABLE llm_usage ENABLE ROW LEVEL SECURITY;
+
+-- Service role can do everything (bot uses service role key)
+CREATE POLICY llm_usage_service_all ON llm_usage FOR ALL USING (true) WITH CHECK (true);
+
+-- Grant sequence usage to anon role (required for BIGSERIAL auto-increment via PostgREST)
+GRANT USAGE, SELECT ON SEQUENCE llm_usage_id_seq TO anon;
+GRANT ALL ON TABLE llm_usage TO anon;
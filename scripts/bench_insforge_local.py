@@ -0,0 +1,110 @@
+"""Benchmark storage-layer optimizations against LocalInsForge (no network).
+
+Measures, with injected per-request latency:
+  - bulk insert: create() loop vs create_many()
+  - user lookups: uncached vs TTL-cached UserRepo.get_by_telegram_id
+  - concurrent identical reads: plain vs single-flight query()
+  - full scans: query() vs paginated query_iter()
+
+Run from the repo root:  python -m scripts.bench_insforge_local [--latency 0.02]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from bot.storage.insforge_client import InsForgeClient
+from bot.storage.local_insforge import LocalInsForge
+from bot.storage.models import UserModel
+from bot.storage.repositories import UserRepo
+
+BASE_URL = "http://insforge.local"
+
+
+def _client(local: LocalInsForge, **kwargs) -> InsForgeClient:
+    return InsForgeClient(BASE_URL, "local", transport=local, **kwargs)
+
+
+def _report(label: str, seconds: float, local: LocalInsForge) -> None:
+    print(f"  {label:<34} {seconds * 1000:8.1f} ms  {sum(local.requests.values()):5d} requests")
+    local.reset_stats()
+
+
+async def bench_bulk_insert(latency: float, rows: int) -> None:
+    print(f"bulk insert ({rows} rows)")
+    payload = [{"telegram_id": 1, "scenario_id": f"s{i}", "score": i % 100} for i in range(rows)]
+
+    local = LocalInsForge(latency=latency)
+    client = _client(local)
+    start = time.perf_counter()
+    for row in payload:
+        await client.create("attempts", row)
+    _report("create() loop", time.perf_counter() - start, local)
+
+    local = LocalInsForge(latency=latency)
+    client = _client(local)
+    start = time.perf_counter()
+    await client.create_many("attempts", payload)
+    _report("create_many()", time.perf_counter() - start, local)
+
+
+async def bench_user_cache(latency: float, lookups: int) -> None:
+    print(f"user lookups ({lookups} sequential)")
+    for label, ttl in (("uncached", 0.0), ("TTL cache", 30.0)):
+        local = LocalInsForge(latency=latency)
+        local.seed_rows("users", [UserModel(telegram_id=1).model_dump(exclude_none=True)])
+        repo = UserRepo(_client(local), cache_ttl=ttl)
+        local.reset_stats()
+        start = time.perf_counter()
+        for _ in range(lookups):
+            await repo.get_by_telegram_id(1)
+        _report(label, time.perf_counter() - start, local)
+
+
+async def bench_coalescing(latency: float, callers: int) -> None:
+    print(f"identical concurrent reads ({callers} callers)")
+    for label, coalesce in (("plain query()", False), ("single-flight query()", True)):
+        local = LocalInsForge(latency=latency)
+        local.seed_rows("users", [{"telegram_id": 1}])
+        client = _client(local, coalesce_reads=coalesce)
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client.query("users", filters={"telegram_id": 1}) for _ in range(callers)
+        ))
+        _report(label, time.perf_counter() - start, local)
+
+
+async def bench_scan(latency: float, rows: int) -> None:
+    print(f"full scan ({rows} rows)")
+    local = LocalInsForge(latency=latency)
+    local.seed_rows("attempts", [{"scenario_id": f"s{i % 50}", "score": i % 100} for i in range(rows)])
+    client = _client(local)
+    local.reset_stats()
+
+    start = time.perf_counter()
+    result = await client.query("attempts", select="scenario_id,score")
+    _report(f"query() ({len(result)} rows at once)", time.perf_counter() - start, local)
+
+    start = time.perf_counter()
+    count = 0
+    async for _row in client.query_iter("attempts", select="scenario_id,score"):
+        count += 1
+    _report(f"query_iter() ({count} rows streamed)", time.perf_counter() - start, local)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per request")
+    args = parser.parse_args()
+
+    print(f"LocalInsForge latency: {args.latency * 1000:.0f} ms/request\n")
+    await bench_bulk_insert(args.latency, 200)
+    await bench_user_cache(args.latency, 50)
+    await bench_coalescing(args.latency, 20)
+    await bench_scan(args.latency, 5000)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
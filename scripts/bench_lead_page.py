@@ -0,0 +1,96 @@
+"""Microbenchmark: decode + validate a 200-row lead page (stdlib vs fast path).
+
+Run from the repo root:  python -m scripts.bench_lead_page [--rows 200] [--repeat 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+
+from bot.storage.models import LeadRegistryModel
+from bot.storage.repositories import _validate_rows
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _lead_row(i: int) -> dict:
+    """A lead row shaped like production data (analysis blobs, research, plan)."""
+    return {
+        "id": i,
+        "user_id": 7,
+        "telegram_id": 123456789,
+        "prospect_name": f"Prospect {i}",
+        "prospect_first_name": "Prospect",
+        "prospect_last_name": str(i),
+        "prospect_title": "VP Partnerships",
+        "prospect_company": f"Company {i % 40}",
+        "prospect_geography": "DACH",
+        "photo_url": f"https://cdn.example.com/leads/{i}.jpg",
+        "photo_key": f"leads/{i}.jpg",
+        "prospect_analysis": "Decision maker with budget authority. " * 30,
+        "closing_strategy": "Lead with the integration story, then pricing. " * 20,
+        "engagement_tactics": "Comment on recent posts before the DM. " * 15,
+        "draft_response": json.dumps({"platform": "linkedin", "message": "Hi there! " * 40}),
+        "status": "analyzed",
+        "notes": None,
+        "input_type": "text",
+        "original_context": "Met at the conference, interested in onboarding. " * 10,
+        "web_research": "Company raised a Series B and is hiring in sales. " * 100,
+        "web_research_versions": {
+            "versions": [
+                {"id": v, "content": "Research snapshot. " * 60, "created_at": "2026-01-01T00:00:00Z"}
+                for v in range(3)
+            ]
+        },
+        "engagement_plan": [
+            {"step_id": s, "action": "Send follow-up", "status": "pending", "timing": f"day {s * 2}"}
+            for s in range(1, 7)
+        ],
+        "last_contacted": "2026-02-01T09:00:00+00:00",
+        "next_followup": "2026-02-08T09:00:00+00:00",
+        "followup_count": 2,
+        "created_at": "2026-01-15T12:00:00+00:00",
+        "updated_at": "2026-02-01T09:00:00+00:00",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    body = json.dumps([_lead_row(i) for i in range(args.rows)]).encode()
+    print(f"payload: {args.rows} rows, {len(body) / 1024:.0f} KiB, {args.repeat} iterations\n")
+
+    def baseline() -> None:
+        rows = json.loads(body)
+        [LeadRegistryModel(**r) for r in rows]
+
+    def adapter_only() -> None:
+        _validate_rows(LeadRegistryModel, json.loads(body))
+
+    cases = [("stdlib json + Model(**r)", baseline), ("stdlib json + TypeAdapter", adapter_only)]
+    if orjson is not None:
+        def fast() -> None:
+            _validate_rows(LeadRegistryModel, orjson.loads(body))
+
+        cases.append(("orjson + TypeAdapter", fast))
+    else:
+        print("orjson not installed — skipping fast decode case\n")
+
+    base_ms = None
+    for label, fn in cases:
+        fn()  # warm adapter cache
+        ms = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat * 1000
+        base_ms = base_ms or ms
+        print(f"{label:<28} {ms:7.3f} ms/page   x{base_ms / ms:.2f}")
+
+
+if __name__ == "__main__":
+    main()